@@ -1,56 +1,38 @@
 #!/usr/bin/env python3
-"""Update all 45 Jules persona prompt files with standardized template."""
+"""Regenerate the Jules persona prompt files from the standardized template.
 
-import os
+The persona list comes from `.jules/personas/` (number and slug from each
+`{num}_{lower}.md` file name) and `.jules/_ROSTER.md` (display name and emoji
+from the guild tables). Missing roster entries fall back to the persona file's
+first line, `You are "Name" <emoji> - ...`.
+
+Only prompts whose rendered content differs from the file on disk are
+rewritten, each through a temp file and os.replace, so unchanged prompts keep
+their mtime and downstream watchers, caches and indexers stay warm.
 
-# Persona data: (number, name, emoji)
-personas = [
-    ('01', 'Oracle', '🔮'),
-    ('02', 'Vanguard', '⚔️'),
-    ('03', 'Scribe', '📜'),
-    ('04', 'Gardener', '🌿'),
-    ('05', 'Bolt', '⚡'),
-    ('06', 'Palette', '🎨'),
-    ('07', 'Sentinel', '🛡️'),
-    ('08', 'Vector', '📐'),
-    ('09', 'Bard', '🎭'),
-    ('10', 'Hunter', '🎯'),
-    ('11', 'Architect', '🏗️'),
-    ('12', 'Steward', '📊'),
-    ('13', 'Warden', '⚠️'),
-    ('14', 'Forge', '🔥'),
-    ('15', 'Lens', '🔍'),
-    ('16', 'Worldsmith', '🌍'),
-    ('17', 'Chronicler', '📖'),
-    ('18', 'Intriguer', '🗡️'),
-    ('19', 'Warlord', '⚔️'),
-    ('20', 'Mythkeeper', '🏛️'),
-    ('21', 'Wanderer', '🧭'),
-    ('22', 'Economist', '💰'),
-    ('23', 'Shadowbroker', '🌑'),
-    ('24', 'Templar', '⛪'),
-    ('25', 'Depthcrawler', '🕷️'),
-    ('26', 'Planeshifter', '✨'),
-    ('27', 'Captain', '⚓'),
-    ('28', 'Heartkeeper', '💕'),
-    ('29', 'Castellan', '🏰'),
-    ('30', 'Timekeeper', '⏳'),
-    ('31', 'Analyst', '🔬'),
-    ('32', 'Schemer', '📋'),
-    ('33', 'Linker', '🔗'),
-    ('34', 'Simulator', '🎲'),
-    ('35', 'Materializer', '🎨'),
-    ('36', 'Auditor', '📊'),
-    ('37', 'Taxonomist', '🏷️'),
-    ('38', 'Mechanist', '⚙️'),
-    ('39', 'Recorder', '📝'),
-    ('40', 'Ecologist', '🌿'),
-    ('41', 'Ritualist', '⭐'),
-    ('42', 'Alchemist', '⚗️'),
-    ('43', 'Navigator', '🧭'),
-    ('44', 'Dialogist', '💬'),
-    ('45', 'Lockpick', '🔓'),
-]
+Usage: python .jules/prompts/update_prompts.py [--check]
+  --check  report missing, outdated and orphaned prompt files without writing;
+           exits 1 if anything would change.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import string
+import sys
+import uuid
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JULES_DIR = os.path.dirname(SCRIPT_DIR)
+ROSTER = os.path.join(JULES_DIR, '_ROSTER.md')
+PERSONAS_DIR = os.path.join(JULES_DIR, 'personas')
+
+PERSONA_FILE = re.compile(r'^(\d+)_([a-z0-9-]+)\.md$')
+PROMPT_FILE = re.compile(r'^(\d+)_([a-z0-9-]+)_prompt\.md$')
+# | **Oracle** | 🔮 | TypeScript/types | ... (guild tables; the orchestration table leads with Order)
+ROSTER_ROW = re.compile(r'^\|\s*\*\*(?P<name>[^*]+)\*\*\s*\|\s*(?P<emoji>[^|]+?)\s*\|', re.MULTILINE)
+PERSONA_INTRO = re.compile(r'^You are "(?P<name>[^"]+)"\s*(?P<emoji>\S+)')
 
 template = '''You are **{name}** {emoji}.
 
@@ -144,18 +126,127 @@ Before pushing, verify no forbidden files are staged. If any are, unstage or rev
 Begin with Step 1. Output your plan.
 '''
 
-def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    for num, name, emoji in personas:
-        lower = name.lower()
-        content = template.format(num=num, name=name, emoji=emoji, lower=lower)
-        filepath = os.path.join(script_dir, f'{num}_{lower}_prompt.md')
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f'Updated {num}_{lower}_prompt.md')
+def compile_template(text):
+    """Split the template once into (literal, field) pairs so each render is a join."""
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+
+
+def render(compiled, fields):
+    return ''.join(literal + (fields[field] if field is not None else '') for literal, field in compiled)
+
+
+def read_roster(path=ROSTER):
+    """{lower name: (name, emoji)} from the roster tables."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return {}
+    return {m['name'].strip().lower(): (m['name'].strip(), m['emoji']) for m in ROSTER_ROW.finditer(text)}
+
+
+def _intro(path):
+    with open(path, encoding='utf-8') as f:
+        m = PERSONA_INTRO.match(f.readline())
+    return (m['name'], m['emoji']) if m else None
+
+
+def load_personas(personas_dir=PERSONAS_DIR, roster_path=ROSTER):
+    """[(num, name, emoji, lower)] sorted by number."""
+    roster = read_roster(roster_path)
+    personas = []
+    with os.scandir(personas_dir) as entries:
+        for entry in entries:
+            m = PERSONA_FILE.match(entry.name)
+            if not m or not entry.is_file():
+                continue
+            num, lower = m.groups()
+            known = roster.get(lower) or _intro(entry.path)
+            if known is None:
+                print(f'Skipping {entry.name}: not in _ROSTER.md and no "You are" line', file=sys.stderr)
+                continue
+            name, emoji = known
+            personas.append((num, name, emoji, lower))
+    personas.sort(key=lambda p: (int(p[0]), p[3]))
+    return personas
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def current_digest(path, expected_size):
+    """sha256 of the file on disk, or None if missing; a size mismatch skips the read."""
+    try:
+        if os.stat(path).st_size != expected_size:
+            return ''
+        with open(path, 'rb') as f:
+            return digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def write_atomic(path, data):
+    tmp = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{uuid.uuid4().hex}.tmp')
+    try:
+        with open(tmp, 'xb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def sync(personas, out_dir=SCRIPT_DIR, check=False):
+    """Render every persona's prompt into out_dir; returns (created, updated, unchanged, orphaned)."""
+    compiled = compile_template(template)
+    created, updated, unchanged = [], [], 0
+    expected = set()
+
+    for num, name, emoji, lower in personas:
+        filename = f'{num}_{lower}_prompt.md'
+        expected.add(filename)
+        data = render(compiled, {'num': num, 'name': name, 'emoji': emoji, 'lower': lower}).encode('utf-8')
+        filepath = os.path.join(out_dir, filename)
+        on_disk = current_digest(filepath, len(data))
+        if on_disk == digest(data):
+            unchanged += 1
+            continue
+        (created if on_disk is None else updated).append(filename)
+        if not check:
+            write_atomic(filepath, data)
+
+    orphaned = sorted(
+        name for name in os.listdir(out_dir) if PROMPT_FILE.match(name) and name not in expected
+    )
+    return created, updated, unchanged, orphaned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate Jules persona prompt files')
+    parser.add_argument('--check', action='store_true', help='report drift without writing; exit 1 on drift')
+    args = parser.parse_args(argv)
+
+    personas = load_personas()
+    created, updated, unchanged, orphaned = sync(personas, check=args.check)
+
+    for filename in created:
+        print(f'{"Would create" if args.check else "Created"} {filename}')
+    for filename in updated:
+        print(f'{"Would update" if args.check else "Updated"} {filename}')
+    for filename in orphaned:
+        print(f'Orphaned {filename} (no persona file)')
+
+    print(
+        f'\n{len(personas)} personas: {len(created)} new, {len(updated)} changed, '
+        f'{unchanged} unchanged, {len(orphaned)} orphaned.'
+    )
+    if args.check:
+        return 1 if created or updated or orphaned else 0
+    return 0
 
-    print(f'\nDone! Updated {len(personas)} prompt files.')
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
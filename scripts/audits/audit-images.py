@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Run every per-image audit on one decode of each image.
+
+Usage:
+  audit-images.py <path|dir|glob> [...] [--checks size,margins,checkerboard,background,alpha]
+                  [--jobs N] [--cache PATH | --no-cache]
+
+Each image is decoded once and the selected checks from image_audit.py run on
+that buffer; one JSON record per image carries every check's result and the
+list of checks that flagged it. Batches run in a process pool and unchanged
+images come from the audit cache.
+
+Exit codes:
+  0: ok (no check flagged the image)
+  2: at least one check flagged (batch: in at least one image)
+  1: error (batch: at least one image could not be read)
+"""
+
+from __future__ import annotations
+
+import sys
+
+from audit_runner import main_for, parse_args
+from image_audit import DEFAULT_CHECKS, audit_check, cache_name, parse_checks
+
+
+USAGE = (
+    "usage: audit-images.py <imagePath|dir|glob> [...] [--checks " + ",".join(DEFAULT_CHECKS) + "]"
+    " [--jobs N] [--cache PATH | --no-cache]"
+)
+
+
+def main() -> int:
+    parsed = parse_args(sys.argv[1:], {"checks": ",".join(DEFAULT_CHECKS)})
+    try:
+        checks = parse_checks(parsed[2]["checks"]) if parsed else None
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        checks = None
+    if parsed is None or checks is None:
+        print(USAGE, file=sys.stderr)
+        return 1
+
+    targets, jobs, opts = parsed
+    return main_for(cache_name(checks), audit_check(checks), targets, jobs, opts)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""
+Persistent result cache for the per-image audits.
+
+Entries are keyed by resolved path and validated by (size, mtime_ns); when the
+stat changes the file is re-hashed, so a touched-but-identical image still hits.
+Each check's results are stored under a fingerprint of its detection settings
+(ROW_THRESH, COL_THRESH, BLANK_MARGIN_PX for the margin scan, plus the
+image_audit thresholds for the combined audit); changing a threshold
+invalidates exactly that check's stored results on the next load.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import blank_margins
+import image_audit
+
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE = ROOT / ".agent" / "cache" / "image-audits.json"
+
+CACHE_VERSION = 1
+
+
+def check_fingerprints() -> dict[str, str]:
+    margins = {
+        "row_thresh": blank_margins.ROW_THRESH,
+        "col_thresh": blank_margins.COL_THRESH,
+        "blank_px": blank_margins.BLANK_MARGIN_PX,
+    }
+    audit = {
+        **margins,
+        "border_px": image_audit.BORDER_PX,
+        "checker": [image_audit.CHECKER_EDGE_DIFF, image_audit.CHECKER_TOLERANCE, image_audit.CHECKER_MAX_SAT,
+                    image_audit.CHECKER_MIN_MATCH],
+        "uniform": [image_audit.UNIFORM_TOLERANCE, image_audit.UNIFORM_MIN_SHARE],
+        "alpha": [image_audit.ALPHA_VISIBLE, image_audit.ALPHA_MIN_VISIBLE],
+    }
+    return {
+        "square": "v1",
+        "margins": "v1:" + json.dumps(margins, sort_keys=True),
+        "audit": "v1:" + json.dumps(audit, sort_keys=True),
+    }
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AuditCache:
+    def __init__(self, path: Path = DEFAULT_CACHE, fingerprints: dict[str, str] | None = None):
+        self.path = Path(path)
+        self.fingerprints = fingerprints or check_fingerprints()
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        stale = {
+            name
+            for name, fp in self.fingerprints.items()
+            if data.get("fingerprints", {}).get(name) != fp
+        }
+        for key, entry in data.get("entries", {}).items():
+            # "audit:<checks>" subsets share the "audit" fingerprint.
+            results = {k: v for k, v in entry.get("results", {}).items() if k.split(":", 1)[0] not in stale}
+            self.entries[key] = {**entry, "results": results}
+        if stale:
+            self.dirty = True
+
+    def _entry(self, path: str | Path) -> tuple[str, dict | None]:
+        """Return (key, entry) with entry refreshed for the file's current stat/hash."""
+        p = Path(path).resolve()
+        key = str(p)
+        st = p.stat()
+        entry = self.entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return key, entry
+
+        sha = file_sha256(p)
+        if entry and entry.get("sha256") == sha:
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        else:
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha, "results": {}}
+        self.entries[key] = entry
+        self.dirty = True
+        return key, entry
+
+    def lookup(self, path: str | Path, check: str) -> tuple[int, dict] | None:
+        try:
+            _, entry = self._entry(path)
+        except OSError:
+            return None
+        hit = entry["results"].get(check)
+        if hit is None:
+            return None
+        return hit["code"], {"path": str(path), **hit["record"]}
+
+    def store(self, path: str | Path, check: str, code: int, record: dict) -> None:
+        # Errors are never cached; they are usually transient (partial writes, locks).
+        if code == 1:
+            return
+        try:
+            _, entry = self._entry(path)
+        except OSError:
+            return
+        entry["results"][check] = {
+            "code": code,
+            "record": {k: v for k, v in record.items() if k != "path"},
+        }
+        self.dirty = True
+
+    def prune_missing(self) -> None:
+        for key in [k for k in self.entries if not Path(k).exists()]:
+            del self.entries[key]
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": CACHE_VERSION, "fingerprints": self.fingerprints, "entries": self.entries}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
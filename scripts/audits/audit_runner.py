@@ -0,0 +1,197 @@
+"""
+Parallel batch runner for the per-image audit scripts.
+
+check-image-square.py, detect-blank-margins.py, audit-images.py and
+list-non-square-race-images.py accept many paths, a directory, or a glob. Decoding and measuring happens in a
+process pool; one JSON line is streamed per image as results finish, and the
+batch ends with an aggregate exit code using the same convention as the
+single-image scripts (0 ok, 2 flagged, 1 error).
+
+Results are memoized in audit_cache.AuditCache, so only new or modified
+images reach the pool; --no-cache disables that, --cache PATH relocates it.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from PIL import Image
+
+from audit_cache import DEFAULT_CACHE, AuditCache
+from blank_margins import is_blank, measure_margins
+from image_probe import probe_size
+from repo_scan import walk
+
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+
+# A check returns (exit_code, record); record is the JSON line for that image.
+Check = Callable[[str], "tuple[int, dict]"]
+
+
+def expand_targets(targets: Iterable[str]) -> list[str]:
+    """Resolve paths, directories (non-recursive, .gitignore-aware) and glob patterns to image paths."""
+    out: list[str] = []
+    seen: set[str] = set()
+    for t in targets:
+        p = Path(t)
+        if p.is_dir():
+            found = sorted(f.path for f in walk(root=p, suffixes=IMAGE_SUFFIXES, recursive=False))
+        elif glob.has_magic(t):
+            found = sorted(glob.glob(t))
+        else:
+            found = [t]
+        for f in found:
+            if f not in seen:
+                seen.add(f)
+                out.append(f)
+    return out
+
+
+def check_square(path: str) -> tuple[int, dict]:
+    p = Path(path)
+    if not p.exists():
+        return 1, {"path": str(p), "error": f"file not found: {p}"}
+    try:
+        # Header bytes only; no decode is needed to answer "is it square".
+        w, h = probe_size(p)
+    except Exception as e:
+        return 1, {"path": str(p), "error": str(e)}
+    ok = w == h
+    return (0 if ok else 2), {"path": str(p), "size": {"w": w, "h": h}, "square": ok}
+
+
+def check_margins(path: str, engine: str = "edges") -> tuple[int, dict]:
+    p = Path(path)
+    if not p.exists():
+        return 1, {"path": str(p), "error": f"file not found: {p}"}
+    try:
+        with Image.open(p) as img:
+            margins = measure_margins(img, engine)
+            w, h = img.size
+    except Exception as e:
+        return 1, {"path": str(p), "error": str(e)}
+    blank = is_blank(margins)
+    out = {"path": str(p), "size": {"w": w, "h": h}, "margins": margins, "blank": blank}
+    return (2 if blank else 0), out
+
+
+def margins_check(engine: str) -> Check:
+    # partial() of a module-level function stays picklable for the pool.
+    return partial(check_margins, engine=engine)
+
+
+def run_batch(check: Check, paths: list[str], jobs: int | None = None) -> Iterator[tuple[int, dict]]:
+    """Yield (exit_code, record) per path in completion order."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(paths) <= 1:
+        for p in paths:
+            yield check(p)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        futures = [pool.submit(check, p) for p in paths]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def run_cached(
+    name: str, check: Check, paths: list[str], jobs: int | None = None, cache: AuditCache | None = None
+) -> Iterator[tuple[int, dict]]:
+    """run_batch() that answers unchanged images from the cache and stores fresh results."""
+    if cache is None:
+        yield from run_batch(check, paths, jobs)
+        return
+    misses: list[str] = []
+    for p in paths:
+        hit = cache.lookup(p, name)
+        if hit is None:
+            misses.append(p)
+        else:
+            yield hit
+    try:
+        for code, record in run_batch(check, misses, jobs):
+            cache.store(record["path"], name, code, record)
+            yield code, record
+    finally:
+        cache.save()
+
+
+def open_cache(opts: dict[str, str]) -> AuditCache | None:
+    return AuditCache(Path(opts["cache"])) if opts.get("cache") else None
+
+
+def aggregate_code(codes: Iterable[int]) -> int:
+    codes = set(codes)
+    if 1 in codes:
+        return 1
+    return 2 if 2 in codes else 0
+
+
+def stream_batch(
+    name: str, check: Check, paths: list[str], jobs: int | None = None, cache: AuditCache | None = None
+) -> int:
+    codes: list[int] = []
+    for code, record in run_cached(name, check, paths, jobs, cache):
+        codes.append(code)
+        print(json.dumps(record), flush=True)
+    return aggregate_code(codes)
+
+
+def parse_args(argv: list[str], options: dict[str, str]) -> tuple[list[str], int | None, dict[str, str]] | None:
+    """
+    Minimal flag parsing that keeps exit code 2 free for "flagged" results
+    (argparse exits 2 on usage errors). Every option also gets a --no-<name>
+    form that clears it. Returns (targets, jobs, options) or None.
+    """
+    targets: list[str] = []
+    jobs: int | None = None
+    opts = {"cache": str(DEFAULT_CACHE), **options}
+    it = iter(argv)
+    for a in it:
+        if a == "--jobs":
+            try:
+                jobs = int(next(it))
+            except (StopIteration, ValueError):
+                return None
+        elif a.startswith("--no-") and a[5:] in opts:
+            opts[a[5:]] = ""
+        elif a.startswith("--") and a[2:] in opts:
+            value = next(it, None)
+            if value is None:
+                return None
+            opts[a[2:]] = value
+        elif a.startswith("--"):
+            return None
+        else:
+            targets.append(a)
+    if not targets:
+        return None
+    return targets, jobs, opts
+
+
+def is_single_file(targets: list[str]) -> bool:
+    return len(targets) == 1 and not glob.has_magic(targets[0]) and not Path(targets[0]).is_dir()
+
+
+def main_for(name: str, check: Check, targets: list[str], jobs: int | None, opts: dict[str, str]) -> int:
+    """Single-file invocations keep the original output; everything else streams."""
+    cache = open_cache(opts)
+    if is_single_file(targets):
+        [(code, record)] = run_cached(name, check, targets, 1, cache)
+        if code == 1:
+            print(f"error: {record['error']}" if Path(targets[0]).exists() else record["error"], file=sys.stderr)
+            return 1
+        print(json.dumps(record))
+        return code
+    paths = expand_targets(targets)
+    if not paths:
+        print("no images matched", file=sys.stderr)
+        return 1
+    return stream_batch(name, check, paths, jobs, cache)
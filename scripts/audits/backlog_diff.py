@@ -0,0 +1,133 @@
+"""
+Set-based diff between the portrait regen backlog and the status record.
+
+The backlog is expanded once into indexed (raceId, gender) work items; the
+required pairs minus the done pairs from race_status_log gives the missing
+work. BacklogDiff keeps the expanded backlog between refreshes: a changed
+backlog file re-expands it, while a grown status log only re-reads the pair
+keys from the offset index (never the history) before taking the difference.
+
+Work items serialize to the JSON shape the regen tooling consumes directly:
+  {"kind": "missing", "category": "A", "raceId": "kenku", "raceName": "Kenku",
+   "gender": "female", "reason": "cropped"}
+Unresolved items carry kind "unresolved" and raceId null.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from race_index import load_race_index, norm
+from race_status_log import STATUS_JSON, load_done_pairs
+
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKLOG = ROOT / "docs" / "portraits" / "race_portrait_regen_backlog.json"
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    kind: str  # "missing" | "unresolved"
+    category: str
+    raceId: str | None
+    raceName: str | None
+    gender: str
+    reason: str
+
+    @property
+    def pair(self) -> tuple[str, str] | None:
+        return (self.raceId, self.gender) if self.raceId else None
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+
+def expand_backlog(items: list[dict], name_to_id: dict[str, str]) -> list[WorkItem]:
+    """One WorkItem per (item, gender), in backlog order; resolved rows are "missing" until diffed."""
+    out: list[WorkItem] = []
+    for it in items:
+        cat = str(it.get("category", "")).strip()
+        genders = it.get("genders") or []
+        race_id = it.get("raceId")
+        race_name = it.get("raceName")
+        reason = str(it.get("reason") or "").strip()
+
+        if isinstance(race_id, str) and race_id.strip():
+            resolved = race_id
+        elif isinstance(race_name, str) and race_name.strip():
+            resolved = name_to_id.get(norm(race_name))
+        else:
+            resolved = None
+        name = race_name if isinstance(race_name, str) else None
+        for g in genders:
+            g = str(g).strip()
+            if not g:
+                continue
+            kind = "missing" if resolved else "unresolved"
+            # Unresolved rows keep the raw name text, as the TSV report always has.
+            out.append(WorkItem(kind, cat, resolved, name if resolved else str(race_name), g, reason))
+    return out
+
+
+def _stamp(p: Path) -> tuple[int, int] | None:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class BacklogDiff:
+    def __init__(self, backlog: Path | str = BACKLOG, status: Path | str = STATUS_JSON, log: Path | None = None):
+        self.backlog_path = Path(backlog)
+        self.status_path = Path(status)
+        self.log_path = Path(log) if log else self.status_path.with_suffix(".jsonl")
+        self.items_count = 0
+        self.work: list[WorkItem] = []
+        self.required: dict[tuple[str, str], list[int]] = {}
+        self.done: set[tuple[str, str]] = set()
+        self._stamps: dict[str, tuple[int, int] | None] = {}
+
+    def _changed(self, key: str, p: Path) -> bool:
+        stamp = _stamp(p)
+        if key in self._stamps and self._stamps[key] == stamp:
+            return False
+        self._stamps[key] = stamp
+        return True
+
+    def refresh(self) -> bool:
+        """Recompute what changed since the last call; returns True if anything did."""
+        changed = False
+        if self._changed("backlog", self.backlog_path):
+            items = json.loads(self.backlog_path.read_text(encoding="utf-8")).get("items", [])
+            self.items_count = len(items)
+            self.work = expand_backlog(items, load_race_index().name_to_id())
+            self.required = {}
+            for i, w in enumerate(self.work):
+                if w.pair:
+                    self.required.setdefault(w.pair, []).append(i)
+            changed = True
+        status_changed = self._changed("status", self.status_path)
+        log_changed = self._changed("log", self.log_path)
+        if status_changed or log_changed:
+            self.done = load_done_pairs(self.status_path, self.log_path)
+            changed = True
+        return changed
+
+    def missing(self) -> list[WorkItem]:
+        open_rows = sorted(i for pair in self.required.keys() - self.done for i in self.required[pair])
+        return [self.work[i] for i in open_rows]
+
+    def unresolved(self) -> list[WorkItem]:
+        return [w for w in self.work if w.kind == "unresolved"]
+
+
+def filter_items(items: list[WorkItem], categories: set[str] | None, reason: str | None) -> list[WorkItem]:
+    needle = reason.lower() if reason else None
+    return [
+        w
+        for w in items
+        if (not categories or w.category in categories) and (needle is None or needle in w.reason.lower())
+    ]
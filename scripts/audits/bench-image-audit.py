@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-decode audit against today's one-pass-per-check scripts.
+
+Synthetic portraits (full-bleed, letterboxed, checkerboard backdrop, flat
+studio backdrop, transparent sprite) are written to a temporary directory as
+PNGs. Two comparisons are printed as JSON lines:
+
+  in-process  per image: check_square + check_margins + one decode per extra
+              check (how separate passes would run them) vs audit_image()
+  scripts     check-image-square.py then detect-blank-margins.py over the
+              directory vs audit-images.py with every check (--no-cache,
+              --jobs 1); the JS checkerboard pass needs Node and sharp and is
+              not included, so this understates the old cost
+
+Every combined record is checked against the separate results first.
+
+Usage: python scripts/audits/bench-image-audit.py [--size 1024] [--per-kind 4] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from audit_runner import check_margins, check_square
+from image_audit import CHECKS, DEFAULT_CHECKS, audit_image, decode
+
+
+HERE = Path(__file__).resolve().parent
+SEPARATE_DECODE = tuple(n for n in DEFAULT_CHECKS if n not in ("size", "margins"))
+
+
+def subject(draw: ImageDraw.ImageDraw, size: int) -> None:
+    draw.ellipse([size // 4, size // 5, 3 * size // 4, 4 * size // 5], fill=(150, 90, 60, 255))
+
+
+def make_fixtures(directory: Path, size: int, per_kind: int) -> list[str]:
+    paths = []
+    for i in range(per_kind):
+        ramp = Image.linear_gradient("L").resize((size, size))
+        full = Image.merge("RGB", (ramp, ramp.rotate(90), Image.new("L", (size, size), 90 + i)))
+        subject(ImageDraw.Draw(full), size)
+
+        boxed = Image.new("RGB", (size, size), (255, 255, 255))
+        draw = ImageDraw.Draw(boxed)
+        draw.rectangle([0, size // 8, size - 1, size - 1 - size // 8], fill=(60, 90, 120))
+        subject(draw, size)
+
+        checker = Image.new("RGB", (size, size), (204, 204, 204))
+        draw = ImageDraw.Draw(checker)
+        block = 16
+        for y in range(0, size, block):
+            for x in range(0, size, block):
+                if (x // block + y // block) % 2:
+                    draw.rectangle([x, y, x + block - 1, y + block - 1], fill=(255, 255, 255))
+        subject(draw, size)
+
+        backdrop = Image.new("RGB", (size, size), (40, 42, 48))
+        subject(ImageDraw.Draw(backdrop), size)
+
+        sprite = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        subject(ImageDraw.Draw(sprite), size)
+
+        for kind, img in (("full", full), ("boxed", boxed), ("checker", checker), ("backdrop", backdrop), ("sprite", sprite)):
+            p = directory / f"{kind}_{i:02d}.png"
+            img.save(p)
+            paths.append(str(p))
+    return paths
+
+
+def separate(path: str) -> dict:
+    """Today's shape: header probe, a decode for margins, then a decode per further check."""
+    _, square = check_square(path)
+    _, margins = check_margins(path)
+    extra = {name: CHECKS[name](decode(path)) for name in SEPARATE_DECODE}
+    return {"square": square, "margins": margins, **extra}
+
+
+def verify(paths: list[str]) -> None:
+    for p in paths:
+        old = separate(p)
+        _, new = audit_image(p)
+        checks = new["checks"]
+        assert checks["size"]["square"] == old["square"]["square"], p
+        assert checks["margins"]["margins"] == old["margins"]["margins"], p
+        for name in SEPARATE_DECODE:
+            assert checks[name]["flagged"] == old[name][0], (p, name)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run_scripts(commands: list[list[str]]) -> None:
+    for cmd in commands:
+        subprocess.run([sys.executable, *cmd], cwd=HERE, stdout=subprocess.DEVNULL, check=False)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=1024)
+    ap.add_argument("--per-kind", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="image-audit-bench-") as tmp:
+        directory = Path(tmp)
+        paths = make_fixtures(directory, args.size, args.per_kind)
+        verify(paths)
+
+        n = len(paths)
+        old_s = best_of(lambda: [separate(p) for p in paths], args.repeat)
+        new_s = best_of(lambda: [audit_image(p) for p in paths], args.repeat)
+        print(json.dumps({
+            "mode": "in-process",
+            "images": n,
+            "size": args.size,
+            "separate_ms_per_image": round(old_s / n * 1000, 2),
+            "combined_ms_per_image": round(new_s / n * 1000, 2),
+            "speedup": round(old_s / new_s, 2),
+        }))
+
+        d = str(directory)
+        old_cmds = [
+            ["check-image-square.py", d, "--no-cache"],
+            ["detect-blank-margins.py", d, "--no-cache", "--jobs", "1"],
+        ]
+        new_cmds = [["audit-images.py", d, "--no-cache", "--jobs", "1"]]
+        old_s = best_of(lambda: run_scripts(old_cmds), args.repeat)
+        new_s = best_of(lambda: run_scripts(new_cmds), args.repeat)
+        print(json.dumps({
+            "mode": "scripts",
+            "images": n,
+            "size": args.size,
+            "sequential_scripts_ms_per_image": round(old_s / n * 1000, 2),
+            "audit_images_ms_per_image": round(new_s / n * 1000, 2),
+            "checks": {"sequential": ["size", "margins"], "audit_images": list(DEFAULT_CHECKS)},
+        }))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
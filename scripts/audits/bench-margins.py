@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark the blank-margin engines on synthetic 1024- and 2048-square portraits.
+
+Each size is measured on a full-bleed image (the common case) and on a
+letterboxed one. Images are decoded once up front so the timings cover the
+margin scan only; every engine's result is checked against the pure-Python
+reference before it is timed.
+
+Usage: python scripts/audits/bench-margins.py [--sizes 1024 2048] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from PIL import Image, ImageDraw
+
+from blank_margins import ENGINES, measure_margins
+
+
+def portrait(size: int, margin: int) -> Image.Image:
+    img = Image.new("RGB", (size, size), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, margin, size - 1, size - 1 - margin], fill=(96, 120, 80))
+    draw.ellipse([size // 4, size // 4, 3 * size // 4, 3 * size // 4], fill=(200, 170, 140))
+    return img
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    for size in args.sizes:
+        for label, margin in (("full-bleed", 0), ("letterboxed", size // 8)):
+            img = portrait(size, margin)
+            img.load()
+            ref = measure_margins(img, "python")
+            row = {"size": size, "case": label, "margins": ref}
+            for engine in ENGINES:
+                if measure_margins(img, engine) != ref:
+                    print(f"parity failure: {engine} on {size} {label}")
+                    return 1
+                row[engine + "_ms"] = round(best_of(lambda: measure_margins(img, engine), args.repeat) * 1000, 2)
+            print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""
+Blank-margin measurement shared by the race portrait audits.
+
+detect-blank-margins.py and the batch runners import this module instead of
+re-implementing the scan. The NumPy engine builds one boolean "blank" mask per
+image and reduces it to per-row and per-column blank ratios in a single pass;
+the "edges" engine (the default) only touches the pixels it has to: it guesses
+the four boundaries on a strided thumbnail, then verifies each margin at full
+resolution band by band from the image edge, stopping at the first row/column
+that misses the threshold. The pure-Python engine is the original
+pixel-by-pixel scan, kept as the parity reference and as a fallback when NumPy
+is not installed. All engines return identical margins.
+"""
+
+from __future__ import annotations
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only on minimal installs
+    np = None
+
+
+# Consider a row/col blank if >98% blank pixels (allows for a few anti-aliased edges).
+ROW_THRESH = 0.98
+COL_THRESH = 0.98
+
+# Flag if any margin is "large enough to notice" for 1024-square portraits.
+# This catches the obvious Gemini letterboxing while ignoring tiny compression halos.
+BLANK_MARGIN_PX = 24
+
+ENGINES = ("edges", "numpy", "python")
+
+# Stride of the coarse thumbnail pass, and the minimum full-resolution band height.
+COARSE_STEP = 8
+
+
+def is_blank_pixel(rgb: tuple[int, int, int]) -> bool:
+    r, g, b = rgb
+    # Near-white + low chroma.
+    return r >= 247 and g >= 247 and b >= 247 and (max(rgb) - min(rgb)) <= 12
+
+
+def blank_ratio_row(px, y: int, w: int) -> float:
+    blanks = 0
+    for x in range(w):
+        if is_blank_pixel(px[x, y]):
+            blanks += 1
+    return blanks / float(w)
+
+
+def blank_ratio_col(px, x: int, h: int) -> float:
+    blanks = 0
+    for y in range(h):
+        if is_blank_pixel(px[x, y]):
+            blanks += 1
+    return blanks / float(h)
+
+
+def measure_margins_python(img: Image.Image) -> dict[str, int]:
+    img = img.convert("RGB")
+    w, h = img.size
+    px = img.load()
+
+    top = 0
+    for y in range(h):
+        if blank_ratio_row(px, y, w) >= ROW_THRESH:
+            top += 1
+        else:
+            break
+
+    bottom = 0
+    for y in range(h - 1, -1, -1):
+        if blank_ratio_row(px, y, w) >= ROW_THRESH:
+            bottom += 1
+        else:
+            break
+
+    left = 0
+    for x in range(w):
+        if blank_ratio_col(px, x, h) >= COL_THRESH:
+            left += 1
+        else:
+            break
+
+    right = 0
+    for x in range(w - 1, -1, -1):
+        if blank_ratio_col(px, x, h) >= COL_THRESH:
+            right += 1
+        else:
+            break
+
+    return {"top": top, "bottom": bottom, "left": left, "right": right}
+
+
+def rgb_array(img: Image.Image):
+    """(h, w, 3) uint8 view of the image, matching img.convert("RGB") pixel for pixel."""
+    if img.mode in ("RGB", "RGBA", "RGBX"):
+        # RGBA -> RGB conversion just drops alpha, so a channel slice avoids the copy.
+        return np.asarray(img)[..., :3]
+    return np.asarray(img.convert("RGB"))
+
+
+def pixel_mask(rgb):
+    # With every channel in [247, 255] the chroma spread is at most 8, so the
+    # "<= 12" test in is_blank_pixel() always holds and per-channel compares suffice.
+    return (rgb[..., 0] >= 247) & (rgb[..., 1] >= 247) & (rgb[..., 2] >= 247)
+
+
+def blank_mask(img: Image.Image):
+    """Return an (h, w) boolean array that is True where is_blank_pixel() would be."""
+    return pixel_mask(rgb_array(img))
+
+
+def leading_run(ok) -> int:
+    """Length of the run of True values at the start of a 1-D boolean array."""
+    misses = np.flatnonzero(~ok)
+    return int(misses[0]) if misses.size else int(ok.size)
+
+
+def margins_from_mask(mask) -> dict[str, int]:
+    h, w = mask.shape
+    # Same float division as blank_ratio_row/col so the >= comparison is bit-identical.
+    row_ok = mask.sum(axis=1) / float(w) >= ROW_THRESH
+    col_ok = mask.sum(axis=0) / float(h) >= COL_THRESH
+    return {
+        "top": leading_run(row_ok),
+        "bottom": leading_run(row_ok[::-1]),
+        "left": leading_run(col_ok),
+        "right": leading_run(col_ok[::-1]),
+    }
+
+
+def edge_run(lines_ok, n: int, guess: int) -> int:
+    """
+    Exact leading run of blank lines from one edge.
+
+    lines_ok(a, b) returns the full-resolution verdict for lines [a, b) counted
+    from that edge. The first band reaches just past the coarse guess, and
+    later bands double, so a correct guess costs one vectorized check and a
+    wrong one only costs extra bands; the answer never depends on the guess.
+    """
+    start, end = 0, min(n, max(guess + COARSE_STEP, COARSE_STEP))
+    while start < n:
+        ok = lines_ok(start, end)
+        misses = np.flatnonzero(~ok)
+        if misses.size:
+            return start + int(misses[0])
+        start, end = end, min(n, end + 2 * (end - start))
+    return n
+
+
+def measure_margins_edges(img: Image.Image) -> dict[str, int]:
+    return margins_from_rgb(rgb_array(img))
+
+
+def margins_from_rgb(rgb) -> dict[str, int]:
+    """The "edges" engine on an already decoded (h, w, 3) uint8 array (see image_audit.py)."""
+    h, w = rgb.shape[:2]
+
+    # Coarse pass: every COARSE_STEP-th row and column. Only used as a guess.
+    thumb = margins_from_mask(pixel_mask(rgb[::COARSE_STEP, ::COARSE_STEP]))
+    guess = {side: n * COARSE_STEP for side, n in thumb.items()}
+
+    def rows(band):
+        return pixel_mask(band).sum(axis=1) / float(w) >= ROW_THRESH
+
+    def cols(band):
+        return pixel_mask(band).sum(axis=0) / float(h) >= COL_THRESH
+
+    return {
+        "top": edge_run(lambda a, b: rows(rgb[a:b]), h, guess["top"]),
+        "bottom": edge_run(lambda a, b: rows(rgb[h - b : h - a])[::-1], h, guess["bottom"]),
+        "left": edge_run(lambda a, b: cols(rgb[:, a:b]), w, guess["left"]),
+        "right": edge_run(lambda a, b: cols(rgb[:, w - b : w - a])[::-1], w, guess["right"]),
+    }
+
+
+def measure_margins(img: Image.Image, engine: str = "edges") -> dict[str, int]:
+    if engine not in ENGINES:
+        raise ValueError(f"unknown margin engine: {engine}")
+    if engine == "python" or np is None:
+        return measure_margins_python(img)
+    if engine == "edges":
+        return measure_margins_edges(img)
+    return margins_from_mask(blank_mask(img))
+
+
+def is_blank(margins: dict[str, int]) -> bool:
+    return max(margins.values()) >= BLANK_MARGIN_PX
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Build responsive WebP/AVIF derivatives for images that pass the audits.
+
+Usage:
+  build-image-derivatives.py [dir ...] [--sizes 128 256 512] [--formats webp avif]
+                             [--jobs N] [--cache PATH | --no-cache] [--force] [--dry-run] [--json]
+
+Directories default to public/assets/images/races and must live under
+public/assets/images; variants go to public/assets/images/derived/ and the
+manifest to public/assets/images/derived/manifest.json (see
+image_derivatives.py). Originals are never modified.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from audit_cache import DEFAULT_CACHE, AuditCache
+from image_derivatives import DEFAULT_FORMATS, DEFAULT_SIZES, DEFAULT_SOURCES, IMAGES, SAVE_OPTIONS, Settings, build
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("dirs", nargs="*", help="source directories under public/assets/images")
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    ap.add_argument("--formats", nargs="+", choices=sorted(SAVE_OPTIONS), default=list(DEFAULT_FORMATS))
+    ap.add_argument("--jobs", type=int)
+    ap.add_argument("--cache", default=str(DEFAULT_CACHE))
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--force", action="store_true", help="rebuild every variant")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    sources = tuple(Path(d).resolve() for d in args.dirs) or DEFAULT_SOURCES
+    for d in sources:
+        if not d.is_relative_to(IMAGES.resolve()) or d.is_relative_to((IMAGES / "derived").resolve()):
+            print(f"not a source directory under {IMAGES}: {d}", file=sys.stderr)
+            return 1
+
+    cache = None if args.no_cache else AuditCache(Path(args.cache))
+    log = (lambda *_: None) if args.json else print
+    summary = build(
+        sources,
+        Settings(tuple(sorted(set(args.sizes))), tuple(args.formats)),
+        args.jobs,
+        cache,
+        args.force,
+        args.dry_run,
+        log,
+    )
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
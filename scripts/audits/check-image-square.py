@@ -1,41 +1,37 @@
 #!/usr/bin/env python3
 """
+Usage:
+  check-image-square.py <imagePath>
+  check-image-square.py <path|dir|glob> [...] [--jobs N] [--cache PATH | --no-cache]
+
+Only the image header is read (see image_probe.py), so batches run serially by
+default; pass --jobs N to spread very large scans across a process pool. One
+JSON line is printed per image as results finish. Results for unchanged files
+come from the audit cache (see audit_cache.py).
+
 Exit codes:
   0: ok (square)
-  2: not square
-  1: error
+  2: not square (batch: at least one image not square)
+  1: error (batch: at least one image could not be read)
 """
 
 from __future__ import annotations
 
-import json
 import sys
-from pathlib import Path
 
-from PIL import Image
+from audit_runner import check_square, main_for, parse_args
 
 
 def main() -> int:
-    if len(sys.argv) != 2:
-        print("usage: check-image-square.py <imagePath>", file=sys.stderr)
-        return 1
-
-    p = Path(sys.argv[1])
-    if not p.exists():
-        print(f"file not found: {p}", file=sys.stderr)
+    parsed = parse_args(sys.argv[1:], {})
+    if parsed is None:
+        print("usage: check-image-square.py <imagePath|dir|glob> [...] [--jobs N] [--cache PATH | --no-cache]", file=sys.stderr)
         return 1
 
-    try:
-        im = Image.open(p)
-        w, h = im.size
-        ok = w == h
-        print(json.dumps({"path": str(p), "size": {"w": w, "h": h}, "square": ok}))
-        return 0 if ok else 2
-    except Exception as e:
-        print(f"error: {e}", file=sys.stderr)
-        return 1
+    targets, jobs, opts = parsed
+    # Pool startup costs more than a header read per file unless asked for.
+    return main_for("square", check_square, targets, jobs or 1, opts)
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
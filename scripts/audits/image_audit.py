@@ -0,0 +1,240 @@
+"""
+Single-decode image audit: every check reads one shared pixel buffer.
+
+check-image-square.py, detect-blank-margins.py and the JS checkerboard cleanup
+(remove-checkerboard.mjs) each open and decode the same portrait again. Here a
+file is decoded once into a DecodedImage (an (h, w, 3) RGB view plus an
+(h, w) alpha view of one NumPy array) and every registered check runs against
+it, so adding a check adds no decode.
+
+Checks (all on by default, pick a subset with --checks):
+  size          width/height; flagged when not square
+  margins       blank_margins "edges" engine; flagged on letterboxing
+  checkerboard  fake-transparency checkerboard along the border, detected the
+                way remove-checkerboard.mjs does (block size from the top row,
+                two grey levels, per-block parity); flagged when most of the
+                border matches
+  background    near-uniform border colour (an unremoved studio backdrop);
+                flagged when almost the whole border is one colour
+  alpha         share of visible / fully opaque pixels; flagged when an alpha
+                channel leaves almost nothing visible
+
+A new check is a function taking a DecodedImage and returning
+(flagged, fields), registered with @check("name").
+
+One JSON record per image:
+  {"path": ..., "size": {"w": 1024, "h": 1024},
+   "checks": {"size": {"square": true, "flagged": false}, ...},
+   "flagged": ["margins"]}
+Exit-code convention matches the single-purpose scripts: 0 ok, 2 flagged,
+1 error.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from blank_margins import is_blank, margins_from_rgb
+
+
+# Border ring examined by the checkerboard / background checks.
+BORDER_PX = 16
+
+# remove-checkerboard.mjs: brightness jump that counts as a block edge, the
+# grey tolerance, and the saturation above which a pixel cannot be checker.
+CHECKER_EDGE_DIFF = 15
+CHECKER_TOLERANCE = 25
+CHECKER_MAX_SAT = 0.15
+CHECKER_DEFAULT_BLOCK = 16
+CHECKER_SAMPLE_PX = 200
+# Share of border pixels that must follow the pattern to flag the image.
+CHECKER_MIN_MATCH = 0.6
+
+# Border pixels within this per-channel distance of the median count as uniform.
+UNIFORM_TOLERANCE = 12
+UNIFORM_MIN_SHARE = 0.9
+
+# Alpha at or above this is "visible" (remove-checkerboard.mjs treats < 5 as transparent).
+ALPHA_VISIBLE = 5
+ALPHA_MIN_VISIBLE = 0.01
+
+
+@dataclass(frozen=True)
+class DecodedImage:
+    path: str
+    width: int
+    height: int
+    rgb: np.ndarray  # (h, w, 3) uint8, possibly a view into an RGBA buffer
+    alpha: np.ndarray | None  # (h, w) uint8, None when the file has no alpha
+
+
+def decode(path: str | Path) -> DecodedImage:
+    """Decode once; RGB files stay 3-channel, anything with transparency becomes RGBA."""
+    with Image.open(path) as img:
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        if img.mode == "RGBA" or (img.mode == "RGB" and not has_alpha):
+            img.load()
+            arr = np.asarray(img)
+        else:
+            arr = np.asarray(img.convert("RGBA" if has_alpha else "RGB"))
+    h, w = arr.shape[:2]
+    return DecodedImage(str(path), w, h, arr[..., :3], arr[..., 3] if has_alpha else None)
+
+
+# ============================================================================
+# Checks
+# ============================================================================
+CheckFn = Callable[[DecodedImage], "tuple[bool, dict]"]
+CHECKS: dict[str, CheckFn] = {}
+
+
+def check(name: str) -> Callable[[CheckFn], CheckFn]:
+    def register(fn: CheckFn) -> CheckFn:
+        CHECKS[name] = fn
+        return fn
+
+    return register
+
+
+def border_bands(img: DecodedImage, width: int = BORDER_PX) -> list[tuple[slice, slice]]:
+    """(rows, cols) slices covering the outer ring once: full top/bottom bands, then the sides between."""
+    h, w = img.height, img.width
+    b = max(1, min(width, h // 2, w // 2))
+    return [
+        (slice(0, b), slice(0, w)),
+        (slice(h - b, h), slice(0, w)),
+        (slice(b, h - b), slice(0, b)),
+        (slice(b, h - b), slice(w - b, w)),
+    ]
+
+
+def _ring(a: np.ndarray, bands: list[tuple[slice, slice]]) -> np.ndarray:
+    """Border pixels of an (h, w[, c]) array, flattened to (n[, c])."""
+    return np.concatenate([a[r, c].reshape(-1, *a.shape[2:]) for r, c in bands])
+
+
+def _visible_ring(img: DecodedImage, bands: list[tuple[slice, slice]]) -> np.ndarray:
+    rgb = _ring(img.rgb, bands)
+    if img.alpha is None:
+        return rgb
+    return rgb[_ring(img.alpha, bands) >= ALPHA_VISIBLE]
+
+
+@check("size")
+def check_size(img: DecodedImage) -> tuple[bool, dict]:
+    square = img.width == img.height
+    return not square, {"square": square}
+
+
+@check("margins")
+def check_margins(img: DecodedImage) -> tuple[bool, dict]:
+    margins = margins_from_rgb(img.rgb)
+    blank = is_blank(margins)
+    return blank, {"margins": margins, "blank": blank}
+
+
+def detect_checker(img: DecodedImage) -> tuple[int, float, float, int]:
+    """(block size, top-left brightness, next-block brightness, transitions) from the top row."""
+    row = img.rgb[0, : min(img.width, CHECKER_SAMPLE_PX)].astype(np.float32).mean(axis=1)
+    transitions = np.flatnonzero(np.abs(np.diff(row)) > CHECKER_EDGE_DIFF) + 1
+    block = CHECKER_DEFAULT_BLOCK
+    if transitions.size >= 2:
+        block = max(1, int(np.sort(np.diff(transitions))[(transitions.size - 1) // 2]))
+    nxt = min(block, img.width - 1)
+    return block, float(row[0]), float(img.rgb[0, nxt].astype(np.float32).mean()), int(transitions.size)
+
+
+@check("checkerboard")
+def check_checkerboard(img: DecodedImage) -> tuple[bool, dict]:
+    block, even, odd, transitions = detect_checker(img)
+    contrast = abs(odd - even)
+    matched = total = 0
+    for rows, cols in border_bands(img):
+        rgb = img.rgb[rows, cols].astype(np.int16)
+        if not rgb.size:
+            continue
+        ys, xs = np.ogrid[rows.start : rows.stop, cols.start : cols.stop]
+        expected = np.where(((ys // block) + (xs // block)) % 2 == 0, even, odd)
+        hi, lo = rgb.max(axis=2), rgb.min(axis=2)
+        grey = (hi - lo) <= CHECKER_MAX_SAT * np.maximum(hi, 1)
+        ok = grey & (np.abs(rgb.mean(axis=2) - expected) < CHECKER_TOLERANCE)
+        if img.alpha is not None:
+            ok |= img.alpha[rows, cols] < ALPHA_VISIBLE
+        matched += int(ok.sum())
+        total += ok.size
+    share = matched / total if total else 0.0
+    found = transitions >= 2 and contrast >= CHECKER_EDGE_DIFF and share >= CHECKER_MIN_MATCH
+    return found, {
+        "checkerboard": found,
+        "blockSize": block,
+        "levels": [round(min(even, odd)), round(max(even, odd))],
+        "borderMatch": round(share, 4),
+    }
+
+
+@check("background")
+def check_background(img: DecodedImage) -> tuple[bool, dict]:
+    ring = _visible_ring(img, border_bands(img))
+    if not len(ring):
+        return False, {"uniform": False, "color": None, "share": 0.0}
+    color = np.median(ring, axis=0)
+    near = (np.abs(ring.astype(np.int16) - color.astype(np.int16)) <= UNIFORM_TOLERANCE).all(axis=1)
+    share = float(near.mean())
+    uniform = share >= UNIFORM_MIN_SHARE
+    return uniform, {"uniform": uniform, "color": [int(c) for c in color], "share": round(share, 4)}
+
+
+@check("alpha")
+def check_alpha(img: DecodedImage) -> tuple[bool, dict]:
+    if img.alpha is None:
+        return False, {"hasAlpha": False, "visible": 1.0, "opaque": 1.0}
+    visible = float((img.alpha >= ALPHA_VISIBLE).mean())
+    opaque = float((img.alpha == 255).mean())
+    return visible < ALPHA_MIN_VISIBLE, {"hasAlpha": True, "visible": round(visible, 4), "opaque": round(opaque, 4)}
+
+
+DEFAULT_CHECKS = tuple(CHECKS)
+
+
+def parse_checks(spec: str) -> tuple[str, ...]:
+    names = tuple(n.strip() for n in spec.split(",") if n.strip())
+    unknown = [n for n in names if n not in CHECKS]
+    if unknown or not names:
+        raise ValueError(f"unknown checks: {', '.join(unknown) or '(none given)'}")
+    return names
+
+
+# ============================================================================
+# Runner integration
+# ============================================================================
+def audit_image(path: str, checks: tuple[str, ...] = DEFAULT_CHECKS) -> tuple[int, dict]:
+    p = Path(path)
+    if not p.exists():
+        return 1, {"path": str(p), "error": f"file not found: {p}"}
+    try:
+        img = decode(p)
+        results = {}
+        for name in checks:
+            flagged, fields = CHECKS[name](img)
+            results[name] = {**fields, "flagged": flagged}
+    except Exception as e:
+        return 1, {"path": str(p), "error": str(e)}
+    flagged = [name for name in checks if results[name]["flagged"]]
+    record = {"path": str(p), "size": {"w": img.width, "h": img.height}, "checks": results, "flagged": flagged}
+    return (2 if flagged else 0), record
+
+
+def audit_check(checks: tuple[str, ...]) -> Callable[[str], "tuple[int, dict]"]:
+    # partial() of a module-level function stays picklable for the pool.
+    return partial(audit_image, checks=checks)
+
+
+def cache_name(checks: tuple[str, ...]) -> str:
+    """Audit-cache key: "audit" for the full set, "audit:<names>" for a subset."""
+    return "audit" if checks == DEFAULT_CHECKS else "audit:" + ",".join(checks)
@@ -0,0 +1,265 @@
+"""
+Responsive WebP/AVIF derivatives for the race portraits and glossary images.
+
+The portraits are 1024-square PNGs, and character creation and the glossary
+(whose race entries point at the same files) load them full size even where
+they render thumbnails. build() writes downscaled variants beside, never over,
+the originals:
+
+  public/assets/images/races/Kenku_Male.png
+  public/assets/images/derived/races/Kenku_Male-256.webp   (and -128, -512, .avif)
+
+Only images that pass the square and margin audits (image_audit.py, answered
+from the audit cache when unchanged) get variants. Work is spread over a
+process pool: one decode per source, every size and format from that decode.
+
+public/assets/images/derived/manifest.json maps each source (public-relative,
+as the app references it) to its sha256, dimensions, bytes and variants:
+
+  {"version": 1, "settings": "...", "sources": {"assets/images/races/Kenku_Male.png": {
+     "sha256": "...", "width": 1024, "height": 1024, "bytes": 1480000,
+     "variants": [{"path": "assets/images/derived/races/Kenku_Male-256.webp",
+                   "format": "webp", "width": 256, "height": 256, "bytes": 9800}, ...]}}}
+
+A source is skipped when the repo scanner reports its stat unchanged, or when
+its sha256 still matches the manifest, provided the settings are the same and
+every variant file exists. Sources under the scanned directories that
+disappear or stop passing the audits have their variants removed; entries for
+directories outside this run are left alone.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, features
+
+from audit_cache import AuditCache
+from audit_runner import run_cached
+from image_audit import audit_check, cache_name
+from repo_scan import RepoScanner
+
+
+ROOT = Path(__file__).resolve().parents[2]
+PUBLIC = ROOT / "public"
+IMAGES = PUBLIC / "assets" / "images"
+DEFAULT_SOURCES = (IMAGES / "races",)
+DERIVED = IMAGES / "derived"
+MANIFEST = DERIVED / "manifest.json"
+
+MANIFEST_VERSION = 1
+SOURCE_SUFFIXES = (".png", ".jpg", ".jpeg")
+AUDIT_CHECKS = ("size", "margins")
+
+DEFAULT_SIZES = (128, 256, 512)
+DEFAULT_FORMATS = ("webp", "avif")
+SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 55, "speed": 6},
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    sizes: tuple[int, ...] = DEFAULT_SIZES
+    formats: tuple[str, ...] = DEFAULT_FORMATS
+
+    def fingerprint(self) -> str:
+        options = {f: SAVE_OPTIONS[f] for f in self.formats}
+        return json.dumps({"sizes": self.sizes, "formats": self.formats, "options": options}, sort_keys=True)
+
+
+def available_formats(formats: tuple[str, ...]) -> tuple[str, ...]:
+    """Drop encoders this Pillow build lacks (AVIF needs Pillow >= 11.2 or pillow-avif-plugin)."""
+    return tuple(f for f in formats if f in SAVE_OPTIONS and features.check(f))
+
+
+def public_rel(path: Path) -> str:
+    return path.resolve().relative_to(PUBLIC).as_posix()
+
+
+def variant_path(src: Path, width: int, fmt: str) -> Path:
+    rel = src.resolve().relative_to(IMAGES)
+    return DERIVED / rel.parent / f"{rel.stem}-{width}.{fmt}"
+
+
+def _temp_beside(dst: Path) -> Path:
+    # Not mkstemp: variants and the manifest are served from public/ and need
+    # the usual umask permissions rather than mkstemp's owner-only mode.
+    return dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _write_atomic(img: Image.Image, dst: Path, fmt: str) -> int:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_beside(dst)
+    try:
+        with open(tmp, "xb") as f:
+            img.save(f, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return dst.stat().st_size
+
+
+def render(src: str, sizes: tuple[int, ...], formats: tuple[str, ...]) -> dict:
+    """Pool worker: decode once, then every (size, format) variant. Sizes at or above the source are skipped."""
+    path = Path(src)
+    with Image.open(path) as img:
+        img.load()
+        width, height = img.size
+        mode = "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+        base = img.convert(mode) if img.mode != mode else img.copy()
+    variants = []
+    # Largest first, each step resized from the previous one: cheaper than
+    # resampling the full source every time, and indistinguishable at these ratios.
+    current = base
+    for w in sorted((s for s in sizes if s < width), reverse=True):
+        h = max(1, round(height * w / width))
+        current = current.resize((w, h), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            dst = variant_path(path, w, fmt)
+            size = _write_atomic(current, dst, fmt)
+            variants.append({"path": public_rel(dst), "format": fmt, "width": w, "height": h, "bytes": size})
+    return {"width": width, "height": height, "variants": variants}
+
+
+class DerivativeManifest:
+    def __init__(self, path: Path = MANIFEST):
+        self.path = Path(path)
+        self.settings = ""
+        self.sources: dict[str, dict] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.settings = data.get("settings", "")
+            self.sources = data.get("sources", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "settings": self.settings, "sources": dict(sorted(self.sources.items()))}
+        tmp = _temp_beside(self.path)
+        with open(tmp, "x", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+def _variants_present(entry: dict) -> bool:
+    return all((PUBLIC / v["path"]).is_file() for v in entry.get("variants", []))
+
+
+def _drop(entry: dict) -> None:
+    for v in entry.get("variants", []):
+        try:
+            (PUBLIC / v["path"]).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def build(
+    sources: tuple[Path, ...] = DEFAULT_SOURCES,
+    settings: Settings = Settings(),
+    jobs: int | None = None,
+    cache: AuditCache | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    log=print,
+) -> dict:
+    settings = Settings(settings.sizes, available_formats(settings.formats))
+    manifest = DerivativeManifest()
+    scanner = RepoScanner("image-derivatives")
+    fingerprint = settings.fingerprint()
+    same_settings = manifest.settings == fingerprint and not force
+
+    scanned = scanner.scan(*sources, suffixes=SOURCE_SUFFIXES)
+    changed = set(scanned.changed)
+    files = {public_rel(Path(f.path)): f for f in scanned.files.values()}
+
+    # Gate on the audits; the audit cache answers unchanged files without decoding.
+    passing: set[str] = set()
+    failed: list[str] = []
+    check = audit_check(AUDIT_CHECKS)
+    for code, record in run_cached(cache_name(AUDIT_CHECKS), check, [f.path for f in files.values()], jobs, cache):
+        rel = public_rel(Path(record["path"]))
+        (passing.add if code == 0 else failed.append)(rel)
+
+    todo: list[tuple[str, str]] = []
+    skipped = 0
+    for rel in sorted(passing):
+        f = files[rel]
+        entry = manifest.sources.get(rel)
+        if same_settings and entry and _variants_present(entry):
+            if f.rel not in changed:
+                skipped += 1
+                continue
+            sha = scanner.sha256(f.rel)
+            if entry.get("sha256") == sha:
+                skipped += 1
+                continue
+        todo.append((rel, f.rel))
+
+    # Only sources under this run's roots can go stale; other directories keep their variants.
+    roots = [public_rel(Path(src)) + "/" for src in sources]
+    stale = [rel for rel in manifest.sources if rel.startswith(tuple(roots)) and rel not in passing]
+    summary = {"sources": len(files), "failedAudit": len(failed), "skipped": skipped, "built": len(todo),
+               "removed": len(stale), "formats": list(settings.formats), "sizes": list(settings.sizes)}
+    log(f"{len(files)} sources: {len(todo)} to build, {skipped} unchanged, {len(failed)} failed audits, "
+        f"{len(stale)} stale")
+    if dry_run:
+        return summary
+
+    for rel in stale:
+        _drop(manifest.sources.pop(rel))
+
+    jobs = jobs or os.cpu_count() or 1
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            futures = {
+                pool.submit(render, files[rel].path, settings.sizes, settings.formats): (rel, scan_rel)
+                for rel, scan_rel in todo
+            }
+            for fut in as_completed(futures):
+                rel, scan_rel = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    log(f"  error {rel}: {e}")
+                    # Forget the stat so the next run retries instead of trusting old variants.
+                    scanner.files.pop(scan_rel, None)
+                    scanner.dirty = True
+                    continue
+                old = manifest.sources.get(rel)
+                keep = {v["path"] for v in result["variants"]}
+                if old:
+                    _drop({"variants": [v for v in old.get("variants", []) if v["path"] not in keep]})
+                manifest.sources[rel] = {
+                    "sha256": scanner.sha256(scan_rel),
+                    "width": result["width"],
+                    "height": result["height"],
+                    "bytes": files[rel].size,
+                    "variants": result["variants"],
+                }
+
+    manifest.settings = fingerprint
+    manifest.save()
+    scanner.save()
+    if cache is not None:
+        cache.save()
+
+    totals: dict[str, int] = {}
+    for e in manifest.sources.values():
+        for v in e["variants"]:
+            key = f"{v['format']}-{v['width']}"
+            totals[key] = totals.get(key, 0) + v["bytes"]
+    summary["originalBytes"] = sum(e["bytes"] for e in manifest.sources.values())
+    summary["variantBytes"] = dict(sorted(totals.items()))
+    return summary
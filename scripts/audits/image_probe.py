@@ -0,0 +1,112 @@
+"""
+Header-only image dimension probing.
+
+A squareness check needs width and height, not pixels. PNG keeps both in the
+IHDR chunk at a fixed offset, GIF in the logical screen descriptor, WebP in the
+first VP8/VP8L/VP8X chunk, and JPEG in its SOFn segment. Reading those few
+bytes keeps directory scans bounded by file open time; anything this module
+cannot parse falls back to PIL (which still only reads the header on open).
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# SOF0..SOF15 carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but do not.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class ProbeError(ValueError):
+    pass
+
+
+def _png_size(head: bytes) -> tuple[int, int] | None:
+    if head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def _gif_size(head: bytes) -> tuple[int, int] | None:
+    if head[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+    return struct.unpack("<HH", head[6:10])
+
+
+def _webp_size(head: bytes) -> tuple[int, int] | None:
+    if head[:4] != b"RIFF" or head[8:12] != b"WEBP":
+        return None
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        w, h = struct.unpack("<HH", head[26:30])
+        return w & 0x3FFF, h & 0x3FFF
+    if chunk == b"VP8L" and head[20:21] == b"\x2f":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        w = int.from_bytes(head[24:27], "little") + 1
+        h = int.from_bytes(head[27:30], "little") + 1
+        return w, h
+    return None
+
+
+def _jpeg_size(f: BinaryIO, head: bytes) -> tuple[int, int] | None:
+    if head[:2] != b"\xff\xd8":
+        return None
+    f.seek(2)
+    while True:
+        b = f.read(1)
+        # Skip fill bytes between segments.
+        while b == b"\xff":
+            b = f.read(1)
+        if not b:
+            return None
+        marker = b[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # standalone markers carry no length
+        if marker == 0xD9:
+            return None
+        seg_len = f.read(2)
+        if len(seg_len) != 2:
+            return None
+        (length,) = struct.unpack(">H", seg_len)
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) != 5:
+                return None
+            h, w = struct.unpack(">HH", data[1:5])
+            return w, h
+        f.seek(length - 2, 1)
+        # Resync to the next marker prefix.
+        nxt = f.read(1)
+        if nxt != b"\xff":
+            return None
+        f.seek(-1, 1)
+
+
+def probe_header(path: str | Path) -> tuple[int, int] | None:
+    """Return (w, h) from the file header alone, or None if the format is not handled."""
+    with open(path, "rb") as f:
+        head = f.read(32)
+        for parse in (_png_size, _webp_size, _gif_size):
+            size = parse(head)
+            if size is not None:
+                return size
+        return _jpeg_size(f, head)
+
+
+def probe_size(path: str | Path) -> tuple[int, int]:
+    """Header probe with a PIL fallback for formats probe_header() cannot parse."""
+    size = probe_header(path)
+    if size is not None:
+        return size
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ProbeError(f"unrecognized image header (and PIL unavailable): {path}") from e
+    with Image.open(path) as im:
+        return im.size
@@ -1,9 +1,20 @@
 #!/usr/bin/env python3
+"""
+List race portraits under public/assets/images/races that are not 1:1.
+
+Sizes come from the file headers (image_probe.py) through audit_runner;
+unreadable files are skipped. Pass --jobs N to use a process pool. Unchanged
+files are answered from the audit cache unless --no-cache is given.
+"""
+
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 
-from PIL import Image
+from audit_cache import DEFAULT_CACHE, AuditCache
+from audit_runner import check_square, run_cached
+from repo_scan import walk
 
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -11,15 +22,20 @@ RACES_DIR = ROOT / "public" / "assets" / "images" / "races"
 
 
 def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=1)
+    ap.add_argument("--cache", default=str(DEFAULT_CACHE))
+    ap.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+
+    cache = None if args.no_cache else AuditCache(Path(args.cache))
+
+    paths = [f.path for f in walk(RACES_DIR, suffixes=(".png",), recursive=False)]
     bad: list[tuple[Path, int, int]] = []
-    for p in sorted(RACES_DIR.glob("*.png")):
-        try:
-            im = Image.open(p)
-            w, h = im.size
-            if w != h:
-                bad.append((p, w, h))
-        except Exception:
-            continue
+    for code, record in run_cached("square", check_square, paths, args.jobs, cache):
+        if code == 2:
+            bad.append((Path(record["path"]), record["size"]["w"], record["size"]["h"]))
+    bad.sort()
 
     print(f"non_square: {len(bad)}")
     for p, w, h in bad:
@@ -29,4 +45,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Print the shared race index (see race_index.py), refreshing it first.
+
+Usage: python scripts/audits/list-race-index.py [--variants] [--duplicates] [--json]
+
+Exit codes:
+  0: ok
+  2: --duplicates found at least one conflicting name or id
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import asdict
+
+from race_index import load_race_index
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", action="store_true", help="include lineages/ancestries, not just races")
+    ap.add_argument("--duplicates", action="store_true", help="only report conflicting names and ids")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    index = load_race_index()
+
+    if args.duplicates:
+        dupes = index.duplicates()
+        if args.json:
+            print(json.dumps({k: [asdict(e) for e in v] for k, v in dupes.items()}, indent=2))
+        else:
+            print(f"duplicates: {len(dupes)}")
+            for key, entries in sorted(dupes.items()):
+                for e in entries:
+                    print(f"{key}\t{e.id}\t{e.name}\t{e.kind}\t{e.source}:{e.line}")
+        return 2 if dupes else 0
+
+    entries = sorted(index.entries(), key=lambda e: (e.kind, e.id))
+    if not args.variants:
+        entries = [e for e in entries if e.kind == "race"]
+    if args.json:
+        print(json.dumps([asdict(e) for e in entries], indent=2))
+        return 0
+    print(f"entries: {len(entries)}")
+    for e in entries:
+        print(f"{e.kind}\t{e.id}\t{e.name}\t{e.source}:{e.line}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index of the race portraits (see phash_index.py).
+
+Usage:
+  python scripts/audits/phash-index.py update [--radius 8] [--jobs N] [--all] [--json]
+  python scripts/audits/phash-index.py dupes [--radius 8] [--json]
+  python scripts/audits/phash-index.py check <path|dir|glob> [...] [--radius 8] [--jobs N] [--json]
+
+`update` hashes only new or modified portraits and reports near-duplicates that
+involve them (every pair with --all), plus modified portraits that barely
+changed. `dupes` lists every near-duplicate pair in the index. `check` compares
+images outside the index (a regen batch) against it and each other. `update`
+and `check` also list flat (blank or solid-fill) images, which have nothing to
+hash and are never matched.
+
+Exit codes: 0 nothing found, 2 near-duplicates, unchanged regenerations or flat
+images, 1 error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from audit_runner import IMAGE_SUFFIXES, expand_targets
+from phash_index import DEFAULT_RADIUS, PhashIndex, check_batch
+
+
+def print_collisions(collisions: list[dict]) -> None:
+    for c in collisions:
+        print(f"near\t{c['kind']}\tphash={c['phash']}\tdhash={c['dhash']}\t{c['a']}\t{c['b']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("update", "dupes", "check"):
+        p = sub.add_parser(name)
+        p.add_argument("--radius", type=int, default=DEFAULT_RADIUS, help="max pHash Hamming distance (of 64)")
+        p.add_argument("--json", action="store_true")
+        if name != "dupes":
+            p.add_argument("--jobs", type=int)
+        if name == "update":
+            p.add_argument("--all", action="store_true", help="report every pair, not just changed files")
+        if name == "check":
+            p.add_argument("targets", nargs="+")
+    args = ap.parse_args()
+
+    index = PhashIndex()
+    if args.cmd == "check":
+        index.refresh(args.jobs, args.radius)
+        index.save()
+        paths = [p for p in expand_targets(args.targets) if p.lower().endswith(IMAGE_SUFFIXES)]
+        report = check_batch(paths, index, args.radius, args.jobs)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(
+                f"checked: {len(paths)}  collisions: {len(report['collisions'])}  "
+                f"unchanged: {len(report['unchanged'])}  flat: {len(report['flat'])}"
+            )
+            print_collisions(report["collisions"])
+            for u in report["unchanged"]:
+                print(f"unchanged\tphash={u['phash']}\t{u['path']}\t{u['previous']}")
+            for f in report["flat"]:
+                print(f"flat\t{f}")
+            for e in report["errors"]:
+                print(f"error\t{e['path']}\t{e['error']}")
+        if report["errors"]:
+            return 1
+        return 2 if report["collisions"] or report["unchanged"] or report["flat"] else 0
+
+    if args.cmd == "dupes":
+        index.refresh(radius=args.radius)
+        index.save()
+        collisions = [c.to_json() for c in index.duplicates(args.radius)]
+        if args.json:
+            print(json.dumps({"indexed": len(index.files), "collisions": collisions}, indent=2))
+        else:
+            print(f"indexed: {len(index.files)}  collisions: {len(collisions)}")
+            print_collisions(collisions)
+        return 2 if collisions else 0
+
+    result = index.refresh(args.jobs, args.radius)
+    index.save()
+    collisions = [c.to_json() for c in index.duplicates(args.radius, None if args.all else result.hashed)]
+    if args.json:
+        print(json.dumps({
+            "indexed": len(index.files),
+            "hashed": result.hashed,
+            "removed": result.removed,
+            "errors": result.errors,
+            "barelyChanged": result.barely_changed,
+            "flat": result.flat,
+            "collisions": collisions,
+        }, indent=2))
+    else:
+        print(
+            f"indexed: {len(index.files)}  hashed: {len(result.hashed)}  removed: {len(result.removed)}  "
+            f"collisions: {len(collisions)}  barely_changed: {len(result.barely_changed)}  flat: {len(result.flat)}"
+        )
+        print_collisions(collisions)
+        for b in result.barely_changed:
+            print(f"barely_changed\tphash={b['phash']}\t{b['path']}")
+        for f in result.flat:
+            print(f"flat\t{f}")
+        for e in result.errors:
+            print(f"error\t{e['path']}\t{e['error']}")
+    if result.errors:
+        return 1
+    return 2 if collisions or result.barely_changed or result.flat else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,358 @@
+"""
+Perceptual-hash index of the race portraits, for near-duplicate detection.
+
+Every image gets two 64-bit hashes computed with NumPy from one small grey
+thumbnail decode:
+
+  dhash  9x8 thumbnail, one bit per "left pixel brighter than its neighbour"
+  phash  32x32 thumbnail, 2-D DCT-II, the 8x8 low-frequency block compared
+         against its median (DC term excluded)
+
+A flat image (blank or a solid fill) has no AC energy to threshold: every
+coefficient but DC is floating-point noise, so its bits would be arbitrary.
+Such images get no hashes; they are indexed as {"flat": true}, never matched,
+and reported separately.
+
+Two images are near-duplicates when their pHash Hamming distance is within the
+radius (default 8 of 64 bits) and their dHash agrees within twice that;
+candidates come from a BK-tree over pHash, so a lookup visits a small part of
+the index instead of every pair.
+
+The index lives in .agent/cache/phash-index.json and is refreshed through
+repo_scan.RepoScanner: only new or modified files are decoded. A modified file
+whose new pHash sits within the radius of its previous one is reported as a
+regeneration that barely changed.
+
+check_batch() answers the question the regen queue asks after each run: do any
+freshly generated images collide with existing portraits of another race or
+gender, with each other, or with the portrait they were meant to replace?
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+from PIL import Image
+
+from audit_runner import IMAGE_SUFFIXES, run_batch
+from race_index import norm
+from repo_scan import RepoScanner, manifest_name
+
+
+ROOT = Path(__file__).resolve().parents[2]
+RACES_DIR = ROOT / "public" / "assets" / "images" / "races"
+DEFAULT_INDEX = ROOT / ".agent" / "cache" / "phash-index.json"
+
+INDEX_VERSION = 2
+DEFAULT_RADIUS = 8
+GENDERS = ("male", "female")
+
+PHASH_THUMB = 32
+PHASH_BLOCK = 8
+# Largest |AC| coefficient below which an image counts as flat. A solid fill
+# measures ~1e-13, +-2 levels of sensor-style noise ~0.3, a faint 5-level
+# gradient ~45; real portraits are in the hundreds.
+FLAT_AC_EPSILON = 4.0
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+_DCT = _dct_matrix(PHASH_THUMB)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(grey: Image.Image) -> int:
+    a = np.asarray(grey.resize((9, 8), Image.Resampling.BILINEAR), dtype=np.int16)
+    return _bits_to_int(a[:, :-1] > a[:, 1:])
+
+
+def phash(grey: Image.Image) -> int | None:
+    """pHash of a grey thumbnail, or None when the image is flat (see FLAT_AC_EPSILON)."""
+    a = np.asarray(grey.resize((PHASH_THUMB, PHASH_THUMB), Image.Resampling.BILINEAR), dtype=np.float64)
+    low = (_DCT @ a @ _DCT.T)[:PHASH_BLOCK, :PHASH_BLOCK]
+    ac = low.ravel()[1:]
+    if np.abs(ac).max() < FLAT_AC_EPSILON:
+        return None
+    return _bits_to_int(low > np.median(ac))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def hash_image(path: str) -> tuple[int, dict]:
+    """run_batch()-style check: (0, {"path", "dhash", "phash"}), (0, {"path", "flat": True}) or (1, {"path", "error"})."""
+    try:
+        with Image.open(path) as img:
+            # draft() lets JPEG decode at reduced scale; PNG ignores it.
+            img.draft("L", (PHASH_THUMB * 4, PHASH_THUMB * 4))
+            if "A" in img.getbands():
+                # Composite onto white so transparent sprites hash by their silhouette.
+                bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
+                img = Image.alpha_composite(bg, img.convert("RGBA"))
+            grey = img.convert("L").resize((PHASH_THUMB * 2, PHASH_THUMB * 2), Image.Resampling.BOX)
+    except Exception as e:
+        return 1, {"path": path, "error": str(e)}
+    p = phash(grey)
+    if p is None:
+        return 0, {"path": path, "flat": True}
+    return 0, {"path": path, "dhash": f"{dhash(grey):016x}", "phash": f"{p:016x}"}
+
+
+def index_entry(record: dict) -> dict:
+    """The stored form of a hash_image() result: {"dhash", "phash"} or {"flat": True}."""
+    if record.get("flat"):
+        return {"flat": True}
+    return {"dhash": record["dhash"], "phash": record["phash"]}
+
+
+def portrait_key(path: str | Path) -> tuple[str, str] | None:
+    """(normalized race, gender) from "<Race>_<Gender>.png" or the regen queue's "<raceId>_<gender>.png"."""
+    race, _, gender = Path(path).stem.rpartition("_")
+    gender = gender.lower()
+    return (norm(race), gender) if race and gender in GENDERS else None
+
+
+# ============================================================================
+# BK-tree
+# ============================================================================
+class BKTree:
+    """Metric tree over 64-bit hashes; search() prunes by the triangle inequality."""
+
+    def __init__(self):
+        self.root: list | None = None  # [hash, keys, {distance: child}]
+        self.size = 0
+
+    def add(self, h: int, key: str) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [h, [key], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(h, node[0])
+            if d == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [h, [key], {}]
+                return
+            node = child
+
+    def search(self, h: int, radius: int) -> Iterator[tuple[int, str]]:
+        """Yield (distance, key) for every stored hash within radius."""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            value, keys, children = stack.pop()
+            d = hamming(h, value)
+            if d <= radius:
+                for key in keys:
+                    yield d, key
+            for cd, child in children.items():
+                if d - radius <= cd <= d + radius:
+                    stack.append(child)
+
+
+# ============================================================================
+# Index
+# ============================================================================
+@dataclass
+class Collision:
+    a: str
+    b: str
+    phash: int
+    dhash: int
+    kind: str  # "cross-race" | "cross-gender" | "same-portrait" | "unknown"
+
+    def to_json(self) -> dict:
+        return {"a": self.a, "b": self.b, "phash": self.phash, "dhash": self.dhash, "kind": self.kind}
+
+
+@dataclass
+class RefreshResult:
+    hashed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+    # Hashed files that turned out flat, so they match nothing.
+    flat: list[str] = field(default_factory=list)
+    # Modified files whose new pHash is within the radius of the old one.
+    barely_changed: list[dict] = field(default_factory=list)
+
+
+def collision_kind(a: str, b: str) -> str:
+    ka, kb = portrait_key(a), portrait_key(b)
+    if ka is None or kb is None:
+        return "unknown"
+    if ka[0] != kb[0]:
+        return "cross-race"
+    return "cross-gender" if ka[1] != kb[1] else "same-portrait"
+
+
+class PhashIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX, sources: Iterable[Path] = (RACES_DIR,)):
+        self.path = Path(path)
+        self.sources = tuple(sources)
+        # repo-relative path -> {"dhash": hex, "phash": hex} or {"flat": True}
+        self.files: dict[str, dict] = {}
+        self.dirty = False
+        self.scanner = RepoScanner(manifest_name("phash-index", self.path, DEFAULT_INDEX))
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def refresh(self, jobs: int | None = None, radius: int = DEFAULT_RADIUS) -> RefreshResult:
+        """Hash new and modified images (in a process pool), drop deleted ones."""
+        scan = self.scanner.scan(*self.sources, suffixes=IMAGE_SUFFIXES)
+        result = RefreshResult()
+        # A file missing from the index is hashed even if the scanner has seen it.
+        todo = sorted(set(scan.changed) | {rel for rel in scan.files if rel not in self.files})
+        modified = set(scan.modified)
+        by_path = {scan.files[rel].path: rel for rel in todo}
+        for code, record in run_batch(hash_image, list(by_path), jobs):
+            rel = by_path[record["path"]]
+            if code != 0:
+                result.errors.append({"path": rel, "error": record["error"]})
+                # Forget the stat so the next refresh retries the file.
+                self.scanner.files.pop(rel, None)
+                self.scanner.dirty = True
+                continue
+            old = self.files.get(rel)
+            new = index_entry(record)
+            if new.get("flat"):
+                result.flat.append(rel)
+            elif old and not old.get("flat") and rel in modified:
+                d = hamming(int(old["phash"], 16), int(new["phash"], 16))
+                if d <= radius:
+                    result.barely_changed.append({"path": rel, "phash": d})
+            self.files[rel] = new
+            result.hashed.append(rel)
+            self.dirty = True
+        for rel in [r for r in self.files if r not in scan.files]:
+            del self.files[rel]
+            result.removed.append(rel)
+            self.dirty = True
+        return result
+
+    def save(self) -> None:
+        # Index first: the scanner only forgets the changes once they are stored.
+        if self.dirty:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": INDEX_VERSION, "files": dict(sorted(self.files.items()))}
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        self.scanner.save()
+
+    def key(self, path: str | Path) -> str:
+        """The key refresh() files path under: repo-relative when inside the scanned root."""
+        resolved = Path(path).resolve()
+        try:
+            return resolved.relative_to(self.scanner.root).as_posix()
+        except ValueError:
+            return resolved.as_posix()
+
+    def tree(self) -> BKTree:
+        tree = BKTree()
+        for rel, h in self.files.items():
+            if not h.get("flat"):
+                tree.add(int(h["phash"], 16), rel)
+        return tree
+
+    def near(self, tree: BKTree, key: str, h: dict, radius: int = DEFAULT_RADIUS) -> list[Collision]:
+        """Indexed images near hash h (pHash within radius, dHash within 2 * radius), excluding key itself."""
+        if h.get("flat"):
+            return []
+        out = []
+        d_h = int(h["dhash"], 16)
+        for dp, other in tree.search(int(h["phash"], 16), radius):
+            if other == key:
+                continue
+            dd = hamming(d_h, int(self.files[other]["dhash"], 16))
+            if dd <= 2 * radius:
+                out.append(Collision(key, other, dp, dd, collision_kind(key, other)))
+        return sorted(out, key=lambda c: (c.phash, c.b))
+
+    def duplicates(self, radius: int = DEFAULT_RADIUS, only: Iterable[str] | None = None) -> list[Collision]:
+        """Near-duplicate pairs, each reported once; `only` limits the query side (e.g. just-hashed files)."""
+        tree = self.tree()
+        seen: set[tuple[str, str]] = set()
+        out = []
+        for key in sorted(only if only is not None else self.files):
+            for c in self.near(tree, key, self.files[key], radius):
+                pair = tuple(sorted((c.a, c.b)))
+                if pair not in seen:
+                    seen.add(pair)
+                    out.append(c)
+        return out
+
+
+def check_batch(
+    paths: list[str], index: PhashIndex, radius: int = DEFAULT_RADIUS, jobs: int | None = None
+) -> dict:
+    """
+    Compare freshly generated images against the index and each other.
+
+    Returns {"collisions": [...], "unchanged": [...], "flat": [...], "errors": [...]}:
+    collisions pair a new image with an indexed portrait of a different
+    race/gender or with another new image; "unchanged" lists new images that
+    sit within the radius of the portrait they replace; "flat" lists new
+    images with no content to hash (blank or solid fills), which are not
+    compared at all. Paths are reported as index keys (see PhashIndex.key()),
+    so an absolute path to an indexed portrait is recognised as that portrait.
+    """
+    tree = index.tree()
+    batch = BKTree()
+    hashes: dict[str, dict] = {}
+    report: dict[str, list] = {"collisions": [], "unchanged": [], "flat": [], "errors": []}
+    for code, record in run_batch(hash_image, paths, jobs):
+        path = record["path"]
+        if code != 0:
+            report["errors"].append({"path": path, "error": record["error"]})
+            continue
+        rel = index.key(path)
+        if record.get("flat"):
+            report["flat"].append(rel)
+            continue
+        if rel in hashes:
+            continue  # the same file named twice
+        h = index_entry(record)
+        hashes[rel] = h
+        key = portrait_key(rel)
+        for c in index.near(tree, rel, h, radius):
+            if key and portrait_key(c.b) == key:
+                report["unchanged"].append({"path": rel, "previous": c.b, "phash": c.phash, "dhash": c.dhash})
+            else:
+                report["collisions"].append(c.to_json())
+        p_h, d_h = int(h["phash"], 16), int(h["dhash"], 16)
+        for dp, other in batch.search(p_h, radius):
+            dd = hamming(d_h, int(hashes[other]["dhash"], 16))
+            if dd <= 2 * radius:
+                report["collisions"].append(Collision(rel, other, dp, dd, collision_kind(rel, other)).to_json())
+        batch.add(p_h, rel)
+    return report
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Query the append-only race-image-status log through its offset index.
+
+Usage:
+  python scripts/audits/race-status-query.py [--race ID] [--gender G] [--category C]
+      [--since ISO] [--until ISO] [--limit N] [--json]
+  python scripts/audits/race-status-query.py --migrate [--force]
+
+--migrate converts public/assets/images/races/race-image-status.json into
+race-image-status.jsonl (ordered by downloadedAt). Queries only read the lines
+whose offsets match, so their cost follows the result size, not the history.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from race_status_log import STATUS_JSON, STATUS_LOG, load_status_index, migrate, read_at
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--status", default=str(STATUS_JSON))
+    ap.add_argument("--log", default=str(STATUS_LOG))
+    ap.add_argument("--migrate", action="store_true")
+    ap.add_argument("--force", action="store_true", help="with --migrate: rebuild an existing log")
+    ap.add_argument("--race")
+    ap.add_argument("--gender")
+    ap.add_argument("--category")
+    ap.add_argument("--since", help="inclusive ISO-8601 lower bound on downloadedAt")
+    ap.add_argument("--until", help="inclusive ISO-8601 upper bound on downloadedAt")
+    ap.add_argument("--limit", type=int, default=0, help="keep only the last N matches")
+    ap.add_argument("--json", action="store_true", help="print full entries as JSON lines")
+    args = ap.parse_args()
+
+    log = Path(args.log)
+    if args.migrate:
+        try:
+            n = migrate(Path(args.status), log, force=args.force)
+        except FileExistsError as e:
+            raise SystemExit(str(e))
+        print(f"migrated: {n} entries -> {log}")
+        return 0
+
+    if not log.exists():
+        raise SystemExit(f"missing: {log} (run with --migrate first)")
+
+    index = load_status_index(log)
+    offsets = index.query(args.race, args.gender, args.category, args.since, args.until)
+    if args.limit > 0:
+        offsets = offsets[-args.limit :]
+    for e in read_at(offsets, log):
+        if args.json:
+            print(json.dumps(e, ensure_ascii=False))
+        else:
+            print(
+                f"{e.get('downloadedAt')}\t{e.get('race')}\t{e.get('gender')}\t{e.get('category')}\t{e.get('imagePath')}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
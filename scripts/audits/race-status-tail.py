@@ -2,7 +2,10 @@
 """
 Print recent race-image-status entries (ignoring entries missing race/gender).
 
-This is mainly to help resume long image-regeneration batches.
+This is mainly to help resume long image-regeneration batches. When the
+append-only log (race-image-status.jsonl, see race_status_log.py) exists, only
+the end of it is read, so the cost does not grow with the history; otherwise the
+legacy {"entries": [...]} document is parsed and sorted.
 """
 
 from __future__ import annotations
@@ -11,27 +14,28 @@ import argparse
 import json
 from pathlib import Path
 
+from race_status_log import is_resumable, tail_entries
+
 
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--path", default="public/assets/images/races/race-image-status.json")
+    ap.add_argument("--log", default=None, help="JSONL log (default: --path with a .jsonl suffix)")
     ap.add_argument("--n", type=int, default=25)
     args = ap.parse_args()
 
     p = Path(args.path)
-    if not p.exists():
-        raise SystemExit(f"missing: {p}")
-
-    j = json.loads(p.read_text(encoding="utf-8"))
-    entries = j.get("entries", [])
-    filtered = [
-        e
-        for e in entries
-        if isinstance(e, dict) and e.get("race") and e.get("gender") and e.get("downloadedAt")
-    ]
-    filtered.sort(key=lambda e: str(e.get("downloadedAt")))
-
-    tail = filtered[-max(args.n, 0) :]
+    log = Path(args.log) if args.log else p.with_suffix(".jsonl")
+    if log.exists():
+        tail = tail_entries(max(args.n, 0), log)
+    else:
+        if not p.exists():
+            raise SystemExit(f"missing: {p}")
+        j = json.loads(p.read_text(encoding="utf-8"))
+        filtered = [e for e in j.get("entries", []) if is_resumable(e)]
+        filtered.sort(key=lambda e: str(e.get("downloadedAt")))
+        tail = filtered[-max(args.n, 0) :] if args.n > 0 else []
+
     for e in tail:
         print(
             f"{e.get('downloadedAt')}\t{e.get('race')}\t{e.get('gender')}\t{e.get('category')}\t{e.get('imagePath')}"
@@ -41,4 +45,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
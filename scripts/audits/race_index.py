@@ -0,0 +1,170 @@
+"""
+Persistent index of the races defined in src/data/races/*.ts.
+
+Every `id: '...'` immediately followed by a `name: '...'` is recorded, not just
+the first pair in a file: the pair opening an `export const X: Race = {`
+declaration is the file's race ("race"), any other pair is a lineage, ancestry
+or other nested variant ("variant"). The index lives in a compact JSON file and
+is refreshed incrementally through repo_scan.RepoScanner: only race files the
+scanner reports as added or modified are re-parsed, and entries for deleted
+files are dropped.
+
+Shared by list-backlog-progress.py and the other portrait tooling so that
+raceName -> raceId resolution is a single index load.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from repo_scan import RepoScanner, manifest_name
+
+
+ROOT = Path(__file__).resolve().parents[2]
+RACES_DIR = ROOT / "src" / "data" / "races"
+DEFAULT_INDEX = ROOT / ".agent" / "cache" / "race-index.json"
+
+INDEX_VERSION = 1
+
+# Aggregators and shared trait tables, not race definitions.
+SKIP_FILES = ("index.ts", "raceGroups.ts", "racialTraits.ts")
+
+ID_RE = re.compile(r"^(\s*)id:\s*(['\"])(.*?)(?<!\\)\2")
+NAME_RE = re.compile(r"^(\s*)name:\s*(['\"])(.*?)(?<!\\)\2")
+RACE_DECL_RE = re.compile(r"^export\s+const\s+\w+\s*:\s*Race\s*=\s*\{")
+
+
+def norm(s: str) -> str:
+    return "".join(ch for ch in (s or "").lower() if ch.isalnum())
+
+
+@dataclass(frozen=True)
+class RaceEntry:
+    id: str
+    name: str
+    norm: str
+    source: str
+    line: int
+    kind: str  # "race" | "variant"
+
+
+def parse_race_entries(text: str, source: str) -> list[RaceEntry]:
+    lines = text.splitlines()
+    entries: list[RaceEntry] = []
+    pending_decl = False
+    for i, line in enumerate(lines):
+        if RACE_DECL_RE.match(line):
+            pending_decl = True
+            continue
+        m_id = ID_RE.match(line)
+        if not m_id:
+            continue
+        # The name sits on the next property line at the same indentation.
+        m_name = NAME_RE.match(lines[i + 1]) if i + 1 < len(lines) else None
+        if not m_name or m_name.group(1) != m_id.group(1):
+            continue
+        rid, rname = m_id.group(3), m_name.group(3).replace("\\'", "'").replace('\\"', '"')
+        entries.append(RaceEntry(rid, rname, norm(rname), source, i + 1, "race" if pending_decl else "variant"))
+        pending_decl = False
+    return entries
+
+
+class RaceIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX, races_dir: Path = RACES_DIR):
+        self.path = Path(path)
+        self.races_dir = Path(races_dir)
+        # source (repo-relative) -> {"size", "mtime_ns", "entries": [...]}
+        self.files: dict[str, dict] = {}
+        self.dirty = False
+        self.scanner = RepoScanner(manifest_name("race-index", self.path, DEFAULT_INDEX))
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def refresh(self) -> int:
+        """Re-parse changed race files; returns the number of files re-parsed."""
+        scan = self.scanner.scan(self.races_dir, suffixes=(".ts",), recursive=False)
+        # FileStat.rel is repo-relative like the index's source keys.
+        current = {rel: f for rel, f in scan.files.items() if rel.rsplit("/", 1)[-1] not in SKIP_FILES}
+        changed = set(scan.changed)
+        reparsed = 0
+        for source, f in current.items():
+            # The scanner manifest and this index are separate files; a source
+            # missing here is re-parsed even if the scanner has already seen it.
+            if source not in changed and source in self.files:
+                continue
+            try:
+                text = Path(f.path).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            self.files[source] = {
+                "size": f.size,
+                "mtime_ns": f.mtime_ns,
+                "entries": [asdict(e) for e in parse_race_entries(text, source)],
+            }
+            reparsed += 1
+        for source in [s for s in self.files if s not in current]:
+            del self.files[source]
+            self.dirty = True
+        if reparsed:
+            self.dirty = True
+        return reparsed
+
+    def save(self) -> None:
+        # Index first: the scanner only forgets the changes once they are stored.
+        if self.dirty:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": INDEX_VERSION, "files": dict(sorted(self.files.items()))}
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        self.scanner.save()
+
+    def entries(self) -> list[RaceEntry]:
+        return [RaceEntry(**e) for f in self.files.values() for e in f["entries"]]
+
+    def name_to_id(self) -> dict[str, str]:
+        """Normalized name -> race id; race declarations win over nested variants."""
+        out: dict[str, str] = {}
+        for e in sorted(self.entries(), key=lambda e: (e.kind != "race", e.source, e.line)):
+            out.setdefault(e.norm, e.id)
+        return out
+
+    def race_ids(self) -> set[str]:
+        return {e.id for e in self.entries() if e.kind == "race"}
+
+    def duplicates(self) -> dict[str, list[RaceEntry]]:
+        """
+        Conflicts the old first-match parse could not see: one normalized name
+        mapping to several ids, or one race id declared in several files.
+        """
+        by_name: dict[str, list[RaceEntry]] = {}
+        by_id: dict[str, list[RaceEntry]] = {}
+        for e in self.entries():
+            by_name.setdefault(e.norm, []).append(e)
+            if e.kind == "race":
+                by_id.setdefault(e.id, []).append(e)
+        out = {f"name:{k}": v for k, v in by_name.items() if len({e.id for e in v}) > 1}
+        out.update({f"id:{k}": v for k, v in by_id.items() if len({e.source for e in v}) > 1})
+        return out
+
+
+def load_race_index(path: Path = DEFAULT_INDEX, races_dir: Path = RACES_DIR) -> RaceIndex:
+    """Load the on-disk index, refresh changed files, and persist it."""
+    index = RaceIndex(path, races_dir)
+    index.refresh()
+    index.save()
+    return index
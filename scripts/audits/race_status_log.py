@@ -0,0 +1,294 @@
+"""
+Append-only JSON Lines log of race portrait downloads.
+
+race-image-status.json keeps one upserted entry per image path, so every reader
+has to parse the whole document. The log next to it
+(race-image-status.jsonl) gets one line per download event, written by
+scripts/raceImageStatus.ts, and can be read without touching the rest of the
+history:
+
+- tail_entries() reads backwards from the end of the file in blocks until it
+  has N usable lines;
+- StatusIndex keeps byte offsets per race / gender / category / (race, gender)
+  pair plus a time column in .agent/cache, and only indexes bytes appended
+  since the last run;
+- migrate() converts the existing {"entries": [...]} document into the log.
+
+recordRaceImageVerification() appends the updated entry again with
+"event": "verification"; the tail and the index only count download lines.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+
+ROOT = Path(__file__).resolve().parents[2]
+STATUS_JSON = ROOT / "public" / "assets" / "images" / "races" / "race-image-status.json"
+STATUS_LOG = STATUS_JSON.with_suffix(".jsonl")
+DEFAULT_INDEX = ROOT / ".agent" / "cache" / "race-status-index.json"
+
+INDEX_VERSION = 1
+TAIL_BLOCK = 64 * 1024
+# Bytes hashed from the head of the log to notice it was rewritten rather than appended to.
+HEAD_BYTES = 4096
+
+INDEXED_FIELDS = ("race", "gender", "category")
+
+
+def has_pair(e: object) -> bool:
+    """Entries that count towards a (race, gender) pair."""
+    return isinstance(e, dict) and isinstance(e.get("race"), str) and isinstance(e.get("gender"), str)
+
+
+def is_download(e: object) -> bool:
+    """Download lines; verification lines repeat an earlier download's entry."""
+    return isinstance(e, dict) and e.get("event", "download") == "download"
+
+
+def is_resumable(e: object) -> bool:
+    """Entries the tail tooling prints: downloads naming a race, gender and download time."""
+    return is_download(e) and bool(e.get("race") and e.get("gender") and e.get("downloadedAt"))
+
+
+def append_entry(entry: dict, log_path: Path = STATUS_LOG) -> int:
+    """Append one entry; returns its byte offset."""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(log_path, "ab") as f:
+        offset = f.tell()
+        f.write(line)
+    return offset
+
+
+def migrate(status_path: Path = STATUS_JSON, log_path: Path = STATUS_LOG, force: bool = False) -> int:
+    """Write the {"entries": [...]} document out as a log ordered by downloadedAt."""
+    if log_path.exists() and not force:
+        raise FileExistsError(f"log already exists: {log_path} (use --force to rebuild it)")
+    entries = json.loads(status_path.read_text(encoding="utf-8")).get("entries", [])
+    entries = [e for e in entries if isinstance(e, dict)]
+    entries.sort(key=lambda e: str(e.get("downloadedAt") or ""))
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # Not mkstemp: the log is served from public/ and needs the usual umask
+    # permissions rather than mkstemp's owner-only mode.
+    tmp = log_path.with_name(f".{log_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, "x", encoding="utf-8", newline="\n") as f:
+            for e in entries:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+        os.replace(tmp, log_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return len(entries)
+
+
+def _parse(line: bytes) -> dict | None:
+    try:
+        e = json.loads(line)
+    except ValueError:
+        return None  # a torn final line from an interrupted writer
+    return e if isinstance(e, dict) else None
+
+
+def tail_entries(n: int, log_path: Path = STATUS_LOG) -> list[dict]:
+    """Last n resumable entries in file order, reading only as many blocks as needed."""
+    if n <= 0:
+        return []
+    out: list[dict] = []
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        carry = b""
+        while pos > 0 and len(out) < n:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + carry
+            lines = chunk.split(b"\n")
+            # The first piece may be a partial line unless we reached the start.
+            carry = lines.pop(0) if pos > 0 else b""
+            for line in reversed(lines):
+                e = _parse(line) if line.strip() else None
+                if is_resumable(e):
+                    out.append(e)
+                    if len(out) == n:
+                        break
+    out.reverse()
+    return out
+
+
+def _complete_lines(f, offset: int) -> Iterator[tuple[int, bytes]]:
+    """Yield (offset, raw line) for newline-terminated lines from offset onwards."""
+    f.seek(offset)
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        if not line.endswith(b"\n"):
+            return  # EOF, or a line still being written
+        yield pos, line
+
+
+def iter_from(offset: int, log_path: Path = STATUS_LOG) -> Iterator[tuple[int, dict]]:
+    """Yield (offset, entry) for every complete, parseable line at or after offset."""
+    with open(log_path, "rb") as f:
+        for pos, line in _complete_lines(f, offset):
+            e = _parse(line)
+            if e is not None:
+                yield pos, e
+
+
+def read_at(offsets: list[int], log_path: Path = STATUS_LOG) -> list[dict]:
+    out: list[dict] = []
+    with open(log_path, "rb") as f:
+        for off in offsets:
+            f.seek(off)
+            e = _parse(f.readline())
+            if e is not None:
+                out.append(e)
+    return out
+
+
+def _head_digest(log_path: Path, length: int) -> str:
+    with open(log_path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+class StatusIndex:
+    """Offset index over the log; refreshed from the last indexed byte."""
+
+    def __init__(self, log_path: Path = STATUS_LOG, path: Path = DEFAULT_INDEX):
+        self.log_path = Path(log_path)
+        self.path = Path(path)
+        self.reset()
+        self._load()
+
+    def reset(self) -> None:
+        self.size = 0
+        self.head = ""
+        self.postings: dict[str, dict[str, list[int]]] = {f: {} for f in (*INDEXED_FIELDS, "pair")}
+        # Parallel columns: offset and downloadedAt ("" if absent) of every indexed line.
+        self.offsets: list[int] = []
+        self.times: list[str] = []
+        self.dirty = True
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("log") != str(self.log_path.resolve()):
+            return
+        self.size = data["size"]
+        self.head = data["head"]
+        self.postings = data["postings"]
+        self.offsets = data["offsets"]
+        self.times = data["times"]
+        self.dirty = False
+
+    def _rewritten(self) -> bool:
+        """True if the log shrank or its already-indexed head changed (rebuilt/migrated)."""
+        if not self.size:
+            return False
+        if self.log_path.stat().st_size < self.size:
+            return True
+        return _head_digest(self.log_path, min(self.size, HEAD_BYTES)) != self.head
+
+    def refresh(self) -> int:
+        """Index lines appended since the last refresh; returns how many were added."""
+        if not self.log_path.exists():
+            if self.size:
+                self.reset()
+            return 0
+        if self._rewritten():
+            self.reset()
+        added = 0
+        start = self.size
+        with open(self.log_path, "rb") as f:
+            for pos, line in _complete_lines(f, start):
+                self.size = pos + len(line)
+                e = _parse(line)
+                if not has_pair(e) or not is_download(e):
+                    continue
+                for field in INDEXED_FIELDS:
+                    value = e.get(field)
+                    if isinstance(value, str) and value:
+                        self.postings[field].setdefault(value, []).append(pos)
+                self.postings["pair"].setdefault(f"{e['race']}|{e['gender']}", []).append(pos)
+                self.offsets.append(pos)
+                self.times.append(str(e.get("downloadedAt") or ""))
+                added += 1
+        if self.size != start:
+            self.head = _head_digest(self.log_path, min(self.size, HEAD_BYTES))
+            self.dirty = True
+        return added
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "log": str(self.log_path.resolve()),
+            "size": self.size,
+            "head": self.head,
+            "postings": self.postings,
+            "offsets": self.offsets,
+            "times": self.times,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def done_pairs(self) -> set[tuple[str, str]]:
+        return {tuple(k.split("|", 1)) for k in self.postings["pair"]}
+
+    def query(
+        self,
+        race: str | None = None,
+        gender: str | None = None,
+        category: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[int]:
+        """Offsets (file order) of indexed entries matching every given filter."""
+        selected: set[int] | None = None
+        for field, value in (("race", race), ("gender", gender), ("category", category)):
+            if value is None:
+                continue
+            hits = set(self.postings[field].get(value, ()))
+            selected = hits if selected is None else selected & hits
+        if since is not None or until is not None:
+            # ISO-8601 UTC timestamps compare correctly as strings.
+            in_range = {
+                off
+                for off, t in zip(self.offsets, self.times)
+                if (since is None or t >= since) and (until is None or t <= until)
+            }
+            selected = in_range if selected is None else selected & in_range
+        if selected is None:
+            return list(self.offsets)
+        return sorted(selected)
+
+
+def load_done_pairs(status_path: Path = STATUS_JSON, log_path: Path = STATUS_LOG) -> set[tuple[str, str]]:
+    """(race, gender) pairs with at least one download; from the index when the log exists."""
+    if log_path.exists():
+        return load_status_index(log_path).done_pairs()
+    entries = json.loads(status_path.read_text(encoding="utf-8")).get("entries", [])
+    return {(e["race"], e["gender"]) for e in entries if has_pair(e)}
+
+
+def load_status_index(log_path: Path = STATUS_LOG, path: Path = DEFAULT_INDEX) -> StatusIndex:
+    index = StatusIndex(log_path, path)
+    index.refresh()
+    index.save()
+    return index
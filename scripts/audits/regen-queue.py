@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Local work queue for race portrait regeneration (see regen_queue.py).
+
+Usage:
+  python scripts/audits/regen-queue.py enqueue [--category A ...] [--reason TEXT]
+  python scripts/audits/regen-queue.py run --generator cmd:<template>|module:function
+      [--workers 2] [--retries 3] [--backoff 5] [--out DIR] [--dupe-radius 8]
+  python scripts/audits/regen-queue.py --queue Q.json run --generator stub --out DIR
+  python scripts/audits/regen-queue.py status [--json]
+  python scripts/audits/regen-queue.py retry-failed
+
+`enqueue` adds the backlog's missing (raceId, gender) pairs that are not queued
+yet. `run` resumes any interrupted jobs, generates every pending one, and gates
+each image through the square and blank-margin audits before marking it done.
+After the run, the images finished in it are compared against the portrait
+perceptual-hash index (phash_index.py) and each other; near-duplicates across
+races or genders, regenerations that barely differ from the portrait they
+replace, and flat (blank or solid-fill) images are listed (--dupe-radius 0
+turns this off).
+
+--generator has no default. The stub writes placeholder portraits that pass
+every gate, so it only runs against an explicit --queue and --out: pointed at
+the real queue it would mark every job done.
+
+Exit codes (run):
+  0: every job done
+  3: at least one job failed after its retries, or the batch has near-duplicates
+     or flat images (not 2, which argparse uses for usage errors)
+  1: error
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from backlog_diff import BACKLOG, BacklogDiff, filter_items
+from race_status_log import STATUS_JSON
+from phash_index import DEFAULT_RADIUS, PhashIndex, check_batch
+from regen_queue import DEFAULT_OUT, DEFAULT_QUEUE, JobQueue, load_generator, run_queue
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queue", default=str(DEFAULT_QUEUE))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    enq = sub.add_parser("enqueue")
+    enq.add_argument("--backlog", default=str(BACKLOG))
+    enq.add_argument("--status", default=str(STATUS_JSON))
+    enq.add_argument("--category", action="append")
+    enq.add_argument("--reason")
+
+    run = sub.add_parser("run")
+    run.add_argument("--workers", type=int, default=2)
+    run.add_argument("--retries", type=int, default=3, help="retries after the first attempt")
+    run.add_argument("--backoff", type=float, default=5.0, help="seconds before the first retry; doubles after")
+    run.add_argument("--generator", required=True, help="stub | cmd:<template> | module:function")
+    run.add_argument("--out", help=f"output directory (default {DEFAULT_OUT}; required with the stub)")
+    run.add_argument("--dupe-radius", type=int, default=DEFAULT_RADIUS, help="pHash radius for the post-run check; 0 skips it")
+
+    st = sub.add_parser("status")
+    st.add_argument("--json", action="store_true")
+
+    sub.add_parser("retry-failed")
+    args = ap.parse_args()
+
+    queue = JobQueue(Path(args.queue))
+
+    if args.cmd == "enqueue":
+        diff = BacklogDiff(args.backlog, args.status)
+        diff.refresh()
+        items = filter_items(diff.missing(), set(args.category) if args.category else None, args.reason)
+        added = queue.enqueue([w.to_json() for w in items])
+        print(f"enqueued: {added}  queued_total: {len(queue.jobs)}")
+        return 0
+
+    if args.cmd == "retry-failed":
+        print(f"requeued: {queue.retry_failed()}")
+        return 0
+
+    if args.cmd == "status":
+        if args.json:
+            print(json.dumps({"counts": queue.counts(), "jobs": [vars(j) for j in queue.jobs.values()]}, indent=2))
+            return 0
+        print("  ".join(f"{k}: {v}" for k, v in queue.counts().items()))
+        for j in queue.jobs.values():
+            if j.state != "done":
+                print(f"{j.state}\t{j.id}\tattempts={j.attempts}\t{j.error or ''}")
+        return 0
+
+    if args.generator == "stub" and (args.out is None or Path(args.queue).resolve() == DEFAULT_QUEUE.resolve()):
+        print("error: --generator stub needs its own --queue and --out, not the real queue", file=sys.stderr)
+        return 1
+    try:
+        generator = load_generator(args.generator)
+    except (ImportError, AttributeError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    done_before = {j.id for j in queue.by_state("done")}
+    counts = asyncio.run(
+        run_queue(queue, generator, args.workers, args.retries, args.backoff, Path(args.out or DEFAULT_OUT))
+    )
+    print("  ".join(f"{k}: {v}" for k, v in counts.items()))
+
+    batch = [j.image for j in queue.by_state("done") if j.id not in done_before and j.image]
+    dupes = 0
+    if batch and args.dupe_radius > 0:
+        index = PhashIndex()
+        index.refresh(radius=args.dupe_radius)
+        index.save()
+        report = check_batch(batch, index, args.dupe_radius)
+        dupes = len(report["collisions"]) + len(report["unchanged"]) + len(report["flat"])
+        print(
+            f"phash: checked {len(batch)}  collisions: {len(report['collisions'])}  "
+            f"unchanged: {len(report['unchanged'])}  flat: {len(report['flat'])}"
+        )
+        for c in report["collisions"]:
+            print(f"near\t{c['kind']}\tphash={c['phash']}\t{c['a']}\t{c['b']}")
+        for u in report["unchanged"]:
+            print(f"unchanged\tphash={u['phash']}\t{u['path']}\t{u['previous']}")
+        for f in report["flat"]:
+            print(f"flat\t{f}")
+    return 3 if counts["failed"] or dupes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
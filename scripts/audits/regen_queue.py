@@ -0,0 +1,276 @@
+"""
+Persistent work queue for race portrait regeneration.
+
+Jobs are the missing (raceId, gender) work items from backlog_diff. The queue
+state is a JSON file rewritten atomically on every transition, so a crashed
+run resumes where it stopped: jobs left "running" go back to "pending" with
+their attempt count intact.
+
+run_queue() drives N asyncio workers. Each job is generated by a pluggable
+generator, then gated by the same square and blank-margin checks the audit
+scripts run; a generator error or a failed gate is retried with exponential
+backoff until the retry budget is spent (retries=3 allows four attempts in
+all). Generators are async or sync callables `(item: dict, out_dir: Path) -> Path`:
+
+- "stub": writes a placeholder 1024-square PNG locally (dry runs against a scratch queue);
+- "cmd:<template>": runs a shell command, formatting {raceId}, {gender},
+  {category}, {reason} and {out} (the expected output path) into it;
+- "module:function": any importable callable with the signature above.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import shlex
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from audit_runner import check_margins, check_square
+
+
+ROOT = Path(__file__).resolve().parents[2]
+QUEUE_DIR = ROOT / ".agent" / "regen-queue"
+DEFAULT_QUEUE = QUEUE_DIR / "queue.json"
+DEFAULT_OUT = QUEUE_DIR / "images"
+
+QUEUE_VERSION = 1
+STATES = ("pending", "running", "done", "failed")
+
+Generator = Callable[[dict, Path], "Awaitable[Path] | Path"]
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def job_id(item: dict) -> str:
+    return f"{item['raceId']}|{item['gender']}"
+
+
+@dataclass
+class Job:
+    id: str
+    item: dict
+    state: str = "pending"
+    attempts: int = 0
+    error: str | None = None
+    image: str | None = None
+    gates: dict = field(default_factory=dict)
+    updatedAt: str = ""
+
+
+class JobQueue:
+    def __init__(self, path: Path = DEFAULT_QUEUE):
+        self.path = Path(path)
+        self.jobs: dict[str, Job] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != QUEUE_VERSION:
+            return
+        self.jobs = {j["id"]: Job(**j) for j in data.get("jobs", [])}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": QUEUE_VERSION, "jobs": [asdict(j) for j in self.jobs.values()]}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def enqueue(self, items: list[dict]) -> int:
+        """Add work items not already queued; returns how many were added."""
+        added = 0
+        for item in items:
+            jid = job_id(item)
+            if jid in self.jobs:
+                continue
+            self.jobs[jid] = Job(jid, item, updatedAt=now_iso())
+            added += 1
+        if added:
+            self.save()
+        return added
+
+    def recover(self) -> int:
+        """Return jobs a crashed run left "running" to "pending"."""
+        stuck = [j for j in self.jobs.values() if j.state == "running"]
+        for j in stuck:
+            j.state = "pending"
+        if stuck:
+            self.save()
+        return len(stuck)
+
+    def retry_failed(self) -> int:
+        failed = [j for j in self.jobs.values() if j.state == "failed"]
+        for j in failed:
+            j.state, j.attempts, j.error = "pending", 0, None
+        if failed:
+            self.save()
+        return len(failed)
+
+    def update(self, job: Job, **changes) -> None:
+        for k, v in changes.items():
+            setattr(job, k, v)
+        job.updatedAt = now_iso()
+        self.save()
+
+    def by_state(self, state: str) -> list[Job]:
+        return [j for j in self.jobs.values() if j.state == state]
+
+    def counts(self) -> dict[str, int]:
+        return {s: len(self.by_state(s)) for s in STATES}
+
+
+# ============================================================================
+# Generators
+# ============================================================================
+
+
+def output_path(item: dict, out_dir: Path) -> Path:
+    return out_dir / f"{item['raceId']}_{item['gender']}.png"
+
+
+def stub_generator(item: dict, out_dir: Path) -> Path:
+    """Placeholder portrait: a seeded 8x8 colour grid, smoothed, so stubs pass the audits and hash apart."""
+    from PIL import Image
+
+    out = output_path(item, out_dir)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    colours = hashlib.shake_256(job_id(item).encode("utf-8")).digest(8 * 8 * 3)
+    grid = Image.frombytes("RGB", (8, 8), colours)
+    grid.resize((1024, 1024), Image.Resampling.BICUBIC).save(out)
+    return out
+
+
+def command_generator(template: str) -> Generator:
+    async def generate(item: dict, out_dir: Path) -> Path:
+        out = output_path(item, out_dir)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        fields = {k: shlex.quote(str(item.get(k) or "")) for k in ("raceId", "gender", "category", "reason")}
+        cmd = template.format(out=shlex.quote(str(out)), **fields)
+        proc = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"generator exited {proc.returncode}: {stderr.decode(errors='replace')[-300:]}")
+        if not out.exists():
+            raise RuntimeError(f"generator did not write {out}")
+        return out
+
+    return generate
+
+
+def load_generator(spec: str) -> Generator:
+    if spec == "stub":
+        return stub_generator
+    if spec.startswith("cmd:"):
+        return command_generator(spec[4:])
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"generator must be 'stub', 'cmd:<template>' or 'module:function', got {spec!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+async def call_generator(generator: Generator, item: dict, out_dir: Path) -> Path:
+    if asyncio.iscoroutinefunction(generator):
+        return Path(await generator(item, out_dir))
+    return Path(await asyncio.to_thread(generator, item, out_dir))
+
+
+# ============================================================================
+# Post-generation gates
+# ============================================================================
+
+
+class GateFailed(Exception):
+    pass
+
+
+def run_gates(image: Path) -> dict:
+    """Square + blank-margin audits; raises GateFailed with both records if either flags."""
+    square_code, square = check_square(str(image))
+    margin_code, margins = check_margins(str(image))
+    gates = {"square": square, "margins": margins}
+    if square_code != 0 or margin_code != 0:
+        raise GateFailed(json.dumps(gates))
+    return gates
+
+
+# ============================================================================
+# Scheduler
+# ============================================================================
+
+
+async def _worker(
+    pending: asyncio.Queue,
+    queue: JobQueue,
+    generator: Generator,
+    out_dir: Path,
+    retries: int,
+    backoff: float,
+    log: Callable[[str], None],
+) -> None:
+    while True:
+        job = await pending.get()
+        try:
+            while True:
+                queue.update(job, state="running", attempts=job.attempts + 1, error=None)
+                try:
+                    image = await call_generator(generator, job.item, out_dir)
+                    gates = await asyncio.to_thread(run_gates, image)
+                except Exception as e:
+                    # A gate failure is retried like any other error: the next attempt regenerates.
+                    failed = job.attempts > retries
+                    queue.update(job, state="failed" if failed else "pending", error=f"{type(e).__name__}: {e}")
+                    log(f"{job.id}\tattempt {job.attempts}\t{'failed' if failed else 'retrying'}\t{job.error}")
+                    if failed:
+                        break
+                    await asyncio.sleep(backoff * 2 ** (job.attempts - 1))
+                    continue
+                queue.update(job, state="done", image=str(image), gates=gates)
+                log(f"{job.id}\tattempt {job.attempts}\tdone\t{image}")
+                break
+        finally:
+            pending.task_done()
+
+
+async def run_queue(
+    queue: JobQueue,
+    generator: Generator,
+    workers: int = 2,
+    retries: int = 3,
+    backoff: float = 5.0,
+    out_dir: Path = DEFAULT_OUT,
+    log: Callable[[str], None] = print,
+) -> dict[str, int]:
+    """Process every pending job with `workers` concurrent generations; returns final counts.
+
+    A job fails once `retries` retries after its first attempt have failed too.
+    """
+    queue.recover()
+    pending: asyncio.Queue = asyncio.Queue()
+    for job in queue.by_state("pending"):
+        pending.put_nowait(job)
+    tasks = [
+        asyncio.create_task(_worker(pending, queue, generator, out_dir, retries, backoff, log))
+        for _ in range(max(workers, 1))
+    ]
+    try:
+        await pending.join()
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return queue.counts()
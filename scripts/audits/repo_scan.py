@@ -0,0 +1,403 @@
+"""
+Shared repository scanner for the Python tooling.
+
+walk() lists files with os.scandir, honouring every .gitignore on the way down
+(nested files included, negations and directory-only rules too); ignored
+directories are pruned, never entered. RepoScanner adds a persistent manifest
+of (size, mtime_ns) per repo-relative path plus a lazily computed sha256, and
+scan() reports what was added, modified or removed since the previous scan of
+the same scope, so a repeat run costs one stat per file.
+
+Each consumer keeps its own manifest (.agent/cache/repo-scan/<name>.json), so
+one tool's scan never swallows the changes another tool has yet to see:
+
+  scanner = RepoScanner("race-index")
+  result = scanner.scan("src/data/races", suffixes=(".ts",), recursive=False)
+  result.changed, result.removed   # repo-relative posix paths
+  scanner.sha256(rel)              # hashed once, reused while the stat holds
+  scanner.save()
+
+A consumer with its own index file saves that index first and the scanner
+last: if the index write fails, the changes are reported again next time.
+
+Usage: python scripts/audits/repo_scan.py [subdir ...] [--name NAME] [--suffix .png ...]
+       [--no-recursive] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = ROOT / ".agent" / "cache" / "repo-scan"
+
+MANIFEST_VERSION = 1
+ALWAYS_SKIP = frozenset({".git"})
+
+
+# ============================================================================
+# .gitignore rules
+# ============================================================================
+def _glob_regex(pattern: str) -> str:
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+    base: str  # directory of the .gitignore, repo-relative ("" for the root)
+
+    def matches(self, rel: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel.startswith(self.base + "/"):
+                return False
+            rel = rel[len(self.base) + 1 :]
+        return self.regex.match(rel) is not None
+
+
+def parse_gitignore(text: str, base: str = "") -> list[IgnoreRule]:
+    rules: list[IgnoreRule] = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the .gitignore's directory.
+        anchored = "/" in line
+        body = _glob_regex(line.lstrip("/"))
+        regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+        rules.append(IgnoreRule(regex, negate, dir_only, base))
+    return rules
+
+
+class IgnoreRules:
+    """The rules in effect for one directory: its ancestors' .gitignore files plus its own."""
+
+    def __init__(self, rules: tuple[IgnoreRule, ...] = ()):
+        self.rules = rules
+
+    def extended(self, directory: str, rel: str) -> IgnoreRules:
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+                extra = parse_gitignore(f.read(), rel)
+        except (OSError, UnicodeDecodeError):
+            return self
+        return IgnoreRules(self.rules + tuple(extra)) if extra else self
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        # Last matching rule wins, as in git.
+        result = False
+        for rule in self.rules:
+            if result == rule.negate and rule.matches(rel, is_dir):
+                result = not rule.negate
+        return result
+
+
+# ============================================================================
+# Walking
+# ============================================================================
+@dataclass(frozen=True)
+class FileStat:
+    rel: str  # repo-relative, posix separators
+    path: str
+    size: int
+    mtime_ns: int
+
+
+def _rel(path: Path, root: Path) -> str:
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _ancestor_rules(root: Path, start_rel: str) -> IgnoreRules:
+    """Rules from the .gitignore files above start (root included, start itself excluded)."""
+    rules = IgnoreRules()
+    if not start_rel or Path(start_rel).is_absolute():
+        return rules
+    rules = rules.extended(str(root), "")
+    parts = start_rel.split("/")
+    for i in range(1, len(parts)):
+        rules = rules.extended(str(root.joinpath(*parts[:i])), "/".join(parts[:i]))
+    return rules
+
+
+def walk(
+    *subdirs: str | Path,
+    root: Path = ROOT,
+    suffixes: Iterable[str] | None = None,
+    recursive: bool = True,
+    skip_dirs: Iterable[str] = (),
+    gitignore: bool = True,
+) -> Iterator[FileStat]:
+    """
+    Yield FileStat for every non-ignored regular file under root/subdir.
+
+    suffixes filters by lower-cased extension; skip_dirs prunes directory
+    names anywhere in the tree on top of .gitignore and .git.
+    """
+    root = Path(root)
+    wanted = tuple(s.lower() for s in suffixes) if suffixes else None
+    skip = ALWAYS_SKIP | set(skip_dirs)
+    for sub in subdirs or ("",):
+        start = (root / sub) if sub else root
+        if not start.is_dir():
+            continue
+        start_rel = _rel(start, root)
+        start_rel = "" if start_rel == "." else start_rel
+        stack = [(str(start), start_rel, _ancestor_rules(root, start_rel) if gitignore else IgnoreRules())]
+        while stack:
+            directory, rel_dir, rules = stack.pop()
+            if gitignore:
+                rules = rules.extended(directory, rel_dir)
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in skip and not rules.ignored(rel, True):
+                        stack.append((entry.path, rel, rules))
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                if wanted and not entry.name.lower().endswith(wanted):
+                    continue
+                if rules.ignored(rel, False):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield FileStat(rel, entry.path, st.st_size, st.st_mtime_ns)
+
+
+# ============================================================================
+# Manifest and change detection
+# ============================================================================
+def manifest_name(name: str, index: str | Path, default: str | Path) -> str:
+    """
+    Scanner name for an index file: `name` at the default location, suffixed
+    with a digest of the path elsewhere, so indexes at different paths never
+    consume each other's changes.
+    """
+    index = Path(index).resolve()
+    if index == Path(default).resolve():
+        return name
+    return f"{name}-{hashlib.sha1(str(index).encode()).hexdigest()[:12]}"
+
+
+def file_sha256(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class ScanResult:
+    files: dict[str, FileStat] = field(default_factory=dict)
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> list[str]:
+        return self.added + self.modified
+
+    def to_json(self) -> dict:
+        return {
+            "files": len(self.files),
+            "added": self.added,
+            "modified": self.modified,
+            "removed": self.removed,
+        }
+
+
+class RepoScanner:
+    def __init__(self, name: str = "repo", root: Path = ROOT, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.name = name
+        self.root = Path(root)
+        self.path = Path(cache_dir) / f"{name}.json"
+        # rel -> {"size", "mtime_ns", "sha256"?}
+        self.files: dict[str, dict] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("root") == str(self.root):
+            self.files = data.get("files", {})
+
+    def scan(
+        self,
+        *subdirs: str | Path,
+        suffixes: Iterable[str] | None = None,
+        recursive: bool = True,
+        skip_dirs: Iterable[str] = (),
+        gitignore: bool = True,
+    ) -> ScanResult:
+        """Walk the scope and diff it against the manifest; the manifest is updated in memory."""
+        suffixes = tuple(s.lower() for s in suffixes) if suffixes else None
+        result = ScanResult()
+        for f in walk(
+            *subdirs, root=self.root, suffixes=suffixes, recursive=recursive, skip_dirs=skip_dirs, gitignore=gitignore
+        ):
+            result.files[f.rel] = f
+            known = self.files.get(f.rel)
+            if known is None:
+                result.added.append(f.rel)
+            elif known["size"] == f.size and known["mtime_ns"] == f.mtime_ns:
+                continue
+            elif "sha256" in known and known["size"] == f.size and self._rehash(f, known):
+                continue  # touched but identical
+            else:
+                result.modified.append(f.rel)
+            self.files[f.rel] = {"size": f.size, "mtime_ns": f.mtime_ns}
+            self.dirty = True
+
+        prefixes = [_rel(self.root / s, self.root) for s in subdirs if str(s) not in ("", ".")]
+        for rel in [r for r in self.files if r not in result.files]:
+            if self._in_scope(rel, prefixes, suffixes, recursive):
+                result.removed.append(rel)
+                del self.files[rel]
+                self.dirty = True
+        for names in (result.added, result.modified, result.removed):
+            names.sort()
+        return result
+
+    def _rehash(self, f: FileStat, known: dict) -> bool:
+        try:
+            sha = file_sha256(f.path)
+        except OSError:
+            return False
+        if sha != known["sha256"]:
+            return False
+        known.update(mtime_ns=f.mtime_ns)
+        self.dirty = True
+        return True
+
+    @staticmethod
+    def _in_scope(rel: str, prefixes: list[str], suffixes: tuple[str, ...] | None, recursive: bool) -> bool:
+        if suffixes and not rel.lower().endswith(suffixes):
+            return False
+        if not prefixes:
+            return recursive or "/" not in rel
+        for prefix in prefixes:
+            if rel.startswith(prefix + "/"):
+                rest = rel[len(prefix) + 1 :]
+                if recursive or "/" not in rest:
+                    return True
+        return False
+
+    def sha256(self, rel: str) -> str:
+        """Content hash of a scanned file, computed on first use and kept while its stat holds."""
+        entry = self.files[rel]
+        if "sha256" not in entry:
+            entry["sha256"] = file_sha256(self.root / rel)
+            self.dirty = True
+        return entry["sha256"]
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "root": str(self.root), "files": dict(sorted(self.files.items()))}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Scan the repository and report changes since the last scan")
+    ap.add_argument("subdirs", nargs="*", help="repo-relative directories (default: the whole repo)")
+    ap.add_argument("--name", default="repo", help="manifest name; each consumer should use its own")
+    ap.add_argument("--suffix", action="append", help="only files with this extension (repeatable)")
+    ap.add_argument("--no-recursive", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    scanner = RepoScanner(args.name)
+    result = scanner.scan(*args.subdirs, suffixes=args.suffix, recursive=not args.no_recursive)
+    scanner.save()
+    if args.json:
+        print(json.dumps(result.to_json()))
+        return 0
+    print(
+        f"files: {len(result.files)}  added: {len(result.added)}  "
+        f"modified: {len(result.modified)}  removed: {len(result.removed)}"
+    )
+    for label, names in (("added", result.added), ("modified", result.modified), ("removed", result.removed)):
+        for rel in names:
+            print(f"{label}\t{rel}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""AuditCache reuse and invalidation, and run_cached() answering hits without the check."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from PIL import Image
+
+from audit_cache import AuditCache, check_fingerprints
+from audit_runner import check_square, run_cached
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "Dwarf_Male.png"
+    Image.new("RGB", (32, 32), (120, 80, 40)).save(path)
+    return path
+
+
+def test_results_survive_a_save_and_reload(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    cache.store(image, "square", 0, {"path": str(image), "width": 32, "height": 32})
+    cache.save()
+
+    reloaded = AuditCache(tmp_path / "cache.json")
+    assert reloaded.lookup(image, "square") == (0, {"path": str(image), "width": 32, "height": 32})
+    assert reloaded.lookup(image, "margins") is None
+    assert not reloaded.dirty
+
+
+def test_touched_but_identical_file_still_hits(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    cache.store(image, "square", 0, {"path": str(image)})
+    st = image.stat()
+    os.utime(image, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert cache.lookup(image, "square") == (0, {"path": str(image)})
+    assert cache.entries[str(image.resolve())]["mtime_ns"] == st.st_mtime_ns + 10**9
+
+
+def test_changed_content_misses(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    cache.store(image, "square", 0, {"path": str(image)})
+    Image.new("RGB", (32, 24), (120, 80, 40)).save(image)
+    assert cache.lookup(image, "square") is None
+
+
+def test_errors_are_never_cached(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    cache.store(image, "square", 1, {"path": str(image), "error": "truncated"})
+    assert cache.lookup(image, "square") is None
+
+
+def test_a_changed_threshold_drops_only_that_checks_results(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    for check in ("square", "margins", "audit", "audit:margins"):
+        cache.store(image, check, 0, {"path": str(image)})
+    cache.save()
+
+    fingerprints = {**check_fingerprints(), "margins": "v1:changed", "audit": "v1:changed"}
+    reloaded = AuditCache(tmp_path / "cache.json", fingerprints)
+    assert reloaded.lookup(image, "square") is not None
+    assert [reloaded.lookup(image, c) for c in ("margins", "audit", "audit:margins")] == [None, None, None]
+    assert reloaded.dirty
+
+
+def test_prune_missing_forgets_deleted_files(tmp_path, image):
+    cache = AuditCache(tmp_path / "cache.json")
+    cache.store(image, "square", 0, {"path": str(image)})
+    image.unlink()
+    cache.prune_missing()
+    assert cache.entries == {}
+
+
+def test_run_cached_only_checks_new_or_modified_images(tmp_path, image):
+    other = tmp_path / "Elf_Female.png"
+    Image.new("RGB", (40, 30)).save(other)
+    paths = [str(image), str(other)]
+    checked = []
+
+    def check(path):
+        checked.append(path)
+        return check_square(path)
+
+    cache = AuditCache(tmp_path / "cache.json")
+    first = sorted(run_cached("square", check, paths, jobs=1, cache=cache))
+    assert [code for code, _ in first] == [0, 2]
+    assert (tmp_path / "cache.json").exists()
+
+    Image.new("RGB", (30, 30)).save(other)
+    checked.clear()
+    reloaded = AuditCache(tmp_path / "cache.json")
+    second = {r["path"]: code for code, r in run_cached("square", check, paths, jobs=1, cache=reloaded)}
+    assert checked == [str(other)]
+    assert second == {str(image): 0, str(other): 0}
@@ -0,0 +1,105 @@
+"""The NumPy margin engines must agree with the pure-Python scan, pixel for pixel."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from PIL import Image
+
+import blank_margins
+from blank_margins import ENGINES, measure_margins
+
+
+def synthetic_image(rng: random.Random, size: int) -> Image.Image:
+    # Content block in a random colour on a near-white canvas; the canvas tint and
+    # the sprinkled edge pixels sit right on the is_blank_pixel() boundaries.
+    canvas = rng.choice([(255, 255, 255), (247, 247, 247), (250, 248, 255), (246, 250, 250)])
+    w, h = size, rng.choice([size, size * 3 // 4])
+    img = Image.new("RGB", (w, h), canvas)
+    px = img.load()
+    top, bottom = (rng.randint(0, h // 3) for _ in range(2))
+    left, right = (rng.randint(0, w // 3) for _ in range(2))
+    fill = (rng.randint(0, 200), rng.randint(0, 200), rng.randint(0, 200))
+    for y in range(top, h - bottom):
+        for x in range(left, w - right):
+            px[x, y] = fill
+    for _ in range(rng.randint(0, size * 2)):
+        x, y = rng.randrange(w), rng.randrange(h)
+        px[x, y] = rng.choice([(240, 240, 240), (255, 255, 230), (248, 248, 248), (0, 0, 0)])
+    # Non-RGB modes exercise the conversion paths in rgb_array().
+    return img.convert(rng.choice(["RGB", "RGB", "RGBA", "P"]))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_engines_agree_on_synthetic_letterboxes(seed):
+    img = synthetic_image(random.Random(seed), 160)
+    expected = measure_margins(img, "python")
+    assert {engine: measure_margins(img, engine) for engine in ENGINES} == {engine: expected for engine in ENGINES}
+
+
+@pytest.mark.parametrize("size", [(1, 1), (1, 40), (40, 1), (7, 300)])
+@pytest.mark.parametrize("colour", [(255, 255, 255), (0, 0, 0)])
+def test_engines_agree_on_degenerate_shapes(size, colour):
+    img = Image.new("RGB", size, colour)
+    expected = measure_margins(img, "python")
+    for engine in ENGINES:
+        assert measure_margins(img, engine) == expected
+
+
+def test_blank_canvas_is_all_margin():
+    margins = measure_margins(Image.new("RGB", (64, 48), (250, 250, 250)), "python")
+    assert margins == {"top": 48, "bottom": 48, "left": 64, "right": 64}
+    assert blank_margins.is_blank(margins)
+
+
+def test_missing_numpy_falls_back_to_the_python_scan(monkeypatch):
+    img = synthetic_image(random.Random(7), 96)
+    expected = measure_margins(img, "python")
+    monkeypatch.setattr(blank_margins, "np", None)
+    assert measure_margins(img, "edges") == measure_margins(img, "numpy") == expected
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError, match="unknown margin engine"):
+        measure_margins(Image.new("RGB", (4, 4)), "gpu")
+
+
+# ============================================================================
+# "edges" engine
+# ============================================================================
+@pytest.mark.parametrize("seed", range(20))
+def test_edge_run_never_depends_on_the_guess(seed):
+    np = pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    n = rng.randint(1, 120)
+    ok = np.array([rng.random() < 0.97 for _ in range(n)])
+    expected = blank_margins.leading_run(ok)
+    for guess in range(0, n + 2 * blank_margins.COARSE_STEP):
+        assert blank_margins.edge_run(lambda a, b: ok[a:b], n, guess) == expected
+
+
+def test_edges_finds_lines_the_coarse_pass_skips():
+    pytest.importorskip("numpy")
+    step = blank_margins.COARSE_STEP
+    img = Image.new("RGB", (256, 200), (255, 255, 255))
+    px = img.load()
+    # One dark row and one dark column, both between the strided thumbnail's samples.
+    for x in range(256):
+        px[x, 3 * step + 3] = (20, 20, 20)
+    for y in range(200):
+        px[256 - 5 * step - 2, y] = (20, 20, 20)
+    assert measure_margins(img, "edges") == {
+        "top": 3 * step + 3,
+        "bottom": 200 - 3 * step - 4,
+        "left": 256 - 5 * step - 2,
+        "right": 5 * step + 1,
+    }
+
+
+def test_edges_grows_its_bands_across_long_margins():
+    pytest.importorskip("numpy")
+    img = Image.new("RGB", (1024, 1024), (255, 255, 255))
+    # 21 rows of 400 px: wide enough to break the 98% row test, tall enough for the columns.
+    img.paste((90, 60, 30), (300, 700, 700, 721))
+    assert measure_margins(img, "edges") == {"top": 700, "bottom": 303, "left": 300, "right": 324}
@@ -0,0 +1,56 @@
+"""check_batch() against a small index: batch paths are matched to index keys however they are spelled."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from phash_index import PhashIndex, check_batch
+from repo_scan import RepoScanner
+
+
+def noise(path, seed):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    # Coarse blocks survive the hash thumbnails, so each seed gets distinct hashes.
+    blocks = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    Image.fromarray(blocks).resize((128, 128), Image.Resampling.NEAREST).save(path)
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    races = tmp_path / "races"
+    noise(races / "Elf_Female.png", 1)
+    noise(races / "Dwarf_Male.png", 2)
+    index = PhashIndex(tmp_path / "index.json", sources=(races,))
+    index.scanner = RepoScanner("phash-test", root=tmp_path, cache_dir=tmp_path / "cache")
+    index.refresh(jobs=1)
+    assert sorted(index.files) == ["races/Dwarf_Male.png", "races/Elf_Female.png"]
+    return index
+
+
+@pytest.mark.parametrize("spelling", ["absolute", "relative"])
+def test_an_indexed_portrait_is_not_compared_with_itself(monkeypatch, tmp_path, index, spelling):
+    portrait = tmp_path / "races" / "Elf_Female.png"
+    if spelling == "relative":
+        monkeypatch.chdir(tmp_path / "races")
+        portrait = "Elf_Female.png"
+
+    report = check_batch([str(portrait)], index, jobs=1)
+
+    assert report == {"collisions": [], "unchanged": [], "flat": [], "errors": []}
+
+
+def test_a_regenerated_copy_is_reported_against_the_portrait_it_replaces(tmp_path, index):
+    regen = tmp_path / "regen" / "elf_female.png"
+    regen.parent.mkdir()
+    regen.write_bytes((tmp_path / "races" / "Elf_Female.png").read_bytes())
+
+    report = check_batch([str(regen), str(regen)], index, jobs=1)
+
+    assert [(u["path"], u["previous"], u["phash"]) for u in report["unchanged"]] == [
+        ("regen/elf_female.png", "races/Elf_Female.png", 0)
+    ]
+    assert report["collisions"] == []
@@ -0,0 +1,212 @@
+"""
+Synthetic inputs for the asset-tooling benchmarks (run-benchmarks.py).
+
+Everything is generated into a caller-owned directory, sized by a Tier, so the
+suite never reads or writes the real portraits, status log, backlog or hero
+library:
+
+  portraits()      square, letterboxed, pillarboxed, non-square and
+                   transparent PNGs with controlled margins
+  races_dir()      src/data/races-style .ts files (race plus nested variant)
+  status_files()   race-image-status.json and its .jsonl log
+  backlog()        race_portrait_regen_backlog.json items
+  personas()       .jules/personas files and a _ROSTER.md table
+  hero_entry()     a creatureHero entry directory with reference.png
+
+Content is deterministic for a given tier, so runs compare like with like.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+
+GENDERS = ("male", "female")
+CATEGORIES = ("missing", "margins", "style", "anatomy")
+
+
+@dataclass(frozen=True)
+class Tier:
+    name: str
+    px: int  # portrait edge
+    status_entries: int
+    backlog_items: int
+    races: int
+    personas: int
+    glb_pad_mb: int  # binary padding in the fake master, on top of mesh and texture
+
+
+TIERS = {
+    "small": Tier("small", 512, 2_000, 200, 50, 45, 4),
+    "medium": Tier("medium", 1024, 20_000, 2_000, 200, 450, 16),
+    "large": Tier("large", 2048, 100_000, 10_000, 1_000, 4_500, 64),
+}
+
+
+# ============================================================================
+# Images
+# ============================================================================
+def _subject(draw: ImageDraw.ImageDraw, box: tuple[int, int, int, int]) -> None:
+    x0, y0, x1, y1 = box
+    w, h = x1 - x0, y1 - y0
+    draw.ellipse([x0 + w // 4, y0 + h // 5, x0 + 3 * w // 4, y0 + 4 * h // 5], fill=(150, 90, 60, 255))
+
+
+def _painting(w: int, h: int, seed: int) -> Image.Image:
+    """Full-bleed RGB art: two gradients and a flat channel, so no edge reads as blank."""
+    ramp = Image.linear_gradient("L").resize((w, h))
+    img = Image.merge("RGB", (ramp, ramp.rotate(90).resize((w, h)), Image.new("L", (w, h), 90 + seed % 60)))
+    _subject(ImageDraw.Draw(img), (0, 0, w, h))
+    return img
+
+
+def portraits(directory: Path, px: int, per_kind: int = 2) -> list[str]:
+    """
+    per_kind images of each kind, named "<Kind><i>_<Gender>.png" like the race portraits:
+
+      Full       px x px, full bleed (passes every audit)
+      Letterbox  px x px, blank white bands of px // 8 top and bottom
+      Pillarbox  px x px, blank white bands of px // 8 left and right
+      Wide       px x 3px/4, full bleed (fails the square check)
+      Sprite     px x px RGBA, subject on full transparency
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    m = px // 8
+    paths = []
+    for i in range(per_kind):
+        gender = GENDERS[i % 2].title()
+        letterbox = Image.new("RGB", (px, px), (255, 255, 255))
+        letterbox.paste(_painting(px, px - 2 * m, i), (0, m))
+        pillarbox = Image.new("RGB", (px, px), (255, 255, 255))
+        pillarbox.paste(_painting(px - 2 * m, px, i), (m, 0))
+        sprite = Image.new("RGBA", (px, px), (0, 0, 0, 0))
+        _subject(ImageDraw.Draw(sprite), (0, 0, px, px))
+        kinds = {
+            "Full": _painting(px, px, i),
+            "Letterbox": letterbox,
+            "Pillarbox": pillarbox,
+            "Wide": _painting(px, px * 3 // 4, i),
+            "Sprite": sprite,
+        }
+        for kind, img in kinds.items():
+            p = directory / f"{kind}{i}_{gender}.png"
+            img.save(p)
+            paths.append(str(p))
+    return paths
+
+
+# ============================================================================
+# Race data
+# ============================================================================
+def race_names(n: int) -> list[tuple[str, str]]:
+    """(id, display name) for n synthetic races."""
+    return [(f"bench_race_{i:04d}", f"Bench Race {i:04d}") for i in range(n)]
+
+
+def races_dir(directory: Path, n: int) -> Path:
+    """One .ts file per race: the Race declaration's id/name pair, then a nested variant pair."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, (race_id, name) in enumerate(race_names(n)):
+        (directory / f"benchRace{i:04d}.ts").write_text(
+            "import type { Race } from '../../types';\n\n"
+            f"export const BenchRace{i:04d}: Race = {{\n"
+            f"  id: '{race_id}',\n"
+            f"  name: '{name}',\n"
+            "  description: 'Synthetic race for the tooling benchmarks.',\n"
+            "  traits: ['Darkvision', 'Keen Senses'],\n"
+            "  variants: [\n"
+            "    {\n"
+            f"      id: '{race_id}_lineage',\n"
+            f"      name: '{name} Lineage',\n"
+            "    },\n"
+            "  ],\n"
+            "};\n",
+            encoding="utf-8",
+        )
+    # An aggregator the index skips, as in the real directory.
+    (directory / "index.ts").write_text("export {};\n", encoding="utf-8")
+    return directory
+
+
+def status_files(directory: Path, entries: int, races: list[tuple[str, str]]) -> tuple[Path, Path]:
+    """race-image-status.json and its .jsonl log with the same entries in download order."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(entries)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(entries):
+        race_id, _ = races[rng.randrange(len(races))]
+        gender = rng.choice(GENDERS)
+        rows.append({
+            "race": race_id,
+            "gender": gender,
+            "category": rng.choice(CATEGORIES),
+            "reason": "benchmark fixture",
+            "imagePath": f"public/assets/images/races/{race_id}_{gender}_{i}.png",
+            "sha256": f"{rng.getrandbits(256):064x}",
+            "downloadedAt": (start + timedelta(seconds=37 * i)).isoformat().replace("+00:00", "Z"),
+        })
+    status = directory / "race-image-status.json"
+    status.write_text(json.dumps({"entries": rows}, indent=2), encoding="utf-8")
+    log = status.with_suffix(".jsonl")
+    with open(log, "w", encoding="utf-8", newline="\n") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    return status, log
+
+
+def backlog(directory: Path, items: int, races: list[tuple[str, str]]) -> Path:
+    """Backlog items alternating raceName and raceId references, with a few unresolvable names."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(items)
+    rows = []
+    for i in range(items):
+        race_id, name = races[rng.randrange(len(races))]
+        row: dict = {"category": rng.choice(CATEGORIES), "genders": list(GENDERS[: 1 + i % 2]), "reason": "benchmark"}
+        if i % 50 == 49:
+            row["raceName"] = f"Unknown Race {i}"
+        elif i % 2:
+            row["raceId"] = race_id
+        else:
+            row["raceName"] = name
+        rows.append(row)
+    path = directory / "race_portrait_regen_backlog.json"
+    path.write_text(json.dumps({"notes": "synthetic benchmark backlog", "items": rows}, indent=2), encoding="utf-8")
+    return path
+
+
+# ============================================================================
+# Personas
+# ============================================================================
+def personas(directory: Path, n: int) -> tuple[Path, Path]:
+    """n persona files; every other one is listed in the roster, the rest rely on their intro line."""
+    personas_dir = directory / "personas"
+    personas_dir.mkdir(parents=True, exist_ok=True)
+    rows = ["| Persona | Emoji | Domain |", "|---|---|---|"]
+    for i in range(n):
+        name = f"Bench{i:04d}"
+        (personas_dir / f"{i:02d}_{name.lower()}.md").write_text(
+            f'You are "{name}" 🧪 - a synthetic persona for the benchmarks.\n\nBody text.\n', encoding="utf-8"
+        )
+        if i % 2 == 0:
+            rows.append(f"| **{name}** | 🧪 | Benchmarks |")
+    roster = directory / "_ROSTER.md"
+    roster.write_text("# Roster\n\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    return personas_dir, roster
+
+
+# ============================================================================
+# creatureHero
+# ============================================================================
+def hero_entry(base: Path, entry_id: str, px: int) -> Path:
+    """An entry directory holding only reference.png, as collect-reference.mjs leaves it."""
+    hero_dir = base / entry_id
+    hero_dir.mkdir(parents=True, exist_ok=True)
+    _painting(px, px, len(entry_id)).save(hero_dir / "reference.png")
+    return hero_dir
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Python asset tooling, gated against a stored baseline.
+
+Every case times the real functions the CLIs call, on synthetic inputs from
+fixtures.py generated into a temporary directory per tier:
+
+  tier    portraits   status entries   backlog items   races   personas   master GLB
+  small   512 px      2,000            200             50      45         512 px texture + 4 MB
+  medium  1024 px     20,000           2,000           200     450        1024 px texture + 16 MB
+  large   2048 px     100,000          10,000          1,000   4,500      2048 px texture + 64 MB
+
+Cases (prefix-select with --case):
+  audits.square / .margins / .audit-image / .phash
+                       check_square, check_margins, image_audit.audit_image and
+                       phash_index.hash_image over ten portraits
+  race-index.cold / .warm
+                       RaceIndex refresh over the races directory, from nothing
+                       and with nothing changed
+  status.tail / .index-cold / .index-warm / .done-pairs-json
+                       race_status_log tail, StatusIndex build and refresh, and
+                       the full-document fallback
+  backlog.diff         expand_backlog against the race index, then diffed
+                       against the done pairs (what BacklogDiff.refresh does)
+  repo-scan.cold / .warm
+                       RepoScanner over the fixture tree
+  prompts.sync-cold / .sync-warm
+                       update_prompts load_personas + sync into an empty and an
+                       up-to-date output directory
+  hero.convert / .convert-cached
+                       convert.convert_entry against the fake TRELLIS backend
+                       (fake_trellis.py), without and with a warm stage cache
+  hero.glb-stats / .prepare
+                       glb_inspect.glb_stats and prepare_master.prepare_entry
+                       (textures halved) on the fake master
+  repo.walk / repo.prompts-check / repo.glb-inventory
+                       untiered: walk() over this repository, update_prompts
+                       --check against the real personas, and a cold
+                       glb_inventory sweep of public/
+
+Each case runs once to warm up, then --repeat times; untimed resets between
+repeats keep "cold" cases cold. Results (best and median ms, per-item ms) go to
+.agent/bench/latest.json and are compared with the baseline by best time: a
+case is "regressed" when it is slower than baseline * (1 + --tolerance) and by
+more than --min-ms. The baseline is machine-specific, so it lives in
+.agent/bench/baseline.json by default; CI can pin one with --baseline.
+
+Usage: python scripts/bench/run-benchmarks.py [--tier small,medium,large] [--case PREFIX ...]
+       [--repeat 5] [--baseline PATH] [--update-baseline] [--tolerance 0.25] [--min-ms 2] [--json]
+
+Exit codes: 0 ok, 2 regression against the baseline, 1 error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import Callable
+
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parents[1]
+for sub in ("scripts/audits", "tools/creatureHero", ".jules/prompts"):
+    sys.path.insert(0, str(ROOT / sub))
+
+import fixtures  # noqa: E402
+from fixtures import TIERS, Tier  # noqa: E402
+
+from audit_runner import check_margins, check_square  # noqa: E402
+from image_audit import audit_image  # noqa: E402
+from phash_index import hash_image  # noqa: E402
+from race_index import RaceIndex  # noqa: E402
+from race_status_log import StatusIndex, load_done_pairs, tail_entries  # noqa: E402
+from backlog_diff import expand_backlog  # noqa: E402
+from repo_scan import RepoScanner, walk  # noqa: E402
+
+import update_prompts  # noqa: E402
+from artifact_store import ArtifactStore  # noqa: E402
+from convert import convert_entry  # noqa: E402
+from fake_trellis import make_backend, write_glb  # noqa: E402
+from glb_inspect import glb_stats  # noqa: E402
+from glb_inventory import GlbInventory  # noqa: E402
+from prepare_master import prepare_entry  # noqa: E402
+from stage_cache import StageCache  # noqa: E402
+
+
+BENCH_DIR = ROOT / ".agent" / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_RESULTS = BENCH_DIR / "latest.json"
+RESULTS_VERSION = 1
+UNTIERED = "repo"
+PORTRAITS_PER_KIND = 2
+GLB_TRIANGLES = 150_000
+HERO_ENTRY = "bench-hero"
+
+
+# ============================================================================
+# Workspace: fixtures for one tier, generated on first use
+# ============================================================================
+class Workspace:
+    def __init__(self, tier: Tier, directory: Path):
+        self.tier = tier
+        self.dir = directory
+
+    def sub(self, name: str) -> Path:
+        p = self.dir / name
+        p.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @cached_property
+    def portraits(self) -> list[str]:
+        return fixtures.portraits(self.dir / "portraits", self.tier.px, PORTRAITS_PER_KIND)
+
+    @cached_property
+    def races(self) -> list[tuple[str, str]]:
+        return fixtures.race_names(self.tier.races)
+
+    @cached_property
+    def races_dir(self) -> Path:
+        return fixtures.races_dir(self.dir / "races", self.tier.races)
+
+    @cached_property
+    def status(self) -> tuple[Path, Path]:
+        return fixtures.status_files(self.dir / "status", self.tier.status_entries, self.races)
+
+    @cached_property
+    def backlog(self) -> Path:
+        return fixtures.backlog(self.dir / "backlog", self.tier.backlog_items, self.races)
+
+    @cached_property
+    def personas(self) -> tuple[Path, Path]:
+        return fixtures.personas(self.dir / "jules", self.tier.personas)
+
+    @cached_property
+    def hero_base(self) -> Path:
+        base = self.sub("hero")
+        fixtures.hero_entry(base, HERO_ENTRY, self.tier.px)
+        return base
+
+    @cached_property
+    def master(self) -> Path:
+        """A pristine fake master; cases copy it before modifying."""
+        path = self.sub("masters") / "master.glb"
+        write_glb(path, self.tier.px, GLB_TRIANGLES, self.tier.glb_pad_mb * 1024 * 1024)
+        return path
+
+    def race_index(self, name: str) -> RaceIndex:
+        index = RaceIndex(self.sub("index") / f"{name}.json", self.races_dir)
+        index.scanner = RepoScanner(name, root=self.dir, cache_dir=self.sub("cache"))
+        return index
+
+
+# ============================================================================
+# Cases
+# ============================================================================
+@dataclass
+class Timed:
+    run: Callable[[], object]
+    items: int = 1
+    reset: Callable[[], None] | None = None  # untimed, before every repeat
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    build: Callable[[Workspace], Timed]
+    tiered: bool = True
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, tiered: bool = True) -> Callable[[Callable[[Workspace], Timed]], Callable[[Workspace], Timed]]:
+    def register(fn: Callable[[Workspace], Timed]) -> Callable[[Workspace], Timed]:
+        CASES[name] = Case(name, fn, tiered)
+        return fn
+
+    return register
+
+
+def _unlink(*paths: Path) -> None:
+    for p in paths:
+        with contextlib.suppress(FileNotFoundError):
+            p.unlink()
+
+
+def _over_portraits(check: Callable[[str], object]) -> Callable[[Workspace], Timed]:
+    def build(ws: Workspace) -> Timed:
+        paths = ws.portraits
+        return Timed(lambda: [check(p) for p in paths], len(paths))
+
+    return build
+
+
+case("audits.square")(_over_portraits(check_square))
+case("audits.margins")(_over_portraits(check_margins))
+case("audits.audit-image")(_over_portraits(audit_image))
+case("audits.phash")(_over_portraits(hash_image))
+
+
+@case("race-index.cold")
+def race_index_cold(ws: Workspace) -> Timed:
+    ws.races_dir
+
+    def run() -> None:
+        index = ws.race_index("race-index-cold")
+        index.refresh()
+        index.save()
+
+    def reset() -> None:
+        _unlink(ws.dir / "index" / "race-index-cold.json", ws.dir / "cache" / "race-index-cold.json")
+
+    return Timed(run, ws.tier.races, reset)
+
+
+@case("race-index.warm")
+def race_index_warm(ws: Workspace) -> Timed:
+    ws.races_dir
+
+    def run() -> None:
+        index = ws.race_index("race-index-warm")
+        index.refresh()
+        index.save()
+
+    return Timed(run, ws.tier.races)
+
+
+@case("status.tail")
+def status_tail(ws: Workspace) -> Timed:
+    _, log = ws.status
+    return Timed(lambda: tail_entries(100, log), 100)
+
+
+def _status_index(ws: Workspace, name: str) -> tuple[Callable[[], object], Path]:
+    _, log = ws.status
+    path = ws.sub("index") / f"{name}.json"
+
+    def run() -> set:
+        index = StatusIndex(log, path)
+        index.refresh()
+        index.save()
+        return index.done_pairs()
+
+    return run, path
+
+
+@case("status.index-cold")
+def status_index_cold(ws: Workspace) -> Timed:
+    run, path = _status_index(ws, "status-index-cold")
+    return Timed(run, ws.tier.status_entries, lambda: _unlink(path))
+
+
+@case("status.index-warm")
+def status_index_warm(ws: Workspace) -> Timed:
+    run, _ = _status_index(ws, "status-index-warm")
+    return Timed(run, ws.tier.status_entries)
+
+
+@case("status.done-pairs-json")
+def status_done_pairs_json(ws: Workspace) -> Timed:
+    status, _ = ws.status
+    # No log beside it: load_done_pairs() falls back to parsing the whole document.
+    missing_log = ws.dir / "status" / "absent.jsonl"
+    return Timed(lambda: load_done_pairs(status, missing_log), ws.tier.status_entries)
+
+
+@case("backlog.diff")
+def backlog_diff(ws: Workspace) -> Timed:
+    backlog = ws.backlog
+    index = ws.race_index("race-index-backlog")
+    index.refresh()
+    done_run, _ = _status_index(ws, "status-index-backlog")
+    done_run()
+
+    def run() -> list:
+        items = json.loads(backlog.read_text(encoding="utf-8")).get("items", [])
+        work = expand_backlog(items, index.name_to_id())
+        done = done_run()
+        return [w for w in work if w.pair and w.pair not in done]
+
+    return Timed(run, ws.tier.backlog_items)
+
+
+SCANNED = ("portraits", "races", "status", "backlog", "jules")
+
+
+def _scan(ws: Workspace, name: str) -> Callable[[], int]:
+    ws.portraits, ws.races_dir, ws.status, ws.backlog, ws.personas
+
+    def run() -> int:
+        scanner = RepoScanner(name, root=ws.dir, cache_dir=ws.sub("cache"))
+        files = len(scanner.scan(*SCANNED).files)
+        scanner.save()
+        return files
+
+    return run
+
+
+@case("repo-scan.cold")
+def repo_scan_cold(ws: Workspace) -> Timed:
+    run = _scan(ws, "scan-cold")
+    return Timed(run, run(), lambda: _unlink(ws.dir / "cache" / "scan-cold.json"))
+
+
+@case("repo-scan.warm")
+def repo_scan_warm(ws: Workspace) -> Timed:
+    run = _scan(ws, "scan-warm")
+    return Timed(run, run())
+
+
+def _prompts(ws: Workspace, out: Path) -> Callable[[], object]:
+    personas_dir, roster = ws.personas
+
+    def run() -> tuple:
+        return update_prompts.sync(update_prompts.load_personas(str(personas_dir), str(roster)), str(out))
+
+    return run
+
+
+@case("prompts.sync-cold")
+def prompts_sync_cold(ws: Workspace) -> Timed:
+    out = ws.dir / "prompts-cold"
+
+    def reset() -> None:
+        shutil.rmtree(out, ignore_errors=True)
+        out.mkdir()
+
+    return Timed(_prompts(ws, out), ws.tier.personas, reset)
+
+
+@case("prompts.sync-warm")
+def prompts_sync_warm(ws: Workspace) -> Timed:
+    return Timed(_prompts(ws, ws.sub("prompts-warm")), ws.tier.personas)
+
+
+def _convert(ws: Workspace, cache: StageCache | None) -> Timed:
+    base = ws.hero_base
+    hero_dir = base / HERO_ENTRY
+    backend = make_backend(
+        ws.sub("trellis"), texture_size=ws.tier.px, triangles=GLB_TRIANGLES,
+        pad_bytes=ws.tier.glb_pad_mb * 1024 * 1024,
+    )
+    store = ArtifactStore(ws.sub("blobs"))
+
+    def run() -> dict:
+        return convert_entry(HERO_ENTRY, base=base, backend=backend, log=lambda _: None, cache=cache, store=store)
+
+    def reset() -> None:
+        _unlink(hero_dir / "master.glb", hero_dir / "hero.json", hero_dir / "telemetry.jsonl")
+
+    return Timed(run, 1, reset)
+
+
+@case("hero.convert")
+def hero_convert(ws: Workspace) -> Timed:
+    return _convert(ws, None)
+
+
+@case("hero.convert-cached")
+def hero_convert_cached(ws: Workspace) -> Timed:
+    return _convert(ws, StageCache(ws.sub("stage-cache")))
+
+
+@case("hero.glb-stats")
+def hero_glb_stats(ws: Workspace) -> Timed:
+    master = ws.master
+    return Timed(lambda: glb_stats(master))
+
+
+@case("hero.prepare")
+def hero_prepare(ws: Workspace) -> Timed:
+    base = ws.sub("prepare")
+    hero_dir = base / HERO_ENTRY
+
+    def reset() -> None:
+        hero_dir.mkdir(exist_ok=True)
+        _unlink(hero_dir / "hero.json")
+        shutil.copyfile(ws.master, hero_dir / "master.glb")
+
+    return Timed(lambda: prepare_entry(HERO_ENTRY, base, max_texture=ws.tier.px // 2), 1, reset)
+
+
+@case("repo.walk", tiered=False)
+def repo_walk(ws: Workspace) -> Timed:
+    count = sum(1 for _ in walk())
+    return Timed(lambda: sum(1 for _ in walk()), count)
+
+
+@case("repo.prompts-check", tiered=False)
+def repo_prompts_check(ws: Workspace) -> Timed:
+    personas = update_prompts.load_personas()
+
+    def run() -> tuple:
+        return update_prompts.sync(update_prompts.load_personas(), check=True)
+
+    return Timed(run, len(personas))
+
+
+@case("repo.glb-inventory", tiered=False)
+def repo_glb_inventory(ws: Workspace) -> Timed:
+    index = ws.sub("index") / "glb-inventory.json"
+
+    def run() -> list:
+        inventory = GlbInventory(index)
+        inventory.refresh()
+        inventory.save()
+        return inventory.entries()
+
+    def reset() -> None:
+        _unlink(index)
+
+    reset()
+    return Timed(run, len(run()), reset)
+
+
+# ============================================================================
+# Timing and comparison
+# ============================================================================
+def measure(timed: Timed, repeat: int) -> dict:
+    # Case code may print (update_prompts, prepare_master); keep stdout for results.
+    with contextlib.redirect_stdout(io.StringIO()):
+        if timed.reset:
+            timed.reset()
+        timed.run()
+        samples = []
+        for _ in range(repeat):
+            if timed.reset:
+                timed.reset()
+            t0 = time.perf_counter()
+            timed.run()
+            samples.append((time.perf_counter() - t0) * 1000)
+    best = min(samples)
+    return {
+        "items": timed.items,
+        "bestMs": round(best, 3),
+        "medianMs": round(statistics.median(samples), 3),
+        "perItemMs": round(best / max(timed.items, 1), 4),
+        "repeat": repeat,
+    }
+
+
+def key(record: dict) -> str:
+    return f"{record['case']}@{record['tier']}"
+
+
+def compare(record: dict, baseline: dict[str, dict], tolerance: float, min_ms: float) -> dict:
+    base = baseline.get(key(record))
+    if base is None:
+        return {**record, "status": "new"}
+    ratio = record["bestMs"] / base["bestMs"] if base["bestMs"] else float("inf")
+    if ratio > 1 + tolerance and record["bestMs"] - base["bestMs"] > min_ms:
+        status = "regressed"
+    elif ratio < 1 / (1 + tolerance) and base["bestMs"] - record["bestMs"] > min_ms:
+        status = "improved"
+    else:
+        status = "ok"
+    return {**record, "baselineMs": base["bestMs"], "ratio": round(ratio, 3), "status": status}
+
+
+def load_results(path: Path) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != RESULTS_VERSION:
+        return {}
+    return {key(r): r for r in data.get("results", [])}
+
+
+def write_results(path: Path, records: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": RESULTS_VERSION,
+        "at": datetime.now(timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": sorted(records, key=key),
+    }
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def select(prefixes: list[str] | None) -> list[Case]:
+    if not prefixes:
+        return list(CASES.values())
+    chosen = [c for c in CASES.values() if any(c.name == p or c.name.startswith(p.rstrip(".") + ".") for p in prefixes)]
+    if not chosen:
+        raise ValueError(f"no case matches {', '.join(prefixes)}; known: {', '.join(CASES)}")
+    return chosen
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the Python asset tooling against a stored baseline")
+    ap.add_argument("--tier", default=",".join(TIERS), help="comma-separated tiers (default: all)")
+    ap.add_argument("--case", action="append", help="case name or prefix (repeatable; default: all)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--update-baseline", action="store_true", help="merge these results into the baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown as a fraction (default 0.25)")
+    ap.add_argument("--min-ms", type=float, default=2.0, help="ignore differences smaller than this")
+    ap.add_argument("--out", type=Path, default=DEFAULT_RESULTS)
+    ap.add_argument("--json", action="store_true", help="one JSON record per case instead of a table")
+    args = ap.parse_args()
+
+    tiers = [t.strip() for t in args.tier.split(",") if t.strip()]
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        print(f"unknown tiers: {', '.join(unknown)} (known: {', '.join(TIERS)})", file=sys.stderr)
+        return 1
+    try:
+        cases = select(args.case)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    baseline = load_results(args.baseline)
+    records: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="asset-bench-") as tmp:
+        runs = [(c, UNTIERED) for c in cases if not c.tiered]
+        runs += [(c, t) for t in tiers for c in cases if c.tiered]
+        workspaces: dict[str, Workspace] = {}
+        for c, tier in runs:
+            ws = workspaces.get(tier)
+            if ws is None:
+                ws = workspaces[tier] = Workspace(TIERS.get(tier, TIERS["small"]), Path(tmp) / tier)
+            try:
+                record = {"case": c.name, "tier": tier, **measure(c.build(ws), args.repeat)}
+            except Exception as e:
+                print(f"{c.name}@{tier}: error: {e}", file=sys.stderr)
+                return 1
+            record = compare(record, baseline, args.tolerance, args.min_ms)
+            records.append(record)
+            if args.json:
+                print(json.dumps(record), flush=True)
+            else:
+                vs = f"{record['ratio']:>6.2f}x {record['status']}" if "ratio" in record else f"{'':>7} {record['status']}"
+                print(f"{key(record):<34} {record['bestMs']:>10.2f} ms  {record['perItemMs']:>9.3f} ms/item  {vs}",
+                      flush=True)
+
+    plain = [{k: v for k, v in r.items() if k not in ("baselineMs", "ratio", "status")} for r in records]
+    write_results(args.out, plain)
+    if args.update_baseline:
+        merged = {**baseline, **{key(r): r for r in plain}}
+        write_results(args.baseline, list(merged.values()))
+        print(f"baseline updated: {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressed = [key(r) for r in records if r["status"] == "regressed"]
+    if regressed:
+        print(f"{len(regressed)} regressed: {', '.join(regressed)}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,6 +8,9 @@ export type Provider = "gemini" | "whisk";
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 const STATUS_PATH = path.join(__dirname, "../public/assets/images/races/race-image-status.json");
+// Append-only download log read by the Python audit tooling (scripts/audits/race_status_log.py).
+// It is created by `race-status-query.py --migrate`; until then the JSON document is the only record.
+const STATUS_LOG_PATH = STATUS_PATH.replace(/\.json$/, ".jsonl");
 
 interface VerificationRecord {
   tool: string;
@@ -57,6 +60,15 @@ function saveStatus(data: RaceImageStatusFile) {
   fs.writeFileSync(STATUS_PATH, JSON.stringify(data, null, 2) + "\n", "utf-8");
 }
 
+// Download lines are the entry as saved; verification lines repeat the merged
+// entry tagged with event: "verification" so the log keeps the full history.
+type RaceImageStatusLogLine = RaceImageStatusEntry & { event?: "verification" };
+
+function appendStatusLog(entry: RaceImageStatusLogLine) {
+  if (!fs.existsSync(STATUS_LOG_PATH)) return;
+  fs.appendFileSync(STATUS_LOG_PATH, JSON.stringify(entry) + "\n", "utf-8");
+}
+
 export function computeFileSha(imagePath: string): string {
   const buffer = fs.readFileSync(imagePath);
   return crypto.createHash("sha256").update(buffer).digest("hex");
@@ -96,6 +108,7 @@ export function recordRaceImageDownload(input: {
     status.entries.push(baseEntry);
   }
   saveStatus(status);
+  appendStatusLog(baseEntry);
   const duplicates = status.entries.filter((entry) => entry.sha256 === sha256 && entry.imagePath !== input.imagePath);
   return { entry: baseEntry, duplicates };
 }
@@ -117,6 +130,7 @@ export function recordRaceImageVerification(imagePath: string, verification: Ver
     verifiedRace: verification.verifiedRace,
   };
   saveStatus(status);
+  appendStatusLog({ ...status.entries[existingIndex], event: "verification" });
   return status.entries[existingIndex];
 }
 
@@ -145,6 +145,20 @@ async function readBody(req: DevHubRouteContext['req']): Promise<Record<string,
   });
 }
 
+/**
+ * Places an immutable artifact at the destination with as little I/O as the volume
+ * allows: a hard link when scratch and public share a filesystem, otherwise a
+ * copy-on-write clone where supported, otherwise a plain copy. Only files that are
+ * never rewritten in place may go through here; a link shares every later write.
+ */
+function linkOrCopyArtifact(src: string, dest: string): void {
+  try {
+    fs.linkSync(src, dest);
+  } catch {
+    fs.copyFileSync(src, dest, fs.constants.COPYFILE_FICLONE);
+  }
+}
+
 /**
  * Returns the path to the directory hosting a specific job's files.
  */
@@ -596,7 +610,14 @@ export async function handleHeroLabRoutes(
         // Any copy failure is cleaned up while the existing target remains untouched.
         fs.mkdirSync(stagedCandidateDir);
         for (const file of filesToCopy) {
-          fs.copyFileSync(path.join(jobDir, file), path.join(stagedCandidateDir, file));
+          // hero.json doubles as the scratch job record and is rewritten in place below,
+          // so it must be a real copy. The other artifacts can be linked: every pipeline
+          // stage replaces them by writing a new file and renaming it over the old one.
+          if (file === 'hero.json') {
+            fs.copyFileSync(path.join(jobDir, file), path.join(stagedCandidateDir, file));
+          } else {
+            linkOrCopyArtifact(path.join(jobDir, file), path.join(stagedCandidateDir, file));
+          }
         }
 
         // Preserve the old directory inside the workspace until both the replacement
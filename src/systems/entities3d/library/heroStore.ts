@@ -16,7 +16,7 @@ import * as path from 'node:path';
 export interface HeroRecord {
   entryId: string;
   prompt?: string;
-  stages: Partial<Record<'reference' | 'master' | 'hero', { at: string; note?: string }>>;
+  stages: Partial<Record<'reference' | 'master' | 'prepare' | 'hero', { at: string; note?: string }>>;
   triangles?: { master: number; hero: number };
   status: 'generated' | 'approved';
 }
@@ -1,13 +1,30 @@
-import chromadb
+import argparse
+import sys
+from pathlib import Path
 
-c = chromadb.PersistentClient(path="C:/Users/Gambit/.mempalace/palace")
-col = c.get_collection("mempalace_drawers")
-total = col.count()
-print(f"Total drawers in palace: {total:,}")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools" / "mempalace"))
+from palace import open_collection, palace_path  # noqa: E402
+from service import ask  # noqa: E402
+
+QUERY = "spell system architecture"
+
+p = argparse.ArgumentParser(description="Probe the MemPalace collection")
+p.add_argument("--palace", help="palace directory (default: $MEMPALACE_PALACE or ~/.mempalace/palace)")
+p.add_argument("--server", metavar="HOST:PORT", help="ask a running tools/mempalace/service.py instead")
+args = p.parse_args()
 
-r = col.query(query_texts=["spell system architecture"], n_results=5, include=["metadatas"])
-print("\nTop 5 results for 'spell system architecture':")
-for m in r["metadatas"][0]:
+if args.server:
+    total = ask(args.server, {"op": "count"})["count"]
+    rows = ask(args.server, {"query": QUERY, "n": 5})["results"][0]
+    metadatas = [r["metadata"] for r in rows]
+else:
+    _, col = open_collection(palace_path(args.palace))
+    total = col.count()
+    metadatas = col.query(query_texts=[QUERY], n_results=5, include=["metadatas"])["metadatas"][0]
+
+print(f"Total drawers in palace: {total:,}")
+print(f"\nTop 5 results for '{QUERY}':")
+for m in metadatas:
     fname = m["source_file"].replace("\\", "/").split("/")[-1]
     room = m.get("room", "?")
     agent = m.get("added_by", "?")
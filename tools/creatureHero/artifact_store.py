@@ -0,0 +1,151 @@
+"""Zero-copy placement and content-addressed dedupe for hero artifacts.
+
+Masters at the 100,000-face export target are tens of MB, and every one used
+to be copied at least twice (Gradio cache -> master.glb -> stage cache). Files
+are now placed, not copied:
+
+  1. hard link, when source and target share a filesystem;
+  2. reflink (copy-on-write clone), where the filesystem supports it;
+  3. a streamed copy that hashes the bytes as they pass.
+
+Placement always lands in a temporary name beside the target and is renamed
+over it, so a half-written file is never visible and an existing target that
+shares an inode with something else is replaced rather than written through.
+
+Invariant: files placed from the store are rename-only. A public master.glb is
+usually a hard link to its blob, so it is the same inode as the cached copy and
+every other entry linked to that blob. Opening it for writing (truncate,
+append, editing in place) silently rewrites all of them and breaks the blob's
+sha256. Every writer (convert.mjs, prepare_master.py, optimize.mjs) writes a
+new file beside the target and renames it over; keep it that way.
+
+ArtifactStore keeps one blob per sha256, so identical masters across entries
+(or across scratch jobs and the public library) share a single copy on disk.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+CHUNK = 1 << 20
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BLOB_ROOT = REPO_ROOT / ".agent" / "cache" / "creature-hero" / "blobs"
+
+# Linux FICLONE ioctl (btrfs, XFS with reflink=1, bcachefs); other systems skip it.
+FICLONE = 0x40049409
+
+
+def _temp_beside(dst):
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp")
+    os.close(fd)
+    os.unlink(tmp)
+    return Path(tmp)
+
+
+def _reflink(src, tmp):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb") as s, open(tmp, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def copy_streaming(src, dst):
+    """Copy src to dst in CHUNK blocks; returns the sha256 of the bytes written."""
+    h = hashlib.sha256()
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        for chunk in iter(lambda: s.read(CHUNK), b""):
+            h.update(chunk)
+            d.write(chunk)
+    return h.hexdigest()
+
+
+def place(src, dst):
+    """Put src's bytes at dst atomically; returns (method, sha256 or None).
+
+    The digest is only known for free on the copy path; callers that need it
+    after a link or reflink hash the file themselves.
+    """
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if src.resolve() == dst.resolve():
+        return "same", None
+    tmp = _temp_beside(dst)
+    try:
+        try:
+            os.link(src, tmp)
+            method, sha = "link", None
+        except OSError:
+            if _reflink(src, tmp):
+                method, sha = "reflink", None
+            else:
+                method, sha = "copy", copy_streaming(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return method, sha
+
+
+def write_json_atomic(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Not mkstemp: hero.json is a public asset and should get the usual umask
+    # permissions rather than mkstemp's owner-only mode.
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "x", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+class ArtifactStore:
+    """Blobs named by sha256; ingest() dedupes, materialize() links a blob into place."""
+
+    def __init__(self, root=DEFAULT_BLOB_ROOT):
+        self.root = Path(root)
+
+    def blob(self, sha, suffix=".glb"):
+        return self.root / sha[:2] / f"{sha}{suffix}"
+
+    def ingest(self, src):
+        """Store src once by content; returns (sha256, whether it was already stored)."""
+        src = Path(src)
+        suffix = src.suffix.lower()
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_beside(self.root / "ingest")
+        try:
+            try:
+                os.link(src, tmp)
+                sha = file_sha256(tmp)
+            except OSError:
+                # Different filesystem (e.g. the Gradio cache on another drive):
+                # the copy we have to make anyway produces the digest.
+                sha = copy_streaming(src, tmp)
+            target = self.blob(sha, suffix)
+            if target.exists():
+                return sha, True
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, target)
+            return sha, False
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    def materialize(self, sha, dst, suffix=".glb"):
+        method, _ = place(self.blob(sha, suffix), dst)
+        return method
@@ -7,7 +7,7 @@
  *
  * Usage: npx tsx tools/creatureHero/collect-reference.mjs <entryId> [--prompt-file p.txt] [--base dir] [--downloads dir]
  */
-import { copyFileSync, readFileSync, readdirSync, statSync } from 'fs';
+import { copyFileSync, readFileSync, readdirSync, renameSync, statSync } from 'fs';
 import path from 'path';
 import { pathToFileURL } from 'url';
 
@@ -51,5 +51,9 @@ const record = readHero(baseDir, entryId) ?? { entryId, stages: {}, status: 'gen
 if (promptFile) record.prompt = readFileSync(promptFile, 'utf8').trim();
 record.stages.reference = { at: new Date().toISOString(), note: newest.f };
 writeHero(baseDir, record); // creates the folder
-copyFileSync(path.join(downloads, newest.f), path.join(dir, 'reference.png'));
+// Copy beside the target and rename: a re-collected reference.png may be hard-linked
+// into a promoted public bundle, and copying onto it would rewrite that file too.
+const referencePath = path.join(dir, 'reference.png');
+copyFileSync(path.join(downloads, newest.f), `${referencePath}.part`);
+renameSync(`${referencePath}.part`, referencePath);
 console.log(`reference.png ← ${newest.f} (${ageMin.toFixed(1)} min old)`);
@@ -10,8 +10,10 @@
  * Usage: npx tsx tools/creatureHero/convert.mjs <entryId> [--base dir]
  */
 import { Client, handle_file } from '@gradio/client';
-import { readFileSync, writeFileSync } from 'fs';
+import { createWriteStream, renameSync, rmSync, statSync } from 'fs';
 import path from 'path';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
 import { pathToFileURL } from 'url';
 
 const [entryId, ...rest] = process.argv.slice(2);
@@ -104,7 +106,19 @@ if (!res.ok) {
   console.error(`GLB download failed: ${res.status} ${res.statusText}`);
   process.exit(1);
 }
-writeFileSync(masterPath, Buffer.from(await res.arrayBuffer()));
+// Stream to a file beside the target and rename: master.glb may be a hard link
+// into the shared artifact store (artifact_store.py), which an in-place write
+// would corrupt. Streaming keeps a tens-of-MB master out of memory, like the
+// streamed ingest convert.py uses.
+const partPath = `${masterPath}.part`;
+try {
+  await pipeline(Readable.fromWeb(res.body), createWriteStream(partPath));
+} catch (err) {
+  rmSync(partPath, { force: true });
+  console.error(`GLB download failed: ${err.message}`);
+  process.exit(1);
+}
+renameSync(partPath, masterPath);
 
 const record = readHero(baseDir, entryId) ?? { entryId, stages: {}, status: 'generated' };
 record.stages.master = { at: new Date().toISOString(), note: SPACE };
@@ -115,7 +129,7 @@ process.exit(0); // the gradio client keeps its socket open — leave explicitly
 
 function statSizeSafe(p) {
   try {
-    return readFileSync(p).byteLength;
+    return statSync(p).size;
   } catch {
     return 0;
   }
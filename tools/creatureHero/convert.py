@@ -5,16 +5,36 @@ the Python Gradio client carries HF_TOKEN into ZeroGPU jobs. It turns the staged
 reference image into a high-detail master.glb. The separate optimize.mjs stage
 then reduces that master to Aralia's 30,000-triangle runtime budget.
 
-Usage: py tools/creatureHero/convert.py <entryId> [--space microsoft/TRELLIS.2] [--base directory]
+Usage: py tools/creatureHero/convert.py <entryId> [<entryId> ...] [--space microsoft/TRELLIS.2]
+       [--base directory] [--concurrency N] [--backend module:factory] [--no-cache]
+
+Several entry ids run as independent jobs, at most --concurrency at a time.
+Each job owns its own client session and state, so one failure never stops
+the rest; the exit code is non-zero if any entry failed.
+
+Stage outputs are content-addressed (see stage_cache.py): re-running an entry
+whose reference and export parameters are unchanged copies the cached master
+instead of calling the Space. --no-cache forces every remote stage.
+
+master.glb is linked from a content-addressed blob (see artifact_store.py), so
+identical masters share one file and hero.json is replaced atomically.
+
+Every stage appends a timing record to telemetry.jsonl beside hero.json; run
+telemetry.py for p50/p95 per stage across entries.
 """
+import importlib
 import json
 import os
-import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
-from gradio_client import Client, handle_file
+from artifact_store import ArtifactStore, write_json_atomic
+from stage_cache import StageCache, file_sha256, master_key, preprocess_key
+from telemetry import TELEMETRY_FILE, NullTelemetry, Telemetry, file_size
 
 # ============================================================================
 # Live TRELLIS export contract
@@ -24,95 +44,299 @@ from gradio_client import Client, handle_file
 # optimize.mjs remains the single owner of Aralia's smaller runtime budget.
 TRELLIS_EXPORT_FACE_TARGET = 100_000
 TRELLIS_TEXTURE_SIZE = 1024
+TRELLIS_SEED = 1
+
+DEFAULT_SPACE = "microsoft/TRELLIS.2"
+# Hero Lab passes a job-specific scratch root with --base. The public library
+# remains the command-line default so existing manual usage keeps working.
+DEFAULT_BASE = Path("public/creatures3d/hero")
+
+_print_lock = threading.Lock()
+
+
+def entry_logger(entry_id):
+    # Concurrent jobs share stdout; the prefix keeps each entry's lines readable.
+    def log(message):
+        with _print_lock:
+            print(f"[{entry_id}] {message}", flush=True)
+
+    return log
+
+
+class StageError(Exception):
+    """A job failed in a way that should be reported, not raised to the batch."""
 
-# ============================================================================
-# Requested hero asset and local stage paths
-# ============================================================================
-# The command operates on one existing reference image and refuses to invent a
-# replacement when the earlier collection stage has not completed.
-if len(sys.argv) < 2:
-    print("usage: py tools/creatureHero/convert.py <entryId> [--space owner/name]", file=sys.stderr)
-    sys.exit(1)
-
-entry_id = sys.argv[1]
-space = "microsoft/TRELLIS.2"
-if "--space" in sys.argv:
-    space = sys.argv[sys.argv.index("--space") + 1]
-
-# Hero Lab passes a job-specific scratch root here. The public library remains
-# the command-line default so existing manual usage keeps working unchanged.
-base = Path("public/creatures3d/hero")
-if "--base" in sys.argv:
-    base = Path(sys.argv[sys.argv.index("--base") + 1])
-hero_dir = base / entry_id
-reference = hero_dir / "reference.png"
-master = hero_dir / "master.glb"
-record_path = hero_dir / "hero.json"
-
-if not reference.exists():
-    print(f'stage "reference" artifact missing for {entry_id} — run the earlier stage first', file=sys.stderr)
-    sys.exit(1)
 
 # ============================================================================
-# Authenticated remote generation
+# Remote backend
 # ============================================================================
-# HF_TOKEN is read from the process environment so the private credential never
-# becomes part of the command arguments, generated files, or repository history.
-token = os.environ.get("HF_TOKEN")
-print(f"connecting to {space}… (token: {'yes' if token else 'no'})")
-client = Client(space, hf_token=token)
-
-print("start_session…")
-client.predict(api_name="/start_session")
-
-print("preprocess_image…")
-processed = client.predict(input=handle_file(str(reference)), api_name="/preprocess_image")
-print("preprocessed:", str(processed)[:160])
-
-print("image_to_3d… (the slow GPU part)")
-client.predict(image=handle_file(str(processed)) if isinstance(processed, str) else processed, seed=1, api_name="/image_to_3d")
-
-print("extract_glb…")
-# TRELLIS produces a reusable high-detail master here. The next local pipeline
-# stage performs the game-specific triangle reduction and verifies its budget.
-result = client.predict(
-    decimation_target=TRELLIS_EXPORT_FACE_TARGET,
-    texture_size=TRELLIS_TEXTURE_SIZE,
-    api_name="/extract_glb",
-)
-print("extract result:", str(result)[:300])
+# A backend is a factory (space, hf_token) -> client with a Gradio-style
+# predict(**kwargs, api_name=...). The default is gradio_client; tests and
+# dry runs pass --backend module:factory to point at a local fake server.
+def gradio_backend(space, token):
+    from gradio_client import Client
+
+    return Client(space, hf_token=token)
+
+
+def load_backend(spec):
+    if not spec:
+        return gradio_backend
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"--backend must be module:factory, got {spec!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+def file_ref(path):
+    # gradio_client needs uploads wrapped; fake backends without it get the path.
+    try:
+        from gradio_client import handle_file
+    except ImportError:
+        return str(path)
+    return handle_file(str(path))
+
 
 # ============================================================================
 # Downloaded GLB selection
 # ============================================================================
 # Gradio versions return either one cached filepath or a collection containing
 # it. Accept those known shapes and fail loudly if no real GLB reached the client.
-glb_path = None
-candidates = result if isinstance(result, (list, tuple)) else [result]
-for c in candidates:
-    if isinstance(c, str) and c.lower().endswith(".glb"):
-        glb_path = c
-        break
-    if isinstance(c, dict) and str(c.get("value", "")).lower().endswith(".glb"):
-        glb_path = c["value"]
-        break
-if glb_path is None or not Path(glb_path).exists():
-    print(f"no GLB in extract result: {result!r}", file=sys.stderr)
-    sys.exit(1)
-
-shutil.copyfile(glb_path, master)
+def select_glb(result):
+    candidates = result if isinstance(result, (list, tuple)) else [result]
+    for c in candidates:
+        if isinstance(c, str) and c.lower().endswith(".glb"):
+            return c
+        if isinstance(c, dict) and str(c.get("value", "")).lower().endswith(".glb"):
+            return c["value"]
+    return None
+
 
 # ============================================================================
-# Durable stage provenance
+# One hero entry
 # ============================================================================
-# Record which hosted Space produced the master so later optimization, review,
-# and approval never confuse this asset with the earlier code-sculpt candidate.
-record = {"entryId": entry_id, "stages": {}, "status": "generated"}
-if record_path.exists():
-    record = json.loads(record_path.read_text(encoding="utf-8"))
-record.setdefault("stages", {})["master"] = {
-    "at": datetime.now(timezone.utc).isoformat(),
-    "note": space,
-}
-record_path.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
-print(f"master.glb written ({master.stat().st_size / 1024 / 1024:.1f} MB)")
+def convert_entry(
+    entry_id,
+    space=DEFAULT_SPACE,
+    base=DEFAULT_BASE,
+    backend=gradio_backend,
+    log=print,
+    cache=None,
+    store=None,
+    queued_at=None,
+):
+    """Run the whole TRELLIS flow for one entry; returns a small summary dict.
+
+    queued_at is the time.monotonic() at which a batch submitted the entry, so
+    the wait for a free worker shows up in telemetry.
+    """
+    hero_dir = Path(base) / entry_id
+    reference = hero_dir / "reference.png"
+    master = hero_dir / "master.glb"
+    record_path = hero_dir / "hero.json"
+
+    # The command operates on one existing reference image and refuses to invent a
+    # replacement when the earlier collection stage has not completed.
+    if not reference.exists():
+        raise StageError(f'stage "reference" artifact missing for {entry_id} — run the earlier stage first')
+    telemetry = Telemetry(hero_dir / TELEMETRY_FILE, entry_id)
+    if queued_at is not None:
+        telemetry.record("queue", time.monotonic() - queued_at)
+
+    # ========================================================================
+    # Content-addressed reuse
+    # ========================================================================
+    # Everything TRELLIS sees is in these keys, so an unchanged entry can skip
+    # the Space entirely and spend no ZeroGPU quota.
+    reference_sha = file_sha256(reference)
+    pre_key = preprocess_key(reference_sha, space)
+    glb_key = master_key(reference_sha, space, TRELLIS_SEED, TRELLIS_EXPORT_FACE_TARGET, TRELLIS_TEXTURE_SIZE)
+    cached_master = cache.get("master", glb_key) if cache else None
+
+    if cached_master is not None:
+        log(f"master cache hit ({glb_key}) — skipping remote stages")
+        source = cached_master
+    else:
+        source = run_remote_stages(reference, space, backend, log, cache, pre_key, telemetry)
+
+    # The download is stored once by content and linked into the entry, so a
+    # repeat run, a cache hit or a second entry with the same mesh costs no copy.
+    store = store or ArtifactStore()
+    with telemetry.stage("copy", cached=cached_master is not None) as rec:
+        master_sha, rec["deduped"] = store.ingest(source)
+        rec["method"] = store.materialize(master_sha, master)
+        if cache and cached_master is None:
+            cache.put("master", glb_key, master, {"entryId": entry_id, "space": space})
+        rec["bytes"] = file_size(master)
+
+    # ========================================================================
+    # Durable stage provenance
+    # ========================================================================
+    # Record which hosted Space produced the master so later optimization, review,
+    # and approval never confuse this asset with the earlier code-sculpt candidate.
+    record = {"entryId": entry_id, "stages": {}, "status": "generated"}
+    if record_path.exists():
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+    record.setdefault("stages", {})["master"] = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "note": space,
+        "cacheKey": glb_key,
+        "cached": cached_master is not None,
+        "sha256": master_sha,
+    }
+    write_json_atomic(record_path, record)
+    size = master.stat().st_size
+    log(f"master.glb written ({size / 1024 / 1024:.1f} MB)")
+    return {
+        "entryId": entry_id,
+        "master": str(master),
+        "bytes": size,
+        "cached": cached_master is not None,
+        "sha256": master_sha,
+    }
+
+
+# ============================================================================
+# Authenticated remote generation
+# ============================================================================
+def run_remote_stages(reference, space, backend, log, cache, pre_key, telemetry=None):
+    """start_session → preprocess_image → image_to_3d → extract_glb; returns the GLB path."""
+    telemetry = telemetry or NullTelemetry()
+    # HF_TOKEN is read from the process environment so the private credential never
+    # becomes part of the command arguments, generated files, or repository history.
+    token = os.environ.get("HF_TOKEN")
+    log(f"connecting to {space}… (token: {'yes' if token else 'no'})")
+    client = backend(space, token)
+
+    log("start_session…")
+    with telemetry.stage("start_session"):
+        client.predict(api_name="/start_session")
+
+    processed = cache.get("preprocess", pre_key) if cache else None
+    if processed is not None:
+        log(f"preprocess cache hit ({pre_key})")
+        processed = str(processed)
+        telemetry.record("preprocess_image", 0.0, cached=True)
+    else:
+        log("preprocess_image…")
+        with telemetry.stage("preprocess_image", bytesUp=file_size(reference)) as rec:
+            processed = client.predict(input=file_ref(reference), api_name="/preprocess_image")
+            rec["bytesDown"] = file_size(processed) if isinstance(processed, str) else 0
+        log(f"preprocessed: {str(processed)[:160]}")
+        if cache and isinstance(processed, str) and Path(processed).exists():
+            cache.put("preprocess", pre_key, processed)
+
+    log("image_to_3d… (the slow GPU part)")
+    with telemetry.stage("image_to_3d", bytesUp=file_size(processed) if isinstance(processed, str) else 0):
+        client.predict(
+            image=file_ref(processed) if isinstance(processed, str) else processed,
+            seed=TRELLIS_SEED,
+            api_name="/image_to_3d",
+        )
+
+    log("extract_glb…")
+    # TRELLIS produces a reusable high-detail master here. The next local pipeline
+    # stage performs the game-specific triangle reduction and verifies its budget.
+    with telemetry.stage("extract_glb") as rec:
+        result = client.predict(
+            decimation_target=TRELLIS_EXPORT_FACE_TARGET,
+            texture_size=TRELLIS_TEXTURE_SIZE,
+            api_name="/extract_glb",
+        )
+        glb_path = select_glb(result)
+        rec["bytesDown"] = file_size(glb_path)
+    log(f"extract result: {str(result)[:300]}")
+
+    if glb_path is None or not Path(glb_path).exists():
+        raise StageError(f"no GLB in extract result: {result!r}")
+    return glb_path
+
+
+# ============================================================================
+# Batch orchestration
+# ============================================================================
+# The remote calls are blocking network waits, so a thread pool gives real
+# concurrency. The limit protects the shared ZeroGPU quota, not local CPU.
+def convert_many(
+    entry_ids, space=DEFAULT_SPACE, base=DEFAULT_BASE, backend=gradio_backend, concurrency=2, cache=None, store=None
+):
+    """Convert every entry; returns {entryId: {"ok": bool, ...}} in input order."""
+    results = {}
+    total = len(entry_ids)
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, total))) as pool:
+        submitted = time.monotonic()
+        futures = {
+            pool.submit(convert_entry, e, space, base, backend, entry_logger(e), cache, store, submitted): e
+            for e in entry_ids
+        }
+        for fut in as_completed(futures):
+            entry_id = futures[fut]
+            try:
+                results[entry_id] = {"ok": True, **fut.result()}
+            except Exception as e:
+                # One bad entry (quota, missing reference, no GLB) must not sink the batch.
+                results[entry_id] = {"ok": False, "entryId": entry_id, "error": f"{type(e).__name__}: {e}"}
+                entry_logger(entry_id)(f"FAILED: {results[entry_id]['error']}")
+            done = len(results)
+            failed = sum(1 for r in results.values() if not r["ok"])
+            with _print_lock:
+                print(f"progress: {done}/{total} finished, {failed} failed", flush=True)
+    return {e: results[e] for e in entry_ids}
+
+
+def parse_args(argv):
+    entry_ids = []
+    opts = {"space": DEFAULT_SPACE, "base": str(DEFAULT_BASE), "concurrency": "2", "backend": "", "cache": True}
+    it = iter(argv)
+    for a in it:
+        if a == "--no-cache":
+            opts["cache"] = False
+        elif a.startswith("--") and a[2:] in opts:
+            opts[a[2:]] = next(it, None)
+            if opts[a[2:]] is None:
+                return None
+        elif a.startswith("--"):
+            return None
+        else:
+            entry_ids.append(a)
+    if not entry_ids:
+        return None
+    return entry_ids, opts
+
+
+def main(argv):
+    parsed = parse_args(argv)
+    if parsed is None:
+        print(
+            "usage: py tools/creatureHero/convert.py <entryId> [<entryId> ...] [--space owner/name] "
+            "[--base dir] [--concurrency N] [--backend module:factory] [--no-cache]",
+            file=sys.stderr,
+        )
+        return 1
+    entry_ids, opts = parsed
+    cache = StageCache() if opts["cache"] else None
+    store = ArtifactStore()
+    try:
+        backend = load_backend(opts["backend"])
+        concurrency = int(opts["concurrency"])
+    except (ImportError, AttributeError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    # A single entry keeps the original direct behaviour: errors go to stderr
+    # and exit 1, with no batch summary in the way of Hero Lab's log parsing.
+    if len(entry_ids) == 1:
+        try:
+            convert_entry(entry_ids[0], opts["space"], Path(opts["base"]), backend, cache=cache, store=store)
+        except StageError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        return 0
+
+    results = convert_many(entry_ids, opts["space"], Path(opts["base"]), backend, concurrency, cache, store)
+    print(json.dumps({"results": list(results.values())}, indent=2))
+    return 0 if all(r["ok"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
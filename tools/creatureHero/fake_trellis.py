@@ -0,0 +1,184 @@
+"""Offline stand-in for the TRELLIS.2 Space, for dry runs and benchmarks.
+
+convert.py accepts --backend module:factory; this module's backend() answers
+the four endpoints convert.py calls without a network or a GPU:
+
+  /start_session     nothing
+  /preprocess_image  copies the uploaded reference into the scratch directory
+                     (a plain path, or gradio_client's handle_file() dict)
+  /image_to_3d       nothing
+  /extract_glb       copies a synthetic master GLB into the scratch directory
+                     (as a download would land there) and returns [path]
+
+Usage: py tools/creatureHero/convert.py <entryId> --backend fake_trellis:backend --base <scratch>
+
+The GLB comes from write_glb(): a triangle-list mesh, one embedded PNG texture
+and optional padding in the binary chunk, so glb_inspect.py and
+prepare_master.py see a realistic file of a chosen size. Environment knobs:
+
+  FAKE_TRELLIS_LATENCY      seconds slept per call (default 0)
+  FAKE_TRELLIS_TEXTURE      texture edge in pixels (default 1024)
+  FAKE_TRELLIS_TRIANGLES    triangle count (default 100000)
+  FAKE_TRELLIS_PAD_MB       extra binary bytes, in MB (default 0)
+
+backend() builds its factory once per process, in one scratch directory that
+is removed at exit, so a batch of entries shares a single master GLB.
+"""
+import atexit
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from glb_inspect import CHUNK_BIN, CHUNK_HEADER, CHUNK_JSON, GLB_MAGIC, HEADER, _pad
+
+# glTF accessor component types.
+FLOAT, UNSIGNED_INT = 5126, 5125
+
+
+# ============================================================================
+# Synthetic GLB
+# ============================================================================
+def texture_png(size):
+    """Gradient plus one noisy channel: compresses roughly like a baked texture, unlike a flat fill."""
+    from PIL import Image
+
+    ramp = Image.linear_gradient("L").resize((size, size))
+    img = Image.merge("RGB", (ramp, ramp.rotate(90), Image.effect_noise((size, size), 24)))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def write_glb(path, texture_size=1024, triangles=100_000, pad_bytes=0):
+    """Write a valid GLB with one textured triangle-list mesh; returns its size in bytes."""
+    vertices = triangles * 3
+    # The tooling counts vertices and indices but never reads them, so zeros are fine.
+    views = [
+        (bytes(vertices * 12), "positions"),
+        (bytes(vertices * 4), "indices"),
+        (texture_png(texture_size), "image"),
+    ]
+    if pad_bytes:
+        views.append((bytes(pad_bytes), "padding"))
+
+    bin_chunk = bytearray()
+    buffer_views = []
+    for data, _ in views:
+        bin_chunk += b"\0" * _pad(len(bin_chunk))
+        buffer_views.append({"buffer": 0, "byteOffset": len(bin_chunk), "byteLength": len(data)})
+        bin_chunk += data
+    bin_chunk += b"\0" * _pad(len(bin_chunk))
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "fake_trellis"},
+        "buffers": [{"byteLength": len(bin_chunk)}],
+        "bufferViews": buffer_views,
+        "accessors": [
+            {"bufferView": 0, "componentType": FLOAT, "count": vertices, "type": "VEC3",
+             "min": [0, 0, 0], "max": [0, 0, 0]},
+            {"bufferView": 1, "componentType": UNSIGNED_INT, "count": vertices, "type": "SCALAR"},
+        ],
+        "images": [{"bufferView": 2, "mimeType": "image/png"}],
+        "textures": [{"source": 0}],
+        "materials": [{"pbrMetallicRoughness": {"baseColorTexture": {"index": 0}}}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "material": 0}]}],
+        "nodes": [{"mesh": 0}],
+        "scenes": [{"nodes": [0]}],
+        "scene": 0,
+    }
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * _pad(len(json_chunk))
+    total = HEADER.size + CHUNK_HEADER.size * 2 + len(json_chunk) + len(bin_chunk)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(GLB_MAGIC, 2, total))
+        f.write(CHUNK_HEADER.pack(len(json_chunk), CHUNK_JSON))
+        f.write(json_chunk)
+        f.write(CHUNK_HEADER.pack(len(bin_chunk), CHUNK_BIN))
+        f.write(bin_chunk)
+    return total
+
+
+# ============================================================================
+# Backend
+# ============================================================================
+def upload_path(ref):
+    """Local path of an upload: convert.file_ref() passes handle_file()'s dict when gradio_client is installed."""
+    return Path(ref["path"] if isinstance(ref, dict) else str(ref))
+
+
+class FakeTrellisClient:
+    def __init__(self, scratch, master, latency=0.0):
+        self.scratch = Path(scratch)
+        self.master = Path(master)
+        self.latency = latency
+        self.calls = []
+
+    def predict(self, api_name, **kwargs):
+        self.calls.append(api_name)
+        if self.latency:
+            time.sleep(self.latency)
+        if api_name == "/preprocess_image":
+            src = upload_path(kwargs["input"])
+            # Unique names: clients from one factory share the scratch directory.
+            dst = self.scratch / f"preprocessed-{uuid.uuid4().hex}{src.suffix}"
+            shutil.copyfile(src, dst)
+            return str(dst)
+        if api_name == "/extract_glb":
+            dst = self.scratch / f"extract-{uuid.uuid4().hex}.glb"
+            shutil.copyfile(self.master, dst)
+            return [str(dst)]
+        if api_name in ("/start_session", "/image_to_3d"):
+            return None
+        raise ValueError(f"fake_trellis: unknown endpoint {api_name}")
+
+
+def make_backend(scratch=None, latency=0.0, texture_size=1024, triangles=100_000, pad_bytes=0):
+    """Factory (space, token) -> FakeTrellisClient writing into scratch (a fresh temp dir by default).
+
+    The master GLB is written once per factory, on the first client, so
+    repeated conversions pay for the copy but not for building the file.
+    """
+    root = Path(scratch) if scratch else Path(tempfile.mkdtemp(prefix="fake-trellis-"))
+    master = root / f"master-{texture_size}-{triangles}-{pad_bytes}.glb"
+    lock = threading.Lock()
+
+    def factory(space, token):
+        # convert_many() opens clients from several threads; only one builds the master.
+        with lock:
+            root.mkdir(parents=True, exist_ok=True)
+            if not master.exists():
+                write_glb(master, texture_size, triangles, pad_bytes)
+        return FakeTrellisClient(root, master, latency)
+
+    return factory
+
+
+_shared_factory = None
+_shared_lock = threading.Lock()
+
+
+def backend(space, token):
+    """--backend fake_trellis:backend, configured from FAKE_TRELLIS_* environment variables."""
+    global _shared_factory
+    with _shared_lock:
+        if _shared_factory is None:
+            env = os.environ.get
+            scratch = tempfile.mkdtemp(prefix="fake-trellis-")
+            atexit.register(shutil.rmtree, scratch, True)
+            _shared_factory = make_backend(
+                scratch,
+                latency=float(env("FAKE_TRELLIS_LATENCY", "0")),
+                texture_size=int(env("FAKE_TRELLIS_TEXTURE", "1024")),
+                triangles=int(env("FAKE_TRELLIS_TRIANGLES", "100000")),
+                pad_bytes=int(float(env("FAKE_TRELLIS_PAD_MB", "0")) * 1024 * 1024),
+            )
+    return _shared_factory(space, token)
@@ -1,54 +1,376 @@
 """Headless TRELLIS.2 runner (executes ON the GPU VM, not locally).
 
-Input:  /tmp/reference.png  (solid-background full-body creature reference)
-Output: /tmp/master.glb
+Single shot (what gcp-convert.sh runs):
+  Input:  /tmp/reference.png  (solid-background full-body creature reference)
+  Output: /tmp/master.glb
+
+Worker mode loads the 4B pipeline once and then serves jobs, so a batch of
+creatures pays the model load a single time:
+
+  python run_trellis2.py --spool /tmp/trellis-spool [--exit-when-idle]
+  python run_trellis2.py --listen 127.0.0.1:8765
+  python run_trellis2.py --submit /tmp/trellis-spool --input ref.png --output out.glb [--seed 7]
+
+A job is one JSON object:
+  {"id": "owlbear", "input": "/tmp/owlbear/reference.png", "output": "/tmp/owlbear/master.glb",
+   "resolution": "1024", "seed": 1, "decimation_target": 30000, "texture_size": 1024}
+Only input and output are required; the rest default to the constants below.
+The id defaults to "<output dir>-<output stem>" (owlbear-master above), and
+--submit refuses an id that is already queued or running.
+
+Spool jobs move incoming/ -> running/ -> done/ | failed/ by rename, and the
+finished file carries the job plus its result. The socket protocol is one job
+per line in, one result per line out, served in order (there is one GPU).
+Results carry "stages" wall times (queue, load_image, image_to_3d,
+extract_glb) in the same names convert.py's telemetry.jsonl uses.
 
 Pipeline calls mirror the official Space (microsoft/TRELLIS.2 app.py):
-Trellis2ImageTo3DPipeline.run -> o_voxel.postprocess.to_glb.
+Trellis2ImageTo3DPipeline.run -> o_voxel.postprocess.to_glb. --pipeline
+module:factory swaps in any object with generate(image, job, out_path), which
+is how the job protocol is exercised on CPU without trellis2 installed:
+--pipeline run_trellis2:StubPipeline writes a placeholder GLB instantly.
 """
+import argparse
+import importlib
+import json
+import os
+import socketserver
+import struct
 import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
 
 from PIL import Image
 
-import o_voxel
-from trellis2.pipelines import Trellis2ImageTo3DPipeline
-
 RESOLUTION = "1024"  # 512 | 1024 (cascade) | 1536 (cascade)
 DECIMATION_TARGET = 30000  # our combat triangle budget
 TEXTURE_SIZE = 1024
+SEED = 1
+
+PIPELINE_TYPES = {"512": "512", "1024": "1024_cascade", "1536": "1536_cascade"}
+SPOOL_STATES = ("incoming", "running", "done", "failed")
+
+
+# ============================================================================
+# Model-resident pipeline
+# ============================================================================
+class TrellisPipeline:
+    """The real GPU pipeline; trellis2 and o_voxel are imported only here."""
+
+    def __init__(self):
+        from trellis2.pipelines import Trellis2ImageTo3DPipeline
+
+        print("loading pipeline (microsoft/TRELLIS.2-4B)…", flush=True)
+        self.pipeline = Trellis2ImageTo3DPipeline.from_pretrained("microsoft/TRELLIS.2-4B")
+        self.pipeline.cuda()
+
+    def generate(self, image, job, out_path):
+        import o_voxel
+
+        print("running image→3D…", flush=True)
+        started = time.monotonic()
+        outputs = self.pipeline.run(
+            image,
+            seed=job["seed"],
+            # our references have painted backgrounds — let the pipeline segment
+            preprocess_image=True,
+            pipeline_type=PIPELINE_TYPES[job["resolution"]],
+        )
+        mesh = outputs[0]
+        generated = time.monotonic()
+
+        print("extracting GLB…", flush=True)
+        glb = o_voxel.postprocess.to_glb(
+            vertices=mesh.vertices,
+            faces=mesh.faces,
+            attr_volume=mesh.attrs,
+            coords=mesh.coords,
+            attr_layout=self.pipeline.pbr_attr_layout,
+            grid_size=mesh.res if hasattr(mesh, "res") else int(job["resolution"]),
+            decimation_target=job["decimation_target"],
+            texture_size=job["texture_size"],
+            remesh=True,
+            use_tqdm=True,
+        )
+        glb.export(str(out_path), file_type="glb", extension_webp=True)
+        return {"image_to_3d": generated - started, "extract_glb": time.monotonic() - generated}
+
+
+class StubPipeline:
+    """CPU stand-in: writes a minimal valid GLB (no meshes) named after the job."""
+
+    def generate(self, image, job, out_path):
+        gltf = {"asset": {"version": "2.0", "generator": f"run_trellis2 stub ({job['id']})"}}
+        chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        chunk += b" " * (-len(chunk) % 4)
+        with open(out_path, "wb") as f:
+            f.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(chunk)))
+            f.write(struct.pack("<I4s", len(chunk), b"JSON"))
+            f.write(chunk)
+        return {"image_to_3d": 0.0, "extract_glb": 0.0}
+
+
+def load_pipeline(spec=None):
+    if not spec:
+        return TrellisPipeline()
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"--pipeline must be module:factory, got {spec!r}")
+    return getattr(importlib.import_module(module), name)()
+
+
+# ============================================================================
+# Job protocol
+# ============================================================================
+class JobError(Exception):
+    """A job that cannot run as written (bad field, missing input)."""
+
+
+def default_job_id(output):
+    """"<dir>-<stem>" of the output path, so two outputs in one directory get different ids."""
+    out = Path(output)
+    return "-".join(part for part in (out.parent.name, out.stem) if part) or uuid.uuid4().hex[:12]
+
+
+def normalize_job(raw):
+    if not isinstance(raw, dict):
+        raise JobError("job must be a JSON object")
+    for key in ("input", "output"):
+        if not isinstance(raw.get(key), str) or not raw[key]:
+            raise JobError(f"job needs a {key!r} path")
+    job = {
+        "id": str(raw.get("id") or default_job_id(raw["output"])),
+        "input": raw["input"],
+        "output": raw["output"],
+        "resolution": str(raw.get("resolution", RESOLUTION)),
+        "seed": raw.get("seed", SEED),
+        "decimation_target": raw.get("decimation_target", DECIMATION_TARGET),
+        "texture_size": raw.get("texture_size", TEXTURE_SIZE),
+    }
+    if job["resolution"] not in PIPELINE_TYPES:
+        raise JobError(f"resolution must be one of {sorted(PIPELINE_TYPES)}, got {job['resolution']!r}")
+    for key in ("seed", "decimation_target", "texture_size"):
+        if not isinstance(job[key], int) or isinstance(job[key], bool):
+            raise JobError(f"{key} must be an integer, got {job[key]!r}")
+    return job
+
 
-def main() -> int:
-    image = Image.open("/tmp/reference.png").convert("RGBA")
-    print("loading pipeline (microsoft/TRELLIS.2-4B)…", flush=True)
-    pipeline = Trellis2ImageTo3DPipeline.from_pretrained("microsoft/TRELLIS.2-4B")
-    pipeline.cuda()
-
-    print("running image→3D…", flush=True)
-    outputs = pipeline.run(
-        image,
-        seed=1,
-        # our references have painted backgrounds — let the pipeline segment
-        preprocess_image=True,
-        pipeline_type={"512": "512", "1024": "1024_cascade", "1536": "1536_cascade"}[RESOLUTION],
-    )
-    mesh = outputs[0]
-
-    print("extracting GLB…", flush=True)
-    glb = o_voxel.postprocess.to_glb(
-        vertices=mesh.vertices,
-        faces=mesh.faces,
-        attr_volume=mesh.attrs,
-        coords=mesh.coords,
-        attr_layout=pipeline.pbr_attr_layout,
-        grid_size=mesh.res if hasattr(mesh, "res") else int(RESOLUTION),
-        decimation_target=DECIMATION_TARGET,
-        texture_size=TEXTURE_SIZE,
-        remesh=True,
-        use_tqdm=True,
-    )
-    glb.export("/tmp/master.glb", extension_webp=True)
-    print("done: /tmp/master.glb", flush=True)
+def run_job(pipeline, raw):
+    """Run one job against the resident pipeline; always returns a result dict."""
+    started = time.monotonic()
+    stages = {}
+    if isinstance(raw, dict) and isinstance(raw.get("submittedAt"), (int, float)):
+        stages["queue"] = max(0.0, time.time() - raw["submittedAt"])
+    tmp = None
+    try:
+        job = normalize_job(raw)
+        if not Path(job["input"]).exists():
+            raise JobError(f"input not found: {job['input']}")
+        out = Path(job["output"])
+        out.parent.mkdir(parents=True, exist_ok=True)
+        image = Image.open(job["input"]).convert("RGBA")
+        stages["load_image"] = time.monotonic() - started
+        # Export beside the target and rename, so a reader never picks up half a GLB.
+        # The temp name keeps the .glb suffix: trimesh picks its exporter from it.
+        tmp = out.with_name(f"{out.stem}.part{out.suffix}")
+        # Stub pipelines may return nothing; the real one reports its two phases.
+        stages.update(pipeline.generate(image, job, tmp) or {})
+        os.replace(tmp, out)
+    except Exception as e:
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+        return {
+            "ok": False,
+            "job": raw,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": time.monotonic() - started,
+            "stages": stages,
+        }
+    return {
+        "ok": True,
+        "job": job,
+        "output": str(out),
+        "bytes": out.stat().st_size,
+        "seconds": time.monotonic() - started,
+        "stages": stages,
+    }
+
+
+# ============================================================================
+# Spool directory
+# ============================================================================
+def write_json_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def submit(spool, raw):
+    """Queue a job; returns its id. Raises JobError if a job with that id is queued or running.
+
+    The job file is written beside its target and hard-linked into place, so the
+    worker only ever sees it whole and an existing job is never replaced.
+    """
+    job = normalize_job(raw)
+    spool = Path(spool)
+    name = f"{job['id']}.json"
+    if (spool / "running" / name).exists():
+        raise JobError(f"job {job['id']!r} is already running")
+    target = spool / "incoming" / name
+    tmp = target.with_name(f".{name}.{uuid.uuid4().hex}.tmp")
+    write_json_atomic(tmp, {**job, "submittedAt": time.time()})
+    try:
+        os.link(tmp, target)
+    except FileExistsError:
+        raise JobError(f"job {job['id']!r} is already queued") from None
+    finally:
+        tmp.unlink()
+    return job["id"]
+
+
+def claim(spool):
+    """Move the oldest incoming job to running/; returns its path there, or None."""
+    incoming = Path(spool) / "incoming"
+    for path in sorted(incoming.glob("*.json"), key=lambda p: (p.stat().st_mtime_ns, p.name)):
+        target = Path(spool) / "running" / path.name
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            continue  # another worker took it
+        return target
+    return None
+
+
+def recover(spool):
+    """Requeue jobs a crashed worker left in running/; returns how many."""
+    stuck = list((Path(spool) / "running").glob("*.json"))
+    for path in stuck:
+        os.replace(path, Path(spool) / "incoming" / path.name)
+    return len(stuck)
+
+
+def serve_spool(pipeline, spool, poll=2.0, exit_when_idle=False):
+    spool = Path(spool)
+    for state in SPOOL_STATES:
+        (spool / state).mkdir(parents=True, exist_ok=True)
+    if recover(spool):
+        print("requeued jobs left running by a previous worker", flush=True)
+    served = failed = 0
+    while True:
+        path = claim(spool)
+        if path is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll)
+            continue
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            raw = {"id": path.stem}
+            result = {"ok": False, "job": raw, "error": f"invalid job file: {e}", "seconds": 0.0}
+        else:
+            print(f"job {path.stem}: {raw.get('input')} -> {raw.get('output')}", flush=True)
+            result = run_job(pipeline, raw)
+        state = "done" if result["ok"] else "failed"
+        write_json_atomic(spool / state / path.name, result)
+        path.unlink()
+        served += 1
+        failed += not result["ok"]
+        print(f"job {path.stem}: {state} ({result['seconds']:.1f}s){'' if result['ok'] else ' ' + result['error']}", flush=True)
+    print(f"spool idle: {served} jobs, {failed} failed", flush=True)
+    return 0 if not failed else 2
+
+
+# ============================================================================
+# Local socket
+# ============================================================================
+def socket_server(pipeline, address):
+    """The JSON-lines job server, bound but not yet serving (port 0 picks a free one)."""
+    host, _, port = address.rpartition(":")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except ValueError as e:
+                    result = {"ok": False, "job": None, "error": f"invalid job line: {e}", "seconds": 0.0}
+                else:
+                    result = run_job(pipeline, raw)
+                self.wfile.write((json.dumps(result) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    # Not threaded on purpose: jobs share one GPU, so connections queue in order.
+    return socketserver.TCPServer((host or "127.0.0.1", int(port)), Handler)
+
+
+def serve_socket(pipeline, address):
+    with socket_server(pipeline, address) as server:
+        print(f"listening on {server.server_address[0]}:{server.server_address[1]}", flush=True)
+        server.serve_forever()
+    return 0
+
+
+# ============================================================================
+# Entry point
+# ============================================================================
+def parse_args(argv):
+    p = argparse.ArgumentParser(description="Headless TRELLIS.2 runner")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--spool", help="serve jobs from this spool directory")
+    mode.add_argument("--listen", metavar="HOST:PORT", help="serve JSON-lines jobs on a local socket")
+    mode.add_argument("--submit", metavar="SPOOL", help="queue one job in a spool directory and exit")
+    p.add_argument("--pipeline", help="module:factory returning an object with generate(image, job, out_path)")
+    p.add_argument("--exit-when-idle", action="store_true", help="stop once the spool is empty")
+    p.add_argument("--poll", type=float, default=2.0, help="spool poll interval in seconds")
+    p.add_argument("--id")
+    p.add_argument("--input", default="/tmp/reference.png")
+    p.add_argument("--output", default="/tmp/master.glb")
+    p.add_argument("--resolution", default=RESOLUTION, choices=sorted(PIPELINE_TYPES))
+    p.add_argument("--seed", type=int, default=SEED)
+    p.add_argument("--decimation-target", type=int, default=DECIMATION_TARGET)
+    p.add_argument("--texture-size", type=int, default=TEXTURE_SIZE)
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    job = {
+        "id": args.id,
+        "input": args.input,
+        "output": args.output,
+        "resolution": args.resolution,
+        "seed": args.seed,
+        "decimation_target": args.decimation_target,
+        "texture_size": args.texture_size,
+    }
+    if args.submit:
+        try:
+            print(submit(args.submit, job))
+        except JobError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        return 0
+
+    pipeline = load_pipeline(args.pipeline)
+    if args.spool:
+        return serve_spool(pipeline, args.spool, args.poll, args.exit_when_idle)
+    if args.listen:
+        return serve_socket(pipeline, args.listen)
+
+    result = run_job(pipeline, job)
+    if not result["ok"]:
+        print(result["error"], file=sys.stderr)
+        return 1
+    print(f"done: {result['output']}", flush=True)
     return 0
 
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,99 @@
+import json
+import socket
+import threading
+
+import pytest
+from PIL import Image
+
+from run_trellis2 import JobError, StubPipeline, serve_spool, socket_server, submit
+
+
+@pytest.fixture
+def reference(tmp_path):
+    path = tmp_path / "reference.png"
+    Image.new("RGB", (64, 64), (90, 140, 60)).save(path)
+    return path
+
+
+def read_glb_header(path):
+    data = path.read_bytes()
+    assert data[:4] == b"glTF"
+    assert int.from_bytes(data[8:12], "little") == len(data)
+    return json.loads(data[20:].decode("utf-8"))
+
+
+def test_default_ids_keep_outputs_in_one_directory_apart(tmp_path, reference):
+    spool = tmp_path / "spool"
+    first = submit(spool, {"input": str(reference), "output": str(tmp_path / "out" / "a" / "master.glb")})
+    second = submit(spool, {"input": str(reference), "output": str(tmp_path / "out" / "a" / "other.glb")})
+    assert (first, second) == ("a-master", "a-other")
+    assert sorted(p.name for p in (spool / "incoming").iterdir()) == ["a-master.json", "a-other.json"]
+
+
+def test_submit_refuses_an_id_that_is_queued_or_running(tmp_path, reference):
+    spool = tmp_path / "spool"
+    job = {"id": "owlbear", "input": str(reference), "output": str(tmp_path / "owlbear.glb")}
+    submit(spool, job)
+    with pytest.raises(JobError, match="already queued"):
+        submit(spool, {**job, "seed": 2})
+    assert json.loads((spool / "incoming" / "owlbear.json").read_text())["seed"] == 1
+
+    (spool / "running").mkdir()
+    (spool / "incoming" / "owlbear.json").rename(spool / "running" / "owlbear.json")
+    with pytest.raises(JobError, match="already running"):
+        submit(spool, job)
+    assert [p.name for p in (spool / "incoming").iterdir()] == []
+
+
+def test_spool_worker_runs_every_job_then_exits(tmp_path, reference):
+    spool = tmp_path / "spool"
+    outputs = [tmp_path / "out" / name / "master.glb" for name in ("owlbear", "griffon")]
+    for out in outputs:
+        submit(spool, {"input": str(reference), "output": str(out)})
+    submit(spool, {"id": "lost", "input": str(tmp_path / "missing.png"), "output": str(tmp_path / "lost.glb")})
+    (spool / "incoming" / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert serve_spool(StubPipeline(), spool, exit_when_idle=True) == 2
+
+    for out in outputs:
+        assert read_glb_header(out)["asset"]["version"] == "2.0"
+        assert not out.with_name("master.part.glb").exists()
+    done = {p.stem: json.loads(p.read_text()) for p in (spool / "done").iterdir()}
+    failed = {p.stem: json.loads(p.read_text()) for p in (spool / "failed").iterdir()}
+    assert sorted(done) == ["griffon-master", "owlbear-master"]
+    assert done["owlbear-master"]["output"] == str(outputs[0])
+    assert {"queue", "load_image", "image_to_3d", "extract_glb"} <= set(done["owlbear-master"]["stages"])
+    assert sorted(failed) == ["broken", "lost"]
+    assert "input not found" in failed["lost"]["error"]
+    assert list((spool / "incoming").iterdir()) == list((spool / "running").iterdir()) == []
+
+
+def test_socket_answers_one_result_per_job_line(tmp_path, reference):
+    server = socket_server(StubPipeline(), "127.0.0.1:0")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        out = tmp_path / "wyvern" / "master.glb"
+        lines = [
+            json.dumps({"input": str(reference), "output": str(out)}),
+            "",
+            "not json",
+            json.dumps({"input": str(reference)}),
+        ]
+        with socket.create_connection((host, port), timeout=10) as s:
+            s.sendall(("\n".join(lines) + "\n").encode("utf-8"))
+            s.shutdown(socket.SHUT_WR)
+            with s.makefile("r", encoding="utf-8") as f:
+                results = [json.loads(line) for line in f]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert [r["ok"] for r in results] == [True, False, False]
+    assert results[0]["job"]["id"] == "wyvern-master"
+    assert results[0]["bytes"] == out.stat().st_size
+    assert read_glb_header(out)["asset"]["generator"] == "run_trellis2 stub (wyvern-master)"
+    assert results[1]["error"].startswith("invalid job line")
+    assert "needs a 'output' path" in results[2]["error"]
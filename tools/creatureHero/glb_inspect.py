@@ -0,0 +1,249 @@
+"""Header-level GLB reader: triangle and texture statistics without decoding the mesh.
+
+A GLB is a 12-byte header, a JSON chunk and one binary chunk. open_glb() maps
+the file and parses only the JSON; every count below comes from accessor
+metadata, and texture sizes come from each image's own header, so a 50 MB
+master is summarized by touching a few kilobytes of it.
+
+repack() writes a copy with some image bufferViews replaced (used by
+prepare_master.py to downscale textures). The binary chunk is rebuilt view by
+view straight from the mapping, with each view 4-byte aligned as glTF requires.
+
+Usage: py tools/creatureHero/glb_inspect.py <file.glb> [<file.glb> ...] [--json]
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+GLB_MAGIC = 0x46546C67  # b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+HEADER = struct.Struct("<III")
+CHUNK_HEADER = struct.Struct("<II")
+
+# Enough of an embedded image for PIL to read its size from the header.
+IMAGE_HEAD_BYTES = 64 * 1024
+
+
+class GlbError(Exception):
+    """The file is not a GLB this reader understands."""
+
+
+class Glb:
+    def __init__(self, path, gltf, data, bin_offset, bin_length):
+        self.path = Path(path)
+        self.gltf = gltf
+        self._data = data
+        self.bin_offset = bin_offset
+        self.bin_length = bin_length
+
+    @property
+    def size(self):
+        return len(self._data)
+
+    def view_bytes(self, index):
+        """memoryview of bufferView `index` in the binary chunk (no copy)."""
+        view = self.gltf["bufferViews"][index]
+        if view.get("buffer", 0) != 0 or self.bin_offset is None:
+            raise GlbError(f"bufferView {index} is not in the GLB binary chunk")
+        start = self.bin_offset + view.get("byteOffset", 0)
+        return memoryview(self._data)[start : start + view["byteLength"]]
+
+
+def parse(data, path="<memory>"):
+    if len(data) < HEADER.size:
+        raise GlbError(f"{path}: too short for a GLB header")
+    magic, version, length = HEADER.unpack_from(data, 0)
+    if magic != GLB_MAGIC:
+        raise GlbError(f"{path}: not a GLB file")
+    if version != 2:
+        raise GlbError(f"{path}: GLB version {version} is not supported")
+    gltf = None
+    bin_offset = bin_length = None
+    pos = HEADER.size
+    end = min(length, len(data))
+    while pos + CHUNK_HEADER.size <= end:
+        chunk_length, chunk_type = CHUNK_HEADER.unpack_from(data, pos)
+        body = pos + CHUNK_HEADER.size
+        if chunk_type == CHUNK_JSON and gltf is None:
+            gltf = json.loads(bytes(data[body : body + chunk_length]).decode("utf-8"))
+        elif chunk_type == CHUNK_BIN and bin_offset is None:
+            bin_offset, bin_length = body, chunk_length
+        pos = body + chunk_length
+    if gltf is None:
+        raise GlbError(f"{path}: no JSON chunk")
+    return Glb(path, gltf, data, bin_offset, bin_length)
+
+
+@contextmanager
+def open_glb(path):
+    """Map `path` read-only and yield a parsed Glb; views are valid inside the block."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise GlbError(f"{path}: empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            glb = parse(data, path)
+            try:
+                yield glb
+            finally:
+                glb._data = None
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+def primitive_triangles(gltf, prim):
+    # Matches optimize.mjs's triangleCount(): floor(count / 3) of the index (or
+    # POSITION) accessor whatever the primitive mode, so this stage and the
+    # optimizer compare the same number against PLAN_TRIANGLE_BUDGET. Strips,
+    # fans, lines and points (none of which TRELLIS exports) are miscounted by
+    # both alike.
+    accessors = gltf.get("accessors", [])
+    if "indices" in prim:
+        return accessors[prim["indices"]]["count"] // 3
+    if "POSITION" in prim.get("attributes", {}):
+        return accessors[prim["attributes"]["POSITION"]]["count"] // 3
+    return 0
+
+
+def triangle_count(gltf):
+    """Triangles over every mesh primitive, counted once per mesh as optimize.mjs does."""
+    return sum(primitive_triangles(gltf, p) for m in gltf.get("meshes", []) for p in m.get("primitives", []))
+
+
+def image_size(glb, index):
+    """(width, height) of an embedded image from its header, or (None, None)."""
+    from PIL import Image
+
+    image = glb.gltf["images"][index]
+    if "bufferView" not in image:
+        return None, None
+    view = glb.view_bytes(image["bufferView"])
+    for head in (view[:IMAGE_HEAD_BYTES], view):
+        try:
+            with Image.open(io.BytesIO(head)) as im:
+                return im.size
+        except Exception:
+            continue
+    return None, None
+
+
+def texture_stats(glb):
+    out = []
+    for i, image in enumerate(glb.gltf.get("images", [])):
+        width, height = image_size(glb, i)
+        view = image.get("bufferView")
+        out.append(
+            {
+                "index": i,
+                "mimeType": image.get("mimeType"),
+                "uri": image.get("uri") if view is None else None,
+                "width": width,
+                "height": height,
+                "bytes": glb.gltf["bufferViews"][view]["byteLength"] if view is not None else None,
+            }
+        )
+    return out
+
+
+def glb_stats(path):
+    with open_glb(path) as glb:
+        gltf = glb.gltf
+        textures = texture_stats(glb)
+        return {
+            "path": str(path),
+            "bytes": glb.size,
+            "binBytes": glb.bin_length or 0,
+            "meshes": len(gltf.get("meshes", [])),
+            "primitives": sum(len(m.get("primitives", [])) for m in gltf.get("meshes", [])),
+            "triangles": triangle_count(gltf),
+            "materials": len(gltf.get("materials", [])),
+            "textures": textures,
+            "textureBytes": sum(t["bytes"] or 0 for t in textures),
+            "extensionsUsed": gltf.get("extensionsUsed", []),
+        }
+
+
+# ============================================================================
+# Rewriting
+# ============================================================================
+def _pad(n, align=4):
+    return (align - n % align) % align
+
+
+def repack(glb, out_path, replacements):
+    """Write glb to out_path with bufferViews replaced by {index: bytes}; returns bytes written.
+
+    Views are copied from the mapping in index order, so dead space between
+    views is dropped and replaced images may be any size.
+    """
+    gltf = json.loads(json.dumps(glb.gltf))
+    views = gltf.get("bufferViews", [])
+    layout = []
+    offset = 0
+    for i, view in enumerate(views):
+        if view.get("buffer", 0) != 0:
+            continue
+        payload = replacements[i] if i in replacements else glb.view_bytes(i)
+        offset += _pad(offset)
+        view["byteOffset"] = offset
+        view["byteLength"] = len(payload)
+        layout.append((offset, payload))
+        offset += len(payload)
+    bin_length = offset + _pad(offset)
+    if gltf.get("buffers"):
+        gltf["buffers"][0]["byteLength"] = bin_length
+
+    json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * _pad(len(json_bytes))
+    total = HEADER.size + CHUNK_HEADER.size + len(json_bytes)
+    if layout:
+        total += CHUNK_HEADER.size + bin_length
+
+    with open(out_path, "wb") as f:
+        f.write(HEADER.pack(GLB_MAGIC, 2, total))
+        f.write(CHUNK_HEADER.pack(len(json_bytes), CHUNK_JSON))
+        f.write(json_bytes)
+        if layout:
+            f.write(CHUNK_HEADER.pack(bin_length, CHUNK_BIN))
+            written = 0
+            for start, payload in layout:
+                f.write(b"\0" * (start - written))
+                f.write(payload)
+                written = start + len(payload)
+            f.write(b"\0" * (bin_length - written))
+    return total
+
+
+def main(argv):
+    as_json = "--json" in argv
+    paths = [a for a in argv if a != "--json"]
+    if not paths:
+        print("usage: py tools/creatureHero/glb_inspect.py <file.glb> [<file.glb> ...] [--json]", file=sys.stderr)
+        return 1
+    status = 0
+    for path in paths:
+        try:
+            stats = glb_stats(path)
+        except (OSError, ValueError, GlbError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if as_json:
+            print(json.dumps(stats))
+            continue
+        print(f"{path}: {stats['triangles']:,} triangles, {stats['primitives']} primitives, {stats['bytes'] / 1024 / 1024:.1f} MB")
+        for t in stats["textures"]:
+            size = f"{t['width']}x{t['height']}" if t["width"] else "?"
+            where = f"{t['bytes'] / 1024 / 1024:.2f} MB" if t["bytes"] is not None else f"external {t['uri']}"
+            print(f"  image {t['index']}: {size} {t['mimeType'] or ''} {where}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
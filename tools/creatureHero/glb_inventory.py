@@ -0,0 +1,242 @@
+"""Inventory of every GLB under public/, with a triangle and texture budget report.
+
+optimize.mjs checks one hero entry at a time, after a full gltf-transform
+load. This sweeps the whole asset tree instead: each .glb is read through
+glb_inspect.glb_stats (memory-mapped, JSON chunk and accessor counts only,
+texture sizes from the embedded image headers), and the results are kept in
+.agent/cache/glb-inventory.json:
+
+  {"version": 1, "files": {"public/assets/biomes/prairie/tree.glb": {
+     "size": 2924, "mtime_ns": ..., "triangles": 18, "primitives": 1, "meshes": 1,
+     "materials": 1, "textures": [{"width": 512, "height": 512, "mimeType": "image/png",
+     "bytes": 20480}], "textureBytes": 20480, "extensionsUsed": []}}}
+
+The index doubles as its own change manifest: a refresh walks the sources with
+os.scandir (skipping hidden and node_modules directories), re-reads only GLBs
+whose size or mtime differ from their stored record, and drops deleted ones.
+Nothing is marked as seen until the index itself is written. Unreadable files
+are recorded with their error and retried once they change.
+
+Budgets: triangles default to PLAN_TRIANGLE_BUDGET from budgets.ts (the number
+optimize.mjs enforces), textures to TEXTURE_BUDGET pixels on the longer edge.
+master.glb files are the pre-optimization TRELLIS exports and are listed but
+never flagged.
+
+Usage: py tools/creatureHero/glb_inventory.py [subdir ...] [--max-triangles N] [--max-texture N]
+       [--workers N] [--all] [--rebuild] [--json]
+
+Exit codes: 0 within budget, 1 unreadable GLBs, 2 assets over budget.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from glb_inspect import GlbError, glb_stats
+from prepare_master import plan_triangle_budget
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_INDEX = REPO_ROOT / ".agent" / "cache" / "glb-inventory.json"
+DEFAULT_SOURCES = ("public",)
+INDEX_VERSION = 1
+# TRELLIS bakes at 1K and collected assets ship at up to 2K; anything larger is
+# a texture nobody downscaled.
+TEXTURE_BUDGET = 2048
+# Pipeline intermediates that are over budget by design.
+EXEMPT_NAMES = ("master.glb",)
+SKIP_DIRS = ("node_modules",)
+
+
+# ============================================================================
+# Index
+# ============================================================================
+def walk_glbs(root, sources):
+    """Yield (rel, path, size, mtime_ns) for every .glb under the source directories."""
+    stack = [os.path.join(root, s) for s in sources]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                    stack.append(entry.path)
+                continue
+            if not entry.name.lower().endswith(".glb") or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            yield rel, entry.path, st.st_size, st.st_mtime_ns
+
+
+def inspect(path):
+    """Index record for one GLB: the glb_stats counts, or {"error": ...}."""
+    try:
+        stats = glb_stats(path)
+    except (OSError, ValueError, KeyError, IndexError, GlbError) as e:
+        return {"error": str(e)}
+    return {
+        "triangles": stats["triangles"],
+        "primitives": stats["primitives"],
+        "meshes": stats["meshes"],
+        "materials": stats["materials"],
+        "textures": [
+            {"width": t["width"], "height": t["height"], "mimeType": t["mimeType"], "bytes": t["bytes"], "uri": t["uri"]}
+            for t in stats["textures"]
+        ],
+        "textureBytes": stats["textureBytes"],
+        "extensionsUsed": stats["extensionsUsed"],
+    }
+
+
+class GlbInventory:
+    def __init__(self, path=DEFAULT_INDEX, sources=DEFAULT_SOURCES, root=REPO_ROOT):
+        self.path = Path(path)
+        self.sources = tuple(sources)
+        self.root = Path(root)
+        # repo-relative path -> {"size", "mtime_ns", ...inspect() fields}
+        self.files = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def refresh(self, workers=8):
+        """Re-read new and modified GLBs, drop deleted ones; returns {"read": [...], "removed": [...]}."""
+        found = {}
+        todo = []
+        for rel, path, size, mtime_ns in walk_glbs(self.root, map(self._rel, self.sources)):
+            found[rel] = (path, size, mtime_ns)
+            known = self.files.get(rel)
+            if known is None or known["size"] != size or known["mtime_ns"] != mtime_ns:
+                todo.append(rel)
+        todo.sort()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            records = pool.map(lambda rel: inspect(found[rel][0]), todo)
+            for rel, record in zip(todo, records):
+                _, size, mtime_ns = found[rel]
+                self.files[rel] = {"size": size, "mtime_ns": mtime_ns, **record}
+        removed = [rel for rel in self.files if rel not in found and self._in_sources(rel)]
+        for rel in removed:
+            del self.files[rel]
+        if todo or removed:
+            self.dirty = True
+        return {"read": todo, "removed": removed}
+
+    def _in_sources(self, rel):
+        return any(rel == s or rel.startswith(s.rstrip("/") + "/") for s in map(self._rel, self.sources))
+
+    def _rel(self, source):
+        p = Path(source)
+        return (p.relative_to(self.root) if p.is_absolute() else p).as_posix()
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "files": dict(sorted(self.files.items()))}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def entries(self):
+        """(rel, record) for the GLBs under this inventory's sources."""
+        return [(rel, e) for rel, e in sorted(self.files.items()) if self._in_sources(rel)]
+
+
+# ============================================================================
+# Budget report
+# ============================================================================
+def over_budget(entry, max_triangles, max_texture):
+    """Reasons an asset breaks the budget, e.g. ["triangles 41,200 > 30,000", "texture 1: 4096x4096"]."""
+    reasons = []
+    if entry["triangles"] > max_triangles:
+        reasons.append(f"triangles {entry['triangles']:,} > {max_triangles:,}")
+    for i, t in enumerate(entry["textures"]):
+        if max(t["width"] or 0, t["height"] or 0) > max_texture:
+            reasons.append(f"texture {i}: {t['width']}x{t['height']} > {max_texture}")
+    return reasons
+
+
+def report(inventory, max_triangles, max_texture):
+    rows = []
+    for rel, e in inventory.entries():
+        row = {"path": rel, "bytes": e["size"]}
+        if "error" in e:
+            rows.append({**row, "status": "error", "error": e["error"]})
+            continue
+        reasons = [] if rel.rsplit("/", 1)[-1] in EXEMPT_NAMES else over_budget(e, max_triangles, max_texture)
+        rows.append({
+            **row,
+            "status": "over" if reasons else "ok",
+            "reasons": reasons,
+            "triangles": e["triangles"],
+            "textures": [f"{t['width']}x{t['height']}" for t in e["textures"]],
+            "textureBytes": e["textureBytes"],
+            "extensionsUsed": e["extensionsUsed"],
+        })
+    return rows
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Index every GLB under public/ and report assets over budget")
+    p.add_argument("sources", nargs="*", default=list(DEFAULT_SOURCES), help="repo-relative directories (default: public)")
+    p.add_argument("--max-triangles", type=int, default=None, help="default: PLAN_TRIANGLE_BUDGET from budgets.ts")
+    p.add_argument("--max-texture", type=int, default=TEXTURE_BUDGET, help=f"longest texture edge (default {TEXTURE_BUDGET})")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--all", action="store_true", help="list every GLB, not just those over budget or unreadable")
+    p.add_argument("--rebuild", action="store_true", help="ignore the stored index and re-read every GLB")
+    p.add_argument("--json", action="store_true", help="one JSON record per listed GLB")
+    args = p.parse_args(argv)
+
+    max_triangles = args.max_triangles or plan_triangle_budget()
+    inventory = GlbInventory(sources=args.sources)
+    if args.rebuild:
+        inventory.files = {}
+    changes = inventory.refresh(args.workers)
+    inventory.save()
+
+    rows = report(inventory, max_triangles, args.max_texture)
+    listed = rows if args.all else [r for r in rows if r["status"] != "ok"]
+    for r in listed:
+        if args.json:
+            print(json.dumps(r))
+        elif r["status"] == "error":
+            print(f"ERROR {r['path']}: {r['error']}")
+        else:
+            textures = ", ".join(r["textures"]) or "no textures"
+            line = f"{r['status'].upper():<5} {r['path']}: {r['triangles']:,} triangles, {textures}, {r['bytes'] / 1024 / 1024:.1f} MB"
+            print(line + (f"  ({'; '.join(r['reasons'])})" if r["reasons"] else ""))
+
+    over = sum(r["status"] == "over" for r in rows)
+    errors = sum(r["status"] == "error" for r in rows)
+    total = sum(r["bytes"] for r in rows)
+    print(
+        f"{len(rows)} GLBs ({total / 1024 / 1024:.1f} MB): {len(changes['read'])} read, "
+        f"{len(changes['removed'])} removed, {over} over budget "
+        f"({max_triangles:,} triangles, {args.max_texture}px textures), {errors} unreadable",
+        file=sys.stderr,
+    )
+    if errors:
+        return 1
+    return 2 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -12,7 +12,7 @@ import { NodeIO } from '@gltf-transform/core';
 import { ALL_EXTENSIONS } from '@gltf-transform/extensions';
 import { dedup, prune, simplify, weld } from '@gltf-transform/functions';
 import { MeshoptSimplifier } from 'meshoptimizer';
-import { readFileSync, writeFileSync } from 'fs';
+import { readFileSync, renameSync, writeFileSync } from 'fs';
 import path from 'path';
 import { pathToFileURL } from 'url';
 
@@ -84,7 +84,11 @@ if (bestTris > PLAN_TRIANGLE_BUDGET) {
   process.exit(1);
 }
 
-await io.write(heroPath, best);
+// Write beside the target and rename: hero.glb may be hard-linked into a promoted
+// public bundle (Hero Lab), which an in-place write would rewrite as well. io.write
+// picks GLB or glTF from the extension, so serialize explicitly for the .part name.
+writeFileSync(`${heroPath}.part`, await io.writeBinary(best));
+renameSync(`${heroPath}.part`, heroPath);
 const record = readHero(baseDir, entryId) ?? { entryId, stages: {}, status: 'generated' };
 record.stages.hero = { at: new Date().toISOString() };
 record.triangles = { master: masterTris, hero: bestTris };
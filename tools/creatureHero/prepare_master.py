@@ -0,0 +1,192 @@
+"""Hero pipeline stage between convert.py and optimize.mjs: inspect (and slim) master.glb.
+
+optimize.mjs decimates every master down to PLAN_TRIANGLE_BUDGET, stepping its
+simplify ratio down to at most 0.1. This stage reads the counts from the GLB
+header (see glb_inspect.py) before any JS tooling loads the file: a master over
+the budget is flagged with the simplify ratio the optimizer will need, and one
+that even the 0.1 step cannot bring under the budget fails outright. With
+--max-texture it also downscales larger embedded textures in parallel, so the
+optimizer starts from a smaller file. Triangle reduction itself stays in
+optimize.mjs (meshoptimizer).
+
+Usage: py tools/creatureHero/prepare_master.py <entryId> [--base directory]
+       [--max-texture N] [--workers N] [--json]
+
+Exit codes: 0 within budget, 3 over budget (optimize.mjs must decimate),
+1 usage error, missing master, or a master the simplify ladder cannot reach.
+argparse itself exits 2 on bad arguments, so a flagged master uses 3.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from artifact_store import file_sha256, write_json_atomic
+from glb_inspect import GlbError, glb_stats, open_glb, repack
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BUDGETS_TS = REPO_ROOT / "src" / "systems" / "entities3d" / "textPlan" / "budgets.ts"
+DEFAULT_BASE = Path("public/creatures3d/hero")
+# The smallest ratio in optimize.mjs's simplify ladder.
+MIN_SIMPLIFY_RATIO = 0.1
+FALLBACK_TRIANGLE_BUDGET = 30_000
+
+PIL_FORMATS = {"image/png": "PNG", "image/jpeg": "JPEG", "image/webp": "WEBP"}
+
+
+def plan_triangle_budget():
+    """PLAN_TRIANGLE_BUDGET from budgets.ts, so this gate and the optimizer share one number."""
+    try:
+        m = re.search(r"PLAN_TRIANGLE_BUDGET\s*=\s*([\d_]+)", BUDGETS_TS.read_text(encoding="utf-8"))
+    except OSError:
+        m = None
+    return int(m.group(1).replace("_", "")) if m else FALLBACK_TRIANGLE_BUDGET
+
+
+# ============================================================================
+# Texture downscale
+# ============================================================================
+def downscale_image(data, mime, max_size):
+    """Re-encoded bytes if the image exceeds max_size on a side, else None."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        if max(im.size) <= max_size:
+            return None
+        im.load()
+        resized = im.copy()
+    resized.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    fmt = PIL_FORMATS[mime]
+    if fmt == "JPEG":
+        resized.convert("RGB").save(out, fmt, quality=92)
+    elif fmt == "WEBP":
+        resized.save(out, fmt, quality=92)
+    else:
+        resized.save(out, fmt)
+    return out.getvalue()
+
+
+def downscale_textures(master, max_size, workers):
+    """Rewrite master in place (via rename) with smaller textures; returns {image: (before, after)}."""
+    with open_glb(master) as glb:
+        jobs = {}
+        for i, image in enumerate(glb.gltf.get("images", [])):
+            if "bufferView" in image and image.get("mimeType") in PIL_FORMATS:
+                jobs[i] = (image["bufferView"], image["mimeType"])
+        # PIL releases the GIL while decoding and resampling, so threads scale.
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                i: pool.submit(downscale_image, bytes(glb.view_bytes(view)), mime, max_size)
+                for i, (view, mime) in jobs.items()
+            }
+            results = {i: f.result() for i, f in futures.items()}
+        replacements = {jobs[i][0]: data for i, data in results.items() if data is not None}
+        changed = {i: (glb.gltf["bufferViews"][jobs[i][0]]["byteLength"], len(data)) for i, data in results.items() if data}
+        if not replacements:
+            return {}
+        # master.glb may be a hard link into the artifact store: write a new file and rename.
+        tmp = master.with_name(master.name + ".part")
+        try:
+            repack(glb, tmp, replacements)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+    os.replace(tmp, master)
+    return changed
+
+
+# ============================================================================
+# Stage
+# ============================================================================
+def prepare_entry(entry_id, base=DEFAULT_BASE, max_texture=None, workers=4):
+    hero_dir = Path(base) / entry_id
+    master = hero_dir / "master.glb"
+    if not master.exists():
+        raise FileNotFoundError(f'stage "master" artifact missing for {entry_id} — run the earlier stage first')
+
+    before = glb_stats(master)
+    downscaled = downscale_textures(master, max_texture, workers) if max_texture else {}
+    after = glb_stats(master) if downscaled else before
+
+    budget = plan_triangle_budget()
+    triangles = after["triangles"]
+    report = {
+        "entryId": entry_id,
+        "triangles": triangles,
+        "budget": budget,
+        "oversized": triangles > budget,
+        # The simplify ratio optimize.mjs has to reach, and whether its ladder goes that low.
+        "ratio": round(budget / triangles, 3) if triangles > budget else 1,
+        "reachable": triangles <= budget / MIN_SIMPLIFY_RATIO,
+        "bytes": {"before": before["bytes"], "after": after["bytes"]},
+        "textures": after["textures"],
+        "downscaled": {str(i): {"before": b, "after": a} for i, (b, a) in downscaled.items()},
+    }
+
+    record_path = hero_dir / "hero.json"
+    record = {"entryId": entry_id, "stages": {}, "status": "generated"}
+    if record_path.exists():
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+    prepare = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "triangles": report["triangles"],
+        "budget": budget,
+        "oversized": report["oversized"],
+        "textures": [f"{t['width']}x{t['height']}" for t in report["textures"]],
+        "bytes": after["bytes"],
+    }
+    if downscaled:
+        prepare["maxTexture"] = max_texture
+        prepare["sha256"] = file_sha256(master)
+    record.setdefault("stages", {})["prepare"] = prepare
+    write_json_atomic(record_path, record)
+    return report
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Inspect and slim a hero master.glb before optimize.mjs")
+    p.add_argument("entry_id")
+    p.add_argument("--base", default=str(DEFAULT_BASE))
+    p.add_argument("--max-texture", type=int, help="downscale embedded textures larger than this on a side")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    try:
+        report = prepare_entry(args.entry_id, Path(args.base), args.max_texture, args.workers)
+    except (OSError, GlbError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"master.glb: {report['triangles']:,} triangles, {report['bytes']['after'] / 1024 / 1024:.1f} MB")
+        for i, d in report["downscaled"].items():
+            print(f"  texture {i}: {d['before'] / 1024:.0f} KB -> {d['after'] / 1024:.0f} KB")
+    if not report["reachable"]:
+        print(
+            f"master has {report['triangles']:,} triangles; optimize.mjs can reach at most "
+            f"{MIN_SIMPLIFY_RATIO:g}x, so {report['budget']:,} needs a master under "
+            f"{int(report['budget'] / MIN_SIMPLIFY_RATIO):,}",
+            file=sys.stderr,
+        )
+        return 1
+    if report["oversized"]:
+        print(
+            f"master has {report['triangles']:,} triangles, over the {report['budget']:,} budget; "
+            f"optimize.mjs must simplify to {report['ratio']:g}x",
+            file=sys.stderr,
+        )
+        return 3
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
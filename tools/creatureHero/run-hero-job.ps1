@@ -24,6 +24,7 @@ if (-not $resolvedBase.StartsWith($scratchRoot, [System.StringComparison]::Ordin
 
 $credentialReader = Join-Path $repoRoot 'tools\creatureHero\gcp\read-hf-token.ps1'
 $convertScript = Join-Path $repoRoot 'tools\creatureHero\convert.py'
+$prepareScript = Join-Path $repoRoot 'tools\creatureHero\prepare_master.py'
 $optimizeScript = Join-Path $repoRoot 'tools\creatureHero\optimize.mjs'
 
 try {
@@ -43,6 +44,16 @@ try {
   }
 
   Write-Output 'HERO_LAB_STAGE:optimizing'
+  # Header-only triangle check: a master the simplify ladder cannot bring under
+  # budget fails here, before the optimizer spends minutes loading it. Exit 3
+  # only flags a master over budget, which the optimizer then decimates.
+  & py $prepareScript $EntryId --base $resolvedBase
+  if ($LASTEXITCODE -eq 3) {
+    Write-Warning 'master.glb is over the triangle budget; optimize.mjs will decimate it'
+  }
+  elseif ($LASTEXITCODE -ne 0) {
+    throw "Master inspection exited with code $LASTEXITCODE"
+  }
   & npx.cmd tsx $optimizeScript $EntryId --base $resolvedBase
   if ($LASTEXITCODE -ne 0) {
     throw "Hero optimization exited with code $LASTEXITCODE"
@@ -0,0 +1,72 @@
+"""Content-addressed cache for TRELLIS stage outputs.
+
+Repeat convert.py runs used to re-upload reference.png and repeat every remote
+stage even when nothing that affects the result had changed, so GPU quota was
+the bottleneck. Stage outputs are now stored under a key derived from what
+actually determines them:
+
+  preprocess  sha256(reference.png) + Space
+  master      sha256(reference.png) + Space + seed + face target + texture size
+
+A master hit makes the whole run a local copy; a preprocess-only hit (e.g. the
+previous image_to_3d call hit the quota) still skips the upload round trip.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+from artifact_store import file_sha256, place, write_json_atomic
+
+# ============================================================================
+# Cache location
+# ============================================================================
+# Lives in the ignored .agent tree next to Hero Lab's scratch jobs, keyed by
+# content so scratch runs and library runs share the same entries.
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_ROOT = REPO_ROOT / ".agent" / "cache" / "creature-hero"
+
+
+def _key(**parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def preprocess_key(reference_sha, space):
+    return _key(stage="preprocess", reference=reference_sha, space=space)
+
+
+def master_key(reference_sha, space, seed, face_target, texture_size):
+    return _key(
+        stage="master",
+        reference=reference_sha,
+        space=space,
+        seed=seed,
+        face_target=face_target,
+        texture_size=texture_size,
+    )
+
+
+class StageCache:
+    def __init__(self, root=DEFAULT_CACHE_ROOT):
+        self.root = Path(root)
+
+    def _dir(self, stage, key):
+        return self.root / stage / key
+
+    def get(self, stage, key):
+        """Path of the cached artifact for (stage, key), or None."""
+        meta_path = self._dir(stage, key) / "meta.json"
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        artifact = self._dir(stage, key) / meta["file"]
+        return artifact if artifact.exists() else None
+
+    def put(self, stage, key, src, meta=None):
+        """Place src in the cache (linked when possible); meta.json is written last so readers never see half an entry."""
+        src = Path(src)
+        d = self._dir(stage, key)
+        name = "artifact" + src.suffix.lower()
+        place(src, d / name)
+        write_json_atomic(d / "meta.json", {"file": name, "source": str(src), **(meta or {})})
+        return d / name
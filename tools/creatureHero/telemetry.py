@@ -0,0 +1,187 @@
+"""Per-stage timing records for the creature hero pipeline, and a report over them.
+
+convert.py appends one JSON line per stage to telemetry.jsonl beside each
+entry's hero.json:
+
+  {"run": "3f2a…", "entryId": "owlbear", "stage": "image_to_3d", "at": "…",
+   "wallSeconds": 212.4, "bytesUp": 0, "bytesDown": 0, "ok": true}
+
+Stages are queue (time a batch job waited for a free worker), start_session,
+preprocess_image, image_to_3d, extract_glb and copy. Cache hits are recorded
+with "cached": true so they can be told apart from real remote calls. Time a
+call spends in the Space's own ZeroGPU queue is part of that call's wall time;
+predict() does not expose it separately.
+
+Usage: py tools/creatureHero/telemetry.py [--base directory] [--entry id ...] [--json]
+prints count, p50 and p95 wall time and total bytes per stage across entries.
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+TELEMETRY_FILE = "telemetry.jsonl"
+STAGE_ORDER = ("queue", "start_session", "preprocess_image", "image_to_3d", "extract_glb", "copy")
+DEFAULT_BASE = Path("public/creatures3d/hero")
+
+
+def file_size(path):
+    try:
+        return Path(path).stat().st_size
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+# ============================================================================
+# Recording
+# ============================================================================
+class Telemetry:
+    """Appends stage records for one run of one entry."""
+
+    def __init__(self, path, entry_id):
+        self.path = Path(path)
+        self.entry_id = entry_id
+        self.run = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+
+    def record(self, stage, wall_seconds, **fields):
+        line = {
+            "run": self.run,
+            "entryId": self.entry_id,
+            "stage": stage,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "wallSeconds": round(wall_seconds, 4),
+            "bytesUp": 0,
+            "bytesDown": 0,
+            "ok": True,
+            **fields,
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Time the block; the yielded dict collects bytesUp/bytesDown/cached set inside it."""
+        extra = dict(fields)
+        started = time.monotonic()
+        try:
+            yield extra
+        except BaseException as e:
+            self.record(name, time.monotonic() - started, **extra, ok=False, error=f"{type(e).__name__}: {e}")
+            raise
+        self.record(name, time.monotonic() - started, **extra)
+
+
+class NullTelemetry:
+    """Stand-in when no entry directory is known; records nothing."""
+
+    def record(self, stage, wall_seconds, **fields):
+        pass
+
+    @contextmanager
+    def stage(self, name, **fields):
+        yield dict(fields)
+
+
+# ============================================================================
+# Report
+# ============================================================================
+def read_records(base, entry_ids=None):
+    paths = [Path(base) / e / TELEMETRY_FILE for e in entry_ids] if entry_ids else Path(base).glob(f"*/{TELEMETRY_FILE}")
+    for path in paths:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # a line torn by an interrupted run
+            if isinstance(rec, dict) and "stage" in rec:
+                yield rec
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def aggregate(records):
+    """Per-stage summary; cached and failed calls are counted but kept out of the timings."""
+    stages = {}
+    for rec in records:
+        s = stages.setdefault(
+            rec["stage"],
+            {"count": 0, "cached": 0, "failed": 0, "wall": [], "bytesUp": 0, "bytesDown": 0, "entries": set()},
+        )
+        s["count"] += 1
+        s["entries"].add(rec.get("entryId"))
+        s["bytesUp"] += rec.get("bytesUp") or 0
+        s["bytesDown"] += rec.get("bytesDown") or 0
+        if not rec.get("ok", True):
+            s["failed"] += 1
+        elif rec.get("cached"):
+            s["cached"] += 1
+        else:
+            s["wall"].append(float(rec.get("wallSeconds") or 0.0))
+    out = {}
+    order = {name: i for i, name in enumerate(STAGE_ORDER)}
+    for name in sorted(stages, key=lambda n: (order.get(n, len(order)), n)):
+        s = stages[name]
+        wall = sorted(s["wall"])
+        out[name] = {
+            "count": s["count"],
+            "entries": len(s["entries"]),
+            "cached": s["cached"],
+            "failed": s["failed"],
+            "p50": percentile(wall, 50),
+            "p95": percentile(wall, 95),
+            "totalSeconds": round(sum(wall), 3),
+            "bytesUp": s["bytesUp"],
+            "bytesDown": s["bytesDown"],
+        }
+    return out
+
+
+def _fmt_seconds(v):
+    return "-" if v is None else f"{v:.2f}s"
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Aggregate creature hero stage telemetry")
+    p.add_argument("--base", default=str(DEFAULT_BASE))
+    p.add_argument("--entry", action="append", help="limit to these entry ids (repeatable)")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    summary = aggregate(read_records(args.base, args.entry))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    if not summary:
+        print(f"no {TELEMETRY_FILE} records under {args.base}")
+        return 0
+    print(f"{'stage':<18}{'count':>7}{'cached':>8}{'failed':>8}{'p50':>10}{'p95':>10}{'total':>11}{'MB up':>9}{'MB down':>9}")
+    for name, s in summary.items():
+        print(
+            f"{name:<18}{s['count']:>7}{s['cached']:>8}{s['failed']:>8}"
+            f"{_fmt_seconds(s['p50']):>10}{_fmt_seconds(s['p95']):>10}{s['totalSeconds']:>10.1f}s"
+            f"{s['bytesUp'] / 1e6:>9.1f}{s['bytesDown'] / 1e6:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
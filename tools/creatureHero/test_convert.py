@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from PIL import Image
+
+import fake_trellis
+from artifact_store import ArtifactStore
+from convert import convert_many
+from fake_trellis import FakeTrellisClient, make_backend
+from stage_cache import StageCache
+
+
+@pytest.fixture
+def base(tmp_path):
+    """A hero base with two entries that have a reference image, and one that does not."""
+    base = tmp_path / "hero"
+    for i, entry_id in enumerate(("owlbear", "griffon")):
+        (base / entry_id).mkdir(parents=True)
+        Image.new("RGB", (64, 64), (40 * i, 120, 90)).save(base / entry_id / "reference.png")
+    (base / "wyvern").mkdir()
+    return base
+
+
+def counting(factory):
+    """Wrap a backend factory to record the endpoints every client it opens is asked for."""
+    calls = []
+
+    def backend(space, token):
+        client = factory(space, token)
+        calls.append(client.calls)
+        return client
+
+    backend.endpoints = lambda: [name for client_calls in calls for name in client_calls]
+    return backend
+
+
+def test_convert_many_runs_each_entry_against_the_fake(tmp_path, base):
+    backend = counting(make_backend(tmp_path / "scratch", texture_size=16, triangles=12))
+    cache = StageCache(tmp_path / "cache")
+    store = ArtifactStore(tmp_path / "blobs")
+
+    results = convert_many(["owlbear", "wyvern", "griffon"], base=base, backend=backend, concurrency=2, cache=cache, store=store)
+
+    assert list(results) == ["owlbear", "wyvern", "griffon"]
+    assert [r["ok"] for r in results.values()] == [True, False, True]
+    assert "reference" in results["wyvern"]["error"]
+    for entry_id in ("owlbear", "griffon"):
+        master = base / entry_id / "master.glb"
+        assert master.read_bytes()[:4] == b"glTF"
+        assert results[entry_id]["bytes"] == master.stat().st_size
+        record = json.loads((base / entry_id / "hero.json").read_text(encoding="utf-8"))
+        assert record["stages"]["master"]["sha256"] == results[entry_id]["sha256"]
+        assert record["stages"]["master"]["cached"] is False
+    # Both entries got the same synthetic mesh, so the store holds it once.
+    assert results["owlbear"]["sha256"] == results["griffon"]["sha256"]
+    assert sorted(backend.endpoints()) == sorted(
+        ["/start_session", "/preprocess_image", "/image_to_3d", "/extract_glb"] * 2
+    )
+
+
+def test_warm_stage_cache_skips_the_backend(tmp_path, base):
+    cache = StageCache(tmp_path / "cache")
+    store = ArtifactStore(tmp_path / "blobs")
+    first = counting(make_backend(tmp_path / "scratch", texture_size=16, triangles=12))
+    convert_many(["owlbear"], base=base, backend=first, cache=cache, store=store)
+
+    second = counting(make_backend(tmp_path / "scratch", texture_size=16, triangles=12))
+    results = convert_many(["owlbear"], base=base, backend=second, cache=cache, store=store)
+
+    assert results["owlbear"]["ok"] and results["owlbear"]["cached"]
+    assert second.endpoints() == []
+
+
+def test_preprocess_accepts_a_handle_file_upload(tmp_path):
+    reference = tmp_path / "reference.png"
+    Image.new("RGB", (8, 8)).save(reference)
+    client = FakeTrellisClient(tmp_path, tmp_path / "master.glb")
+
+    processed = client.predict(input={"path": str(reference), "meta": {"_type": "gradio.FileData"}}, api_name="/preprocess_image")
+
+    assert processed.endswith(".png")
+    assert open(processed, "rb").read() == reference.read_bytes()
+
+
+def test_backend_shares_one_factory_per_process(monkeypatch):
+    monkeypatch.setattr(fake_trellis, "_shared_factory", None)
+    monkeypatch.setenv("FAKE_TRELLIS_TEXTURE", "16")
+    monkeypatch.setenv("FAKE_TRELLIS_TRIANGLES", "12")
+
+    first = fake_trellis.backend("space", None)
+    second = fake_trellis.backend("space", None)
+
+    assert first.scratch == second.scratch
+    assert first.master == second.master and first.master.exists()
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import prepare_master
+from fake_trellis import write_glb
+from glb_inspect import triangle_count
+
+
+@pytest.fixture
+def base(tmp_path):
+    base = tmp_path / "hero"
+    write_glb(base / "owlbear" / "master.glb", texture_size=16, triangles=120)
+    return base
+
+
+@pytest.mark.parametrize(
+    "budget, code, oversized",
+    [(200, 0, False), (120, 0, False), (40, 3, True), (11, 1, True)],
+)
+def test_exit_code_follows_the_optimizer_budget(monkeypatch, capsys, base, budget, code, oversized):
+    monkeypatch.setattr(prepare_master, "plan_triangle_budget", lambda: budget)
+
+    assert prepare_master.main(["owlbear", "--base", str(base), "--json"]) == code
+
+    report = json.loads(capsys.readouterr().out)
+    assert (report["triangles"], report["oversized"], report["reachable"]) == (120, oversized, code != 1)
+    record = json.loads((base / "owlbear" / "hero.json").read_text(encoding="utf-8"))
+    assert record["stages"]["prepare"]["oversized"] is oversized
+
+
+def test_over_budget_master_reports_the_ratio_the_optimizer_needs(monkeypatch, base):
+    monkeypatch.setattr(prepare_master, "plan_triangle_budget", lambda: 30)
+    report = prepare_master.prepare_entry("owlbear", base)
+    assert report["ratio"] == 0.25
+
+
+def test_triangle_count_matches_optimize_mjs_for_every_mode():
+    gltf = {
+        "accessors": [{"count": 10}, {"count": 7}],
+        "meshes": [{"primitives": [
+            {"attributes": {"POSITION": 0}, "indices": 1, "mode": 5},
+            {"attributes": {"POSITION": 0}, "mode": 6},
+            {"attributes": {"POSITION": 0}},
+            {"attributes": {}},
+        ]}],
+    }
+    # floor(count / 3) per primitive, as optimize.mjs's triangleCount() does.
+    assert triangle_count(gltf) == 7 // 3 + 10 // 3 + 10 // 3
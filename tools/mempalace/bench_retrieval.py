@@ -0,0 +1,135 @@
+"""Scoped vs unscoped retrieval on a synthetic palace.
+
+Builds a throwaway on-disk palace (in a temporary directory) shaped like the
+real one: many rooms, files split into several similar chunks. Embeddings are
+synthetic (a random direction per file plus per-chunk noise), so no embedding
+model is loaded and timings isolate Chroma's filtered search.
+
+For each mode it reports p50/p95 latency, how many distinct files the top-n
+holds on average, and how often the file the query was drawn from is found:
+
+  unscoped        no filter, raw top-n (the old probe)
+  unscoped+dedupe no filter, over-fetch and collapse per source_file
+  room            where room = <query's room>, raw top-n
+  room+dedupe     where room = ..., collapsed
+
+Usage: py tools/mempalace/bench_retrieval.py [--rooms 12] [--files 400] [--chunks 8]
+       [--dim 384] [--queries 200] [-n 5] [--json]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+
+from retrieval import search
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1] if values else None
+
+
+def unit(v):
+    norm = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / norm for x in v]
+
+
+def build_palace(path, rooms, files, chunks, dim, seed=1):
+    """Fill a fresh collection; returns [(room, source_file, file_vector)] for query generation."""
+    import chromadb
+
+    rng = random.Random(seed)
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection("bench_drawers", embedding_function=None, metadata={"hnsw:space": "cosine"})
+    catalog = []
+    ids, embeddings, metadatas = [], [], []
+    for f in range(files):
+        room = f"room{f % rooms:02d}"
+        source = f"/synthetic/{room}/file{f:05d}.ts"
+        base = unit([rng.gauss(0, 1) for _ in range(dim)])
+        catalog.append((room, source, base))
+        for c in range(chunks):
+            ids.append(f"{source}:{c}")
+            embeddings.append(unit([b + rng.gauss(0, 0.15) for b in base]))
+            metadatas.append({"source_file": source, "room": room, "added_by": f"agent{f % 3}", "chunk_index": c})
+            if len(ids) >= 2000:
+                collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+                ids, embeddings, metadatas = [], [], []
+    if ids:
+        collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    return client, collection, catalog
+
+
+def run(collection, catalog, queries, n, seed=2):
+    rng = random.Random(seed)
+    probes = []
+    for _ in range(queries):
+        room, source, base = rng.choice(catalog)
+        probes.append((room, source, unit([b + rng.gauss(0, 0.3) for b in base])))
+
+    modes = {
+        "unscoped": {"dedupe": False, "scoped": False},
+        "unscoped+dedupe": {"dedupe": True, "scoped": False},
+        "room": {"dedupe": False, "scoped": True},
+        "room+dedupe": {"dedupe": True, "scoped": True},
+    }
+    report = {}
+    for name, mode in modes.items():
+        latencies, distinct, found = [], [], 0
+        for room, source, vector in probes:
+            started = time.monotonic()
+            hits = search(
+                collection,
+                source,
+                n,
+                rooms=[room] if mode["scoped"] else None,
+                dedupe=mode["dedupe"],
+                embed=lambda _texts, v=vector: [v],
+                include_documents=False,
+            )
+            latencies.append((time.monotonic() - started) * 1000)
+            files = [h["source_file"] for h in hits["results"]]
+            distinct.append(len(set(files)))
+            found += source in files
+        report[name] = {
+            "p50Ms": round(percentile(latencies, 50), 2),
+            "p95Ms": round(percentile(latencies, 95), 2),
+            "distinctFiles": round(sum(distinct) / len(distinct), 2),
+            "hitRate": round(found / len(probes), 3),
+        }
+    return report
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Benchmark scoped vs unscoped MemPalace retrieval")
+    p.add_argument("--rooms", type=int, default=12)
+    p.add_argument("--files", type=int, default=400)
+    p.add_argument("--chunks", type=int, default=8, help="chunks per file")
+    p.add_argument("--dim", type=int, default=384)
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("-n", type=int, default=5)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="palace-bench-") as path:
+        started = time.monotonic()
+        client, collection, catalog = build_palace(path, args.rooms, args.files, args.chunks, args.dim)
+        build_s = time.monotonic() - started
+        report = run(collection, catalog, args.queries, args.n)
+        del collection, client  # release the store before the directory is removed
+
+    if args.json:
+        print(json.dumps({"drawers": args.files * args.chunks, "buildSeconds": round(build_s, 2), "modes": report}))
+        return 0
+    print(f"{args.files * args.chunks} drawers in {args.rooms} rooms (built in {build_s:.1f}s), {args.queries} queries, n={args.n}")
+    print(f"{'mode':<18}{'p50':>9}{'p95':>9}{'files/top-n':>13}{'hit rate':>10}")
+    for name, r in report.items():
+        print(f"{name:<18}{r['p50Ms']:>7.2f}ms{r['p95Ms']:>7.2f}ms{r['distinctFiles']:>13.2f}{r['hitRate']:>10.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,62 @@
+"""Fixtures for the MemPalace tool tests: a throwaway on-disk palace and a tiny embedder.
+
+Tests that touch Chroma take the `embedder` fixture (directly or through
+`palace`) and are skipped when chromadb is not installed. Nothing downloads
+the MiniLM model: drawers are embedded as hashed bags of words.
+
+  py -m pytest tools/mempalace
+"""
+import hashlib
+
+import pytest
+
+from palace import open_collection
+
+DIMS = 64
+
+
+def hashed_words(texts):
+    """One L2-normalized vector per text: each word adds 1 to a bucket picked by its md5."""
+    import numpy as np
+
+    out = []
+    for text in texts:
+        v = np.zeros(DIMS, dtype=np.float32)
+        for word in text.lower().split():
+            v[int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "big") % DIMS] += 1
+        out.append(v / (np.linalg.norm(v) or 1.0))
+    return out
+
+
+@pytest.fixture
+def embedder():
+    chromadb = pytest.importorskip("chromadb")
+
+    class HashedWords(chromadb.EmbeddingFunction):
+        def __init__(self):
+            self.calls = 0
+
+        def __call__(self, input):
+            self.calls += 1
+            return hashed_words(input)
+
+        @staticmethod
+        def name():
+            return "hashed-words"
+
+        def get_config(self):
+            return {}
+
+        @staticmethod
+        def build_from_config(config):
+            return HashedWords()
+
+    return HashedWords()
+
+
+@pytest.fixture
+def palace(tmp_path, embedder):
+    """Directory of a palace whose (empty) collection already exists."""
+    path = tmp_path / "palace"
+    open_collection(path, embedder, create=True)
+    return path
@@ -0,0 +1,319 @@
+"""Incremental MemPalace indexer for this repository, driven by mempalace.yaml.
+
+Each room in mempalace.yaml names a top-level folder ("Files from src/");
+"general" takes every other indexable file. A run:
+
+  1. walks the room folders with the shared scanner (scripts/audits/repo_scan.py,
+     so .gitignore'd files never reach the palace) and stats every file;
+  2. skips files whose size and mtime match the manifest, and hashes the
+     rest; a file whose content hash is unchanged only refreshes its stat;
+  3. deletes the drawers of removed and changed files by source_file;
+  4. chunks the changed files, embeds the chunks in large batches on a
+     thread pool, and upserts them with deterministic ids.
+
+The manifest lives in .agent/cache/mempalace-index.json and is tied to the
+palace path, so pointing at a different palace starts from scratch. Drawers
+carry the same metadata `mempalace mine` writes (source_file, room, wing,
+added_by) plus chunk_index and content_hash.
+
+Usage: py tools/mempalace/indexer.py [--palace dir] [--room name ...] [--workers N]
+       [--batch N] [--agent name] [--full] [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# repo_scan.py lives with the audit scripts, which import their siblings flatly;
+# put that folder on the path, as scripts/bench/run-benchmarks.py does.
+sys.path.insert(0, str(REPO_ROOT / "scripts" / "audits"))
+
+from palace import default_embedder, open_collection, palace_path  # noqa: E402
+from repo_scan import walk  # noqa: E402
+
+CONFIG = REPO_ROOT / "mempalace.yaml"
+DEFAULT_MANIFEST = REPO_ROOT / ".agent" / "cache" / "mempalace-index.json"
+MANIFEST_VERSION = 1
+
+GENERAL_ROOM = "general"
+DEFAULT_AGENT = "mempalace-indexer"
+CHUNK_CHARS = 800
+CHUNK_OVERLAP = 100
+MIN_CHUNK_CHARS = 50
+MAX_FILE_BYTES = 512 * 1024
+EMBED_BATCH = 256
+DELETE_BATCH = 500
+
+SKIP_DIRS = {".git", "node_modules", ".agent", "__pycache__", "dist", "build", ".venv", "venv", ".next", "coverage"}
+BINARY_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico", ".bmp", ".glb", ".gltf", ".bin",
+    ".mp3", ".ogg", ".wav", ".mp4", ".webm", ".woff", ".woff2", ".ttf", ".otf", ".zip", ".gz",
+    ".pdf", ".exe", ".dll", ".so", ".pyc", ".lock",
+}  # fmt: skip
+
+
+# ============================================================================
+# Rooms and files
+# ============================================================================
+def load_rooms(config=CONFIG):
+    """(wing, {folder: room}) from mempalace.yaml; rooms without a folder are skipped."""
+    import yaml
+
+    data = yaml.safe_load(Path(config).read_text(encoding="utf-8"))
+    folders = {}
+    for room in data.get("rooms", []):
+        m = re.match(r"Files from (.+?)/?$", str(room.get("description", "")))
+        if m:
+            folders[m.group(1)] = room["name"]
+    return data.get("wing", "aralia"), folders
+
+
+def room_for(rel, folders):
+    top = rel.split("/", 1)[0] if "/" in rel else ""
+    return folders.get(top, GENERAL_ROOM)
+
+
+def walk_files(root, folders, rooms=None):
+    """Yield (rel, path, room, size, mtime_ns) for indexable files (repo_scan.walk, .gitignore-aware)."""
+    # Rooms other than "general" live in known folders; only walk those.
+    subdirs = [d for d, room in folders.items() if room in rooms] if rooms and GENERAL_ROOM not in rooms else []
+    for f in walk(*subdirs, root=Path(root), skip_dirs=SKIP_DIRS):
+        if any(part.startswith(".") for part in f.rel.split("/")[:-1]):
+            continue
+        if os.path.splitext(f.rel)[1].lower() in BINARY_SUFFIXES:
+            continue
+        room = room_for(f.rel, folders)
+        if rooms and room not in rooms:
+            continue
+        if f.size == 0 or f.size > MAX_FILE_BYTES:
+            continue
+        yield f.rel, f.path, room, f.size, f.mtime_ns
+
+
+def read_text(path):
+    """(text, sha256) for a text file, or (None, sha256) if it looks binary."""
+    data = Path(path).read_bytes()
+    sha = hashlib.sha256(data).hexdigest()
+    if b"\0" in data[:8192]:
+        return None, sha
+    return data.decode("utf-8", errors="replace"), sha
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Split on line boundaries into ~size-character chunks with a short overlap."""
+    chunks = []
+    current = []
+    length = 0
+    for line in text.splitlines(keepends=True):
+        if length + len(line) > size and current:
+            chunks.append("".join(current))
+            # Carry the tail lines forward so a sentence split across chunks is still findable.
+            tail = []
+            tail_len = 0
+            for prev in reversed(current):
+                if tail_len + len(prev) > overlap:
+                    break
+                tail.insert(0, prev)
+                tail_len += len(prev)
+            current, length = tail, tail_len
+        while len(line) > size:
+            chunks.append(line[:size])
+            line = line[size - overlap :]
+        current.append(line)
+        length += len(line)
+    if current:
+        chunks.append("".join(current))
+    return [c for c in chunks if len(c.strip()) >= MIN_CHUNK_CHARS]
+
+
+def source_file(rel):
+    # `mempalace mine` files drawers under absolute paths; match it so both agree.
+    return str(REPO_ROOT / rel)
+
+
+def drawer_id(wing, rel, index):
+    return f"drawer_{wing}_{hashlib.sha1(rel.encode('utf-8')).hexdigest()[:16]}_{index:04d}"
+
+
+# ============================================================================
+# Manifest
+# ============================================================================
+class Manifest:
+    def __init__(self, path, palace):
+        self.path = Path(path)
+        self.palace = str(palace)
+        self.files = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("palace") == self.palace:
+            self.files = data.get("files", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "palace": self.palace, "files": self.files}, f)
+        os.replace(tmp, self.path)
+
+
+# ============================================================================
+# Indexing
+# ============================================================================
+def plan(manifest, files, workers, full=False):
+    """Split scanned files into (changed, unchanged_count); changed holds text and hash."""
+    unchanged = 0
+    to_hash = []
+    for rel, path, room, size, mtime_ns in files:
+        known = manifest.files.get(rel)
+        if not full and known and known["size"] == size and known["mtime_ns"] == mtime_ns and known["room"] == room:
+            unchanged += 1
+        else:
+            to_hash.append((rel, path, room, size, mtime_ns))
+
+    def load(item):
+        rel, path, room, size, mtime_ns = item
+        try:
+            text, sha = read_text(path)
+        except OSError:
+            return None
+        return rel, path, room, size, mtime_ns, text, sha
+
+    changed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for loaded in pool.map(load, to_hash):
+            if loaded is None:
+                continue
+            rel, path, room, size, mtime_ns, text, sha = loaded
+            known = manifest.files.get(rel)
+            if not full and known and known["sha"] == sha and known["room"] == room:
+                # Touched but identical (checkout, formatter no-op): refresh the stat only.
+                known.update(size=size, mtime_ns=mtime_ns)
+                unchanged += 1
+            else:
+                changed.append(loaded)
+    return changed, unchanged
+
+
+def delete_sources(collection, sources):
+    for i in range(0, len(sources), DELETE_BATCH):
+        collection.delete(where={"source_file": {"$in": sources[i : i + DELETE_BATCH]}})
+
+
+def index_repo(
+    palace=None,
+    rooms=None,
+    workers=None,
+    batch=EMBED_BATCH,
+    agent=DEFAULT_AGENT,
+    full=False,
+    dry_run=False,
+    manifest_path=DEFAULT_MANIFEST,
+    embedder=None,
+    log=print,
+):
+    started = time.monotonic()
+    workers = workers or min(8, os.cpu_count() or 4)
+    wing, folders = load_rooms()
+    palace = palace_path(palace)
+    manifest = Manifest(manifest_path, palace)
+
+    files = list(walk_files(str(REPO_ROOT), folders, set(rooms) if rooms else None))
+    seen = {f[0] for f in files}
+    removed = [
+        rel
+        for rel, known in manifest.files.items()
+        if rel not in seen and (not rooms or known["room"] in rooms)
+    ]
+    changed, unchanged = plan(manifest, files, workers, full)
+    summary = {
+        "scanned": len(files),
+        "unchanged": unchanged,
+        "changed": len(changed),
+        "removed": len(removed),
+        "chunks": 0,
+    }
+    log(f"scanned {len(files)} files: {len(changed)} changed, {len(removed)} removed, {unchanged} unchanged")
+    if dry_run or not (changed or removed):
+        if not dry_run:
+            manifest.save()  # keep refreshed stats of touched-but-identical files
+        summary["seconds"] = round(time.monotonic() - started, 2)
+        return summary
+
+    embedder = embedder or default_embedder()
+    _, collection = open_collection(palace, embedder, create=True)
+    delete_sources(collection, [source_file(rel) for rel in removed] + [source_file(c[0]) for c in changed])
+    for rel in removed:
+        del manifest.files[rel]
+
+    pending = []
+    for rel, path, room, size, mtime_ns, text, sha in changed:
+        chunks = chunk_text(text) if text else []
+        for i, chunk in enumerate(chunks):
+            meta = {
+                "source_file": source_file(rel),
+                "room": room,
+                "wing": wing,
+                "added_by": agent,
+                "chunk_index": i,
+                "content_hash": sha,
+            }
+            pending.append((drawer_id(wing, rel, i), chunk, meta))
+        manifest.files[rel] = {"size": size, "mtime_ns": mtime_ns, "sha": sha, "room": room, "chunks": len(chunks)}
+    summary["chunks"] = len(pending)
+
+    # Embedding dominates; onnxruntime releases the GIL, so batches run in
+    # parallel while upserts (one writer) are serialized.
+    write_lock = threading.Lock()
+    done = [0]
+
+    def embed_and_upsert(start):
+        part = pending[start : start + batch]
+        embeddings = embedder([doc for _, doc, _ in part])
+        with write_lock:
+            collection.upsert(
+                ids=[i for i, _, _ in part],
+                documents=[doc for _, doc, _ in part],
+                metadatas=[m for _, _, m in part],
+                embeddings=embeddings,
+            )
+            done[0] += len(part)
+            log(f"  upserted {done[0]}/{len(pending)} chunks")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(embed_and_upsert, range(0, len(pending), batch)))
+
+    manifest.save()
+    summary["seconds"] = round(time.monotonic() - started, 2)
+    return summary
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Incrementally index the repository into MemPalace")
+    p.add_argument("--palace", help="palace directory (default: $MEMPALACE_PALACE or ~/.mempalace/palace)")
+    p.add_argument("--room", action="append", help="only index these rooms (repeatable)")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--batch", type=int, default=EMBED_BATCH, help="chunks per embed/upsert batch")
+    p.add_argument("--agent", default=DEFAULT_AGENT, help="added_by value for new drawers")
+    p.add_argument("--full", action="store_true", help="ignore the manifest and re-embed everything")
+    p.add_argument("--dry-run", action="store_true", help="report what would change and stop")
+    args = p.parse_args(argv)
+
+    summary = index_repo(
+        args.palace, args.room, args.workers, args.batch, args.agent, args.full, args.dry_run
+    )
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
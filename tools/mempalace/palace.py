@@ -0,0 +1,86 @@
+"""Shared access to the MemPalace Chroma store for the tools in this folder.
+
+The palace is whatever directory `mempalace mine` filed into. Its location is
+taken from, in order: an explicit --palace argument, the MEMPALACE_PALACE
+environment variable, then ~/.mempalace/palace (the mempalace CLI default).
+No tool here hard-codes a machine-specific path.
+
+Queries and indexing embed text with the same function the collection was
+created with (Chroma's default MiniLM ONNX model), computed here rather than
+inside Chroma so embeddings can be cached and batched by the caller.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+COLLECTION = "mempalace_drawers"
+DEFAULT_PALACE = Path.home() / ".mempalace" / "palace"
+PALACE_ENV = "MEMPALACE_PALACE"
+
+
+def palace_path(explicit=None):
+    return Path(explicit or os.environ.get(PALACE_ENV) or DEFAULT_PALACE).expanduser()
+
+
+def default_embedder():
+    from chromadb.utils import embedding_functions
+
+    return embedding_functions.DefaultEmbeddingFunction()
+
+
+def open_collection(path=None, embedder=None, create=False):
+    """(client, collection) for the palace at `path`; create=True makes an empty one."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=str(palace_path(path)))
+    embedder = embedder or default_embedder()
+    if create:
+        collection = client.get_or_create_collection(
+            COLLECTION, embedding_function=embedder, metadata={"hnsw:space": "cosine"}
+        )
+    else:
+        collection = client.get_collection(COLLECTION, embedding_function=embedder)
+    return client, collection
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of text -> embedding in front of an embedding function."""
+
+    def __init__(self, embedder, max_entries=4096):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts):
+        """Embeddings for texts in order; only strings not seen recently reach the model."""
+        out = [None] * len(texts)
+        todo = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                if text in self._items:
+                    self._items.move_to_end(text)
+                    out[i] = self._items[text]
+                    self.hits += 1
+                else:
+                    todo.setdefault(text, []).append(i)
+                    self.misses += 1
+        if todo:
+            fresh = list(todo)
+            vectors = self.embedder(fresh)
+            with self._lock:
+                for text, vector in zip(fresh, vectors):
+                    self._items[text] = vector
+                    self._items.move_to_end(text)
+                    for i in todo[text]:
+                        out[i] = vector
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
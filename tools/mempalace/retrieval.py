@@ -0,0 +1,182 @@
+"""Room- and agent-scoped MemPalace retrieval, collapsed to one result per file.
+
+Unfiltered top-k over the whole wing has two problems: every drawer is
+ranked, and a long file with many near-identical chunks can fill the list on
+its own. search() pushes room / added_by filters down to Chroma as a `where`
+clause, over-fetches, and keeps only the best chunk of each source_file.
+
+  from retrieval import search
+  hits = search(collection, "spell system architecture", n=5, rooms=["src", "documentation"])
+  hits["results"]  # [{"source_file", "room", "added_by", "score", "distance", "chunks", ...}]
+  hits["ms"]       # end-to-end latency; "queryMs" is the Chroma call alone
+
+score is 1 / (1 + distance): higher is better, and it stays meaningful for
+both cosine and L2 collections.
+
+Usage: py tools/mempalace/retrieval.py "query" [--room name ...] [--agent name ...]
+       [-n 5] [--no-dedupe] [--palace dir] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+
+OVERFETCH = 4
+MAX_FETCH = 200
+
+
+def _clause(field, values):
+    values = [v for v in (values or []) if v]
+    if not values:
+        return None
+    return {field: values[0]} if len(values) == 1 else {field: {"$in": values}}
+
+
+def build_where(rooms=None, agents=None, wing=None, extra=None):
+    """Chroma where clause for the given filters, or None for an unscoped query."""
+    clauses = [
+        c
+        for c in (_clause("room", rooms), _clause("added_by", agents), _clause("wing", [wing] if wing else None), extra)
+        if c
+    ]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def score(distance):
+    return None if distance is None else 1.0 / (1.0 + float(distance))
+
+
+def collapse(rows, n, dedupe=True):
+    """Keep rank order; with dedupe, the first (best) chunk of each source_file wins."""
+    out = []
+    by_file = {}
+    for row in rows:
+        meta = row.get("metadata") or {}
+        source = meta.get("source_file") or row["id"]
+        if dedupe and source in by_file:
+            by_file[source]["chunks"] += 1
+            continue
+        hit = {
+            "id": row["id"],
+            "source_file": meta.get("source_file"),
+            "room": meta.get("room"),
+            "added_by": meta.get("added_by"),
+            "distance": row.get("distance"),
+            "score": score(row.get("distance")),
+            "document": row.get("document"),
+            "chunks": 1,
+        }
+        by_file[source] = hit
+        out.append(hit)
+    return out[:n]
+
+
+def rows(result, j=0):
+    """Flatten the j-th query of a Chroma query() result into row dicts."""
+    columns = {k: result[k][j] if result.get(k) else None for k in ("metadatas", "distances", "documents")}
+    return [
+        {
+            "id": drawer_id,
+            "distance": columns["distances"][i] if columns["distances"] else None,
+            "metadata": columns["metadatas"][i] if columns["metadatas"] else None,
+            "document": columns["documents"][i] if columns["documents"] else None,
+        }
+        for i, drawer_id in enumerate(result["ids"][j])
+    ]
+
+
+def search(
+    collection,
+    query,
+    n=5,
+    rooms=None,
+    agents=None,
+    wing=None,
+    where=None,
+    dedupe=True,
+    overfetch=OVERFETCH,
+    embed=None,
+    include_documents=True,
+    run_query=None,
+):
+    """Scoped, deduplicated top-n for one query.
+
+    embed(texts) -> embeddings lets callers share a warm, cached embedder
+    (palace.EmbeddingCache.embed); without it Chroma embeds the text itself.
+    When collapsing leaves fewer than n files the fetch is doubled, up to
+    MAX_FETCH, so a file-heavy neighbourhood cannot starve the result.
+
+    run_query(n_results, where) -> rows replaces the collection.query() call,
+    e.g. to route each fetch through the service's QueryBatcher.
+    """
+    started = time.monotonic()
+    clause = build_where(rooms, agents, wing, where)
+    if run_query is None:
+        include = ["metadatas", "distances"] + (["documents"] if include_documents else [])
+        query_args = {"query_embeddings": embed([query])} if embed else {"query_texts": [query]}
+        if clause:
+            query_args["where"] = clause
+
+        def run_query(n_results, where):
+            return rows(collection.query(n_results=n_results, include=include, **query_args))
+
+    fetch = max(n, n * overfetch) if dedupe else n
+    query_ms = 0.0
+    while True:
+        t0 = time.monotonic()
+        found = run_query(fetch, clause)
+        query_ms += (time.monotonic() - t0) * 1000
+        hits = collapse(found, n, dedupe)
+        if not dedupe or len(hits) >= n or len(found) < fetch or fetch >= MAX_FETCH:
+            break
+        fetch = min(fetch * 2, MAX_FETCH)
+    return {
+        "query": query,
+        "where": clause,
+        "results": hits,
+        "fetched": len(found),
+        "queryMs": round(query_ms, 2),
+        "ms": round((time.monotonic() - started) * 1000, 2),
+    }
+
+
+def main(argv):
+    from palace import EmbeddingCache, default_embedder, open_collection
+
+    p = argparse.ArgumentParser(description="Scoped, deduplicated MemPalace search")
+    p.add_argument("query")
+    p.add_argument("--room", action="append", help="limit to these rooms (repeatable)")
+    p.add_argument("--agent", action="append", help="limit to drawers added_by these agents (repeatable)")
+    p.add_argument("-n", type=int, default=5)
+    p.add_argument("--no-dedupe", action="store_true", help="allow several chunks of one file")
+    p.add_argument("--palace", help="palace directory (default: $MEMPALACE_PALACE or ~/.mempalace/palace)")
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args(argv)
+
+    embedder = default_embedder()
+    _, collection = open_collection(args.palace, embedder)
+    hits = search(
+        collection,
+        args.query,
+        args.n,
+        args.room,
+        args.agent,
+        dedupe=not args.no_dedupe,
+        embed=EmbeddingCache(embedder).embed,
+        include_documents=args.json,
+    )
+    if args.json:
+        print(json.dumps(hits, indent=2))
+        return 0
+    print(f"{len(hits['results'])} results in {hits['ms']:.0f} ms (fetched {hits['fetched']}, where {hits['where']})")
+    for h in hits["results"]:
+        fname = (h["source_file"] or h["id"]).replace("\\", "/").split("/")[-1]
+        more = f", +{h['chunks'] - 1} chunks" if h["chunks"] > 1 else ""
+        print(f"  {h['score']:.3f}  {fname} (room: {h['room'] or '?'}, agent: {h['added_by'] or '?'}{more})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,253 @@
+"""Long-lived MemPalace query service: one warm collection, batched queries.
+
+Opening the palace and loading the embedding model costs seconds, and every
+agent lookup used to pay it again. This process opens both once and answers
+JSON-lines requests over stdin/stdout or a localhost socket:
+
+  py tools/mempalace/service.py --stdio [--palace dir]
+  py tools/mempalace/service.py --listen 127.0.0.1:8766 [--palace dir]
+
+Requests (one JSON object per line; "id" is echoed back):
+  {"id": 1, "query": "spell system architecture", "n": 5}
+  {"id": 2, "queries": ["a", "b"], "n": 10, "where": {"room": "src"}}
+  {"id": 3, "query": "…", "rooms": ["src"], "agents": ["claude"], "dedupe": true}
+  {"id": 4, "op": "count"}      {"id": 5, "op": "stats"}      {"op": "ping"}
+
+Responses: {"id": 1, "ok": true, "results": [[{"id", "distance", "metadata",
+"document"}, ...]], "ms": 12.3}, one result list per query text, or
+{"id": 1, "ok": false, "error": "..."}. rooms / agents become a Chroma where
+clause; with "dedupe" each query runs through retrieval.search() (over-fetch,
+refetch while files collapse below n) and each list holds one scored hit per
+source_file, in retrieval.collapse()'s shape.
+
+Queries that arrive within a few milliseconds of each other and share n and
+where are embedded together and sent to Chroma as one query() call. Repeated
+query strings skip the model through an LRU embedding cache.
+"""
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from palace import EmbeddingCache, default_embedder, open_collection, palace_path
+from retrieval import build_where, rows, search
+
+DEFAULT_N = 5
+BATCH_WINDOW = 0.005
+MAX_BATCH = 64
+INCLUDE = ("metadatas", "distances", "documents")
+
+
+class _Pending:
+    __slots__ = ("text", "n", "where", "future")
+
+    def __init__(self, text, n, where):
+        self.text = text
+        self.n = n
+        self.where = where
+        self.future = Future()
+
+
+class QueryBatcher:
+    """Coalesces concurrent query() calls on one collection."""
+
+    def __init__(self, collection, cache, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.collection = collection
+        self.cache = cache
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = queue.Queue()
+        self.batches = 0
+        self.queries = 0
+        self._thread = threading.Thread(target=self._loop, name="palace-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, n=DEFAULT_N, where=None):
+        p = _Pending(text, n, where or None)
+        self._pending.put(p)
+        return p.future
+
+    def close(self):
+        self._pending.put(None)
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            first = self._pending.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)  # finish this batch, then stop
+                    break
+                batch.append(item)
+            self._run(batch)
+
+    def _run(self, batch):
+        groups = {}
+        for p in batch:
+            key = (p.n, json.dumps(p.where, sort_keys=True))
+            groups.setdefault(key, []).append(p)
+        for (n, _), members in groups.items():
+            try:
+                embeddings = self.cache.embed([p.text for p in members])
+                kwargs = {"where": members[0].where} if members[0].where else {}
+                result = self.collection.query(
+                    query_embeddings=embeddings, n_results=n, include=list(INCLUDE), **kwargs
+                )
+            except Exception as e:
+                for p in members:
+                    p.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.queries += len(members)
+            for j, p in enumerate(members):
+                p.future.set_result(rows(result, j))
+
+
+class PalaceService:
+    def __init__(self, path=None, embedder=None):
+        self.path = palace_path(path)
+        embedder = embedder or default_embedder()
+        self.client, self.collection = open_collection(self.path, embedder)
+        self.cache = EmbeddingCache(embedder)
+        self.batcher = QueryBatcher(self.collection, self.cache)
+        # Deduplicated queries run search() here so their fetches still share batches.
+        self.searches = ThreadPoolExecutor(max_workers=MAX_BATCH, thread_name_prefix="palace-search")
+
+    def search(self, text, n, where):
+        """retrieval.search() with every fetch sent through the batcher."""
+        hits = search(
+            self.collection,
+            text,
+            n,
+            where=where,
+            run_query=lambda fetch, clause: self.batcher.submit(text, fetch, clause).result(),
+        )
+        return hits["results"]
+
+    def handle(self, request):
+        """Answer one decoded request; never raises."""
+        rid = request.get("id") if isinstance(request, dict) else None
+        started = time.monotonic()
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            op = request.get("op", "query")
+            if op == "ping":
+                body = {}
+            elif op == "count":
+                body = {"count": self.collection.count()}
+            elif op == "stats":
+                body = {
+                    "palace": str(self.path),
+                    "cache": self.cache.stats(),
+                    "batches": self.batcher.batches,
+                    "queries": self.batcher.queries,
+                }
+            elif op == "query":
+                texts = request.get("queries") or [request.get("query")]
+                if not isinstance(texts, list):
+                    raise ValueError("'queries' must be a list of strings")
+                if not all(isinstance(t, str) and t for t in texts):
+                    raise ValueError("query needs a non-empty 'query' string or 'queries' list")
+                n = int(request.get("n", DEFAULT_N))
+                where = build_where(request.get("rooms"), request.get("agents"), request.get("wing"), request.get("where"))
+                if request.get("dedupe"):
+                    futures = [self.searches.submit(self.search, t, n, where) for t in texts]
+                else:
+                    futures = [self.batcher.submit(t, n, where) for t in texts]
+                body = {"results": [f.result() for f in futures]}
+            else:
+                raise ValueError(f"unknown op {op!r}")
+        except Exception as e:
+            return {"id": rid, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"id": rid, "ok": True, **body, "ms": round((time.monotonic() - started) * 1000, 2)}
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"invalid JSON: {e}"}
+        return self.handle(request)
+
+
+# ============================================================================
+# Transports
+# ============================================================================
+def serve_stdio(service, workers=16):
+    """Requests are handled concurrently so they can share batches; replies carry their id."""
+    lock = threading.Lock()
+
+    def reply(line):
+        response = service.handle_line(line)
+        with lock:
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for line in sys.stdin:
+            if line.strip():
+                pool.submit(reply, line)
+    return 0
+
+
+def serve_socket(service, address):
+    host, _, port = address.rpartition(":")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write((json.dumps(service.handle_line(line)) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+    class Server(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+    with Server((host or "127.0.0.1", int(port)), Handler) as server:
+        print(f"mempalace service on {server.server_address[0]}:{server.server_address[1]} ({service.path})", flush=True)
+        server.serve_forever()
+    return 0
+
+
+def ask(address, request, timeout=60.0):
+    """Send one request to a running --listen service and return its response."""
+    host, _, port = address.rpartition(":")
+    with socket.create_connection((host or "127.0.0.1", int(port)), timeout=timeout) as s:
+        s.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with s.makefile("r", encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+def main(argv):
+    p = argparse.ArgumentParser(description="Warm MemPalace query service")
+    mode = p.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stdio", action="store_true", help="JSON lines on stdin/stdout")
+    mode.add_argument("--listen", metavar="HOST:PORT", help="JSON lines on a localhost socket")
+    p.add_argument("--palace", help="palace directory (default: $MEMPALACE_PALACE or ~/.mempalace/palace)")
+    args = p.parse_args(argv)
+
+    service = PalaceService(args.palace)
+    if args.stdio:
+        return serve_stdio(service)
+    return serve_socket(service, args.listen)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,36 @@
+from indexer import MAX_FILE_BYTES, walk_files
+
+
+def test_walk_files_honours_gitignore_and_rooms(tmp_path):
+    files = {
+        ".gitignore": "*.log\n/generated/\n",
+        "src/app.ts": "export {};\n",
+        "src/debug.log": "noise\n",
+        "src/.cache/state.json": "{}\n",
+        "src/logo.png": "not text\n",
+        "src/empty.ts": "",
+        "src/huge.ts": "x" * (MAX_FILE_BYTES + 1),
+        "docs/guide.md": "# Guide\n",
+        "docs/.gitignore": "draft.md\n",
+        "docs/draft.md": "# Draft\n",
+        "generated/out.ts": "export {};\n",
+        "node_modules/pkg/index.js": "module.exports = {};\n",
+        "README.md": "# Readme\n",
+    }
+    for rel, text in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    folders = {"src": "src", "docs": "documentation"}
+
+    found = {rel: room for rel, _, room, _, _ in walk_files(str(tmp_path), folders)}
+    assert found == {
+        ".gitignore": "general",
+        "docs/.gitignore": "documentation",
+        "src/app.ts": "src",
+        "docs/guide.md": "documentation",
+        "README.md": "general",
+    }
+
+    only_src = [rel for rel, *_ in walk_files(str(tmp_path), folders, rooms=["src"])]
+    assert only_src == ["src/app.ts"]
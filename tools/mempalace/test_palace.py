@@ -0,0 +1,55 @@
+from palace import DEFAULT_PALACE, PALACE_ENV, EmbeddingCache, open_collection, palace_path
+
+
+def test_palace_path_prefers_argument_then_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv(PALACE_ENV, str(tmp_path / "from-env"))
+    assert palace_path(tmp_path / "explicit") == tmp_path / "explicit"
+    assert palace_path() == tmp_path / "from-env"
+    monkeypatch.delenv(PALACE_ENV)
+    assert palace_path() == DEFAULT_PALACE
+
+
+def test_embedding_cache_embeds_each_text_once():
+    seen = []
+
+    def embed(texts):
+        seen.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    cache = EmbeddingCache(embed)
+    assert cache.embed(["ab", "abc", "ab"]) == [[2.0], [3.0], [2.0]]
+    assert cache.embed(["abc", "abcd"]) == [[3.0], [4.0]]
+    assert seen == [["ab", "abc"], ["abcd"]]
+    assert cache.stats() == {"entries": 3, "hits": 1, "misses": 4}
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    seen = []
+
+    def embed(texts):
+        seen.extend(texts)
+        return [[0.0] for _ in texts]
+
+    cache = EmbeddingCache(embed, max_entries=2)
+    cache.embed(["a", "b"])
+    cache.embed(["a"])  # "b" is now the oldest
+    cache.embed(["c"])
+    cache.embed(["a", "b"])
+    assert seen == ["a", "b", "c", "b"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_open_collection_reopens_a_created_palace(tmp_path, embedder):
+    path = tmp_path / "palace"
+    _, created = open_collection(path, embedder, create=True)
+    created.add(
+        ids=["d1", "d2"],
+        documents=["dragon scales", "goblin market"],
+        metadatas=[{"source_file": "a.md", "room": "docs"}, {"source_file": "b.md", "room": "src"}],
+    )
+
+    _, reopened = open_collection(path, embedder)
+    assert reopened.count() == 2
+    result = reopened.query(query_embeddings=embedder(["goblin"]), n_results=1, include=["metadatas"])
+    assert result["ids"] == [["d2"]]
+    assert result["metadatas"][0][0]["source_file"] == "b.md"
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from palace import EmbeddingCache, open_collection
+from retrieval import search
+from service import QueryBatcher, PalaceService
+
+# One long file whose chunks all sit closer to "dragon" than any other file,
+# so a fixed over-fetch sees nothing else.
+DOMINANT_CHUNKS = 24
+DRAWERS = [(f"a{i}", f"dragon dragon dragon part{i}", "notes/a.md", "docs") for i in range(DOMINANT_CHUNKS)] + [
+    ("b", "dragon lore", "notes/b.md", "docs"),
+    ("c", "dragon tales", "notes/c.md", "docs"),
+    ("d", "dragon spawner", "src/d.ts", "src"),
+    ("g", "goblin market", "src/g.ts", "src"),
+]
+
+
+@pytest.fixture
+def service(palace, embedder):
+    _, collection = open_collection(palace, embedder)
+    collection.add(
+        ids=[d[0] for d in DRAWERS],
+        documents=[d[1] for d in DRAWERS],
+        metadatas=[{"source_file": d[2], "room": d[3]} for d in DRAWERS],
+    )
+    svc = PalaceService(palace, embedder)
+    yield svc
+    svc.batcher.close()
+    svc.searches.shutdown()
+
+
+def test_ping_count_and_stats(service, palace):
+    assert service.handle({"id": 1, "op": "ping"})["ok"]
+    assert service.handle({"id": 2, "op": "count"})["count"] == len(DRAWERS)
+    stats = service.handle({"op": "stats"})
+    assert stats["palace"] == str(palace)
+    assert stats["cache"] == {"entries": 0, "hits": 0, "misses": 0}
+
+
+def test_query_answers_each_text_in_order(service):
+    response = service.handle({"id": 7, "queries": ["goblin", "dragon lore"], "n": 1})
+    assert response["id"] == 7 and response["ok"]
+    assert [[r["id"] for r in rows] for rows in response["results"]] == [["g"], ["b"]]
+    assert set(response["results"][0][0]) == {"id", "distance", "metadata", "document"}
+
+
+def test_rooms_become_a_where_clause(service):
+    response = service.handle({"query": "dragon", "n": 10, "rooms": ["src"]})
+    assert {r["metadata"]["room"] for r in response["results"][0]} == {"src"}
+    assert {r["id"] for r in response["results"][0]} == {"d", "g"}
+
+
+def test_dedupe_refetches_past_a_dominant_file(service, embedder, palace):
+    response = service.handle({"query": "dragon", "n": 3, "dedupe": True})
+    hits = response["results"][0]
+    assert [h["source_file"] for h in hits][:1] == ["notes/a.md"]
+    assert len({h["source_file"] for h in hits}) == 3
+    assert hits[0]["chunks"] == DOMINANT_CHUNKS
+
+    _, collection = open_collection(palace, embedder)
+    direct = search(collection, "dragon", 3, embed=EmbeddingCache(embedder).embed)
+    assert [h["id"] for h in hits] == [h["id"] for h in direct["results"]]
+
+
+def test_repeated_queries_hit_the_embedding_cache(service, embedder):
+    service.handle({"query": "goblin", "n": 1})
+    calls = embedder.calls
+    service.handle({"query": "goblin", "n": 1})
+    assert embedder.calls == calls
+    assert service.handle({"op": "stats"})["cache"]["hits"] == 1
+
+
+def test_batcher_coalesces_queries_with_the_same_shape(palace, embedder):
+    _, collection = open_collection(palace, embedder)
+    collection.add(ids=["x"], documents=["dragon"], metadatas=[{"source_file": "x.md"}])
+    batcher = QueryBatcher(collection, EmbeddingCache(embedder), window=0.5)
+    try:
+        futures = [batcher.submit(text, 1) for text in ("dragon", "goblin", "lore")]
+        futures.append(batcher.submit("dragon", 1, {"source_file": "x.md"}))
+        assert [[r["id"] for r in f.result(timeout=10)] for f in futures] == [["x"]] * 4
+    finally:
+        batcher.close()
+    # Two groups (no where / where) from one window.
+    assert (batcher.batches, batcher.queries) == (2, 4)
+
+
+@pytest.mark.parametrize(
+    "line, error",
+    [
+        ("not json", "invalid JSON"),
+        ("[1, 2]", "request must be a JSON object"),
+        ('{"id": 3, "op": "drop"}', "unknown op 'drop'"),
+        ('{"id": 4, "query": ""}', "non-empty 'query'"),
+        ('{"id": 5, "queries": "goblin"}', "'queries' must be a list"),
+        ('{"id": 6, "queries": {"q": "goblin"}}', "'queries' must be a list"),
+    ],
+)
+def test_bad_requests_get_an_error_response(service, line, error):
+    response = service.handle_line(line)
+    assert response["ok"] is False
+    assert error in response["error"]
+    assert response["id"] == (json.loads(line).get("id") if line.startswith("{") else None)